@@ -1,13 +1,14 @@
-from phy.large_scale_fading import general_path_loss
+import numpy as np
+from phy.large_scale_fading import path_loss_array
 from utils import config
-from sko.GA import GA
 
 
 class CentralController:
     def __init__(self, simulator):
         self.simulator = simulator
-        self.channel_assignment_dict = {i: None for i in range(config.NUMBER_OF_DRONES)}
+        self.channel_assignment_dict = {i: None for i in range(self.simulator.n_drones)}
         self.opt_interval = 1 * 1e6
+        self.path_loss = None  # path loss between all pairs of drones, the drones do not move during an optimization
         self.simulator.env.process(self.optimize_periodically())
 
     def optimize_periodically(self):
@@ -18,34 +19,37 @@ class CentralController:
 
     def _optimize(self):
         """Channel assignment using genetic algorithm"""
+        self.path_loss = path_loss_array(self.simulator.drone_states.distance_matrix())
+        np.fill_diagonal(self.path_loss, 0)  # a drone does not interfere with itself
+
         best_x = self._dca_ga()
 
         self.channel_assignment_dict.update(zip(self.channel_assignment_dict.keys(), best_x))
 
     def _fitness_fun_ga(self, x):
         """Fitness function of the genetic algorithm, the goal is to minimize the total interference at all drones"""
-        fitness = 0
         c = 0.5  # overlapping channel factor
+        x = np.asarray(x)
 
-        for drone1 in self.simulator.drones:  # viewed as the potential receiver
-            for drone2 in self.simulator.drones:  # viewed as the potential interference source
-                if drone1.identifier != drone2.identifier:
-                    w = max(1 - abs(x[drone1.identifier] - x[drone2.identifier]) * c, 0)
-
-                    interference_link_path_loss = general_path_loss(drone1, drone2)
-                    fitness += w * (config.TRANSMITTING_POWER * interference_link_path_loss) * 1e8
+        # row: the potential receiver, column: the potential interference source
+        w = np.maximum(1 - np.abs(x[:, np.newaxis] - x[np.newaxis, :]) * c, 0)
+        fitness = (w * (config.TRANSMITTING_POWER * self.path_loss) * 1e8).sum()
 
         return fitness
 
     def _dca_ga(self):
+        # scikit-opt is only needed by the dynamic channel assignment, and it sets the start method of multiprocessing
+        # when it is imported, so it is imported here rather than at module level
+        from sko.GA import GA
+
         ga = GA(
             func=self._fitness_fun_ga,
-            n_dim=config.NUMBER_OF_DRONES,
+            n_dim=self.simulator.n_drones,
             size_pop=50,
             max_iter=200,
             prob_mut=0.1,
-            lb=[1] * config.NUMBER_OF_DRONES,
-            ub=[14] * config.NUMBER_OF_DRONES,
+            lb=[1] * self.simulator.n_drones,
+            ub=[14] * self.simulator.n_drones,
             precision=1)
 
         best_x, best_y = ga.run()
@@ -1,4 +1,5 @@
 import random
+import numpy as np
 
 
 class ChannelAssigner:
@@ -23,7 +24,7 @@ class ChannelAssigner:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2025/3/30
-    Updated at: 2025/4/1
+    Updated at: 2025/5/12
     """
 
     def __init__(self, simulator, my_drone, mode="IEEE_802_11b"):
@@ -63,5 +64,13 @@ class ChannelAssigner:
             print('Currently not support~ We are working on it.')
             return -1
 
+    def adjacent_channel_interference_matrix(self, channel_ids1, channel_ids2):
+        """Vectorized version of "adjacent_channel_interference_check", the two arrays are broadcast"""
+        if self.mode == "IEEE_802_11b":
+            return np.abs(np.subtract(channel_ids1, channel_ids2)) < 5
+        else:
+            print('Currently not support~ We are working on it.')
+            return -1
+
     def channel_assign(self):
         return self._random_ondemand_assignment()
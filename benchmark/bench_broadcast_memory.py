@@ -0,0 +1,81 @@
+"""
+Memory of broadcasting: one copy of the message per receiver versus one message shared by all the inboxes
+
+Every drone broadcasts a hello packet in the same round, and the peak memory (traced by "tracemalloc") is recorded
+until all the messages have been delivered to the inboxes
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_broadcast_memory
+"""
+
+import copy
+import tracemalloc
+import simpy
+from utils import config
+from phy.channel import Channel
+
+
+class HelloPacket:
+    def __init__(self, channel_id):
+        self.packet_length = config.HELLO_PACKET_LENGTH
+        self.channel_id = channel_id
+
+
+def copying_broadcast(n_drones, packets):
+    """The broadcast before the messages were shared, each inbox receives its own copy of the message"""
+
+    pipes = {i: [] for i in range(n_drones)}
+
+    for transmitter, packet in enumerate(packets):
+        message = [packet, 0, transmitter, 0, packet.channel_id]
+        for key in pipes.keys():
+            value_copy = copy.copy(message)  # must be a copy of "value"
+            pipes[key].append(value_copy)
+
+    return pipes
+
+
+def shared_broadcast(n_drones, packets):
+    """The messages are shared by all the inboxes, and delivered at the end of transmission"""
+
+    env = simpy.Environment()
+    channel = Channel(env)
+    for i in range(n_drones):
+        channel.create_inbox_for_receiver(i)
+
+    for transmitter, packet in enumerate(packets):
+        transmitting_time = packet.packet_length / config.BIT_RATE * 1e6
+        channel.broadcast_put((packet, env.now, transmitter, env.now + transmitting_time, packet.channel_id))
+
+    env.run()
+
+    return channel.pipes
+
+
+def peak_memory(function, n_drones):
+    packets = [HelloPacket(1) for _ in range(n_drones)]
+
+    tracemalloc.start()
+    pipes = function(n_drones, packets)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak, pipes
+
+
+if __name__ == "__main__":
+    print('%8s %18s %18s %9s' % ('drones', 'copying (KiB)', 'shared (KiB)', 'ratio'))
+
+    for n_drones in [15, 50, 100, 200, 500]:
+        copying_peak, copying_pipes = peak_memory(copying_broadcast, n_drones)
+        shared_peak, shared_pipes = peak_memory(shared_broadcast, n_drones)
+
+        # every inbox holds one message from each drone in both cases
+        for i in range(n_drones):
+            assert [item[2] for item in shared_pipes[i]] == [item[2] for item in copying_pipes[i]]
+
+        # and there is only one message per broadcast
+        assert len({id(item) for inbox in shared_pipes.values() for item in inbox}) == n_drones
+
+        print('%8d %18.1f %18.1f %8.1fx' % (n_drones, copying_peak / 1024, shared_peak / 1024,
+                                           copying_peak / shared_peak))
@@ -0,0 +1,75 @@
+"""
+Scaling of carrier sensing: full scan of "channel_states" versus the busy-transmitter spatial index
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_carrier_sense
+"""
+
+import math
+import random
+import timeit
+import simpy
+from types import SimpleNamespace
+from utils import config
+from utils.util_function import check_channel_availability
+from phy.carrier_sense import CarrierSense
+
+
+def build_scenario(n_drones, busy_ratio, map_scale, seed=2025):
+    rng = random.Random(seed)
+    env = simpy.Environment()
+    simulator = SimpleNamespace(env=env, drones=[],
+                                channel_states={i: simpy.Resource(env, capacity=1) for i in range(n_drones)})
+    simulator.carrier_sense = CarrierSense(simulator)
+
+    for i in range(n_drones):
+        coords = (rng.uniform(0, config.MAP_LENGTH * map_scale), rng.uniform(0, config.MAP_WIDTH * map_scale),
+                  rng.uniform(0, config.MAP_HEIGHT))
+        simulator.drones.append(SimpleNamespace(identifier=i, coords=coords))
+
+    for i in rng.sample(range(n_drones), int(n_drones * busy_ratio)):
+        simulator.channel_states[i].request()  # the request is granted at once, so the drone becomes busy
+        simulator.carrier_sense.channel_occupied(simulator.drones[i])
+
+    return simulator
+
+
+def measure(simulator):
+    senders = simulator.drones
+    carrier_sense = simulator.carrier_sense
+
+    for sender in senders:
+        assert (carrier_sense.check_channel_availability(sender) ==
+                check_channel_availability(simulator.channel_states, sender, simulator.drones))
+
+    def full_scan():
+        for drone in senders:
+            check_channel_availability(simulator.channel_states, drone, simulator.drones)
+
+    def indexed():
+        for drone in senders:
+            carrier_sense.check_channel_availability(drone)
+
+    full_scan_time = min(timeit.Timer(full_scan).repeat(5, 3)) / 3 / len(senders)
+    indexed_time = min(timeit.Timer(indexed).repeat(5, 3)) / 3 / len(senders)
+
+    return full_scan_time, indexed_time
+
+
+if __name__ == "__main__":
+    print('%8s %12s %8s %16s %14s %9s' % ('drones', 'map', 'busy', 'full scan (us)', 'indexed (us)', 'speedup'))
+
+    for n_drones in [15, 50, 100, 200, 500]:
+        # default map, and a map whose area grows with the number of drones (constant density)
+        for map_name, map_scale, busy_ratio in [('default', 1, 0), ('default', 1, 0.02), ('default', 1, 0.1),
+                                                ('scaled', math.sqrt(n_drones / 15), 0.02),
+                                                ('scaled', math.sqrt(n_drones / 15), 0.1)]:
+            if busy_ratio and int(n_drones * busy_ratio) == 0:
+                continue
+
+            simulator = build_scenario(n_drones, busy_ratio=busy_ratio, map_scale=map_scale)
+            full_scan_time, indexed_time = measure(simulator)
+
+            print('%8d %12s %8d %16.2f %14.2f %8.1fx' %
+                  (n_drones, map_name, len(simulator.carrier_sense.busy_transmitters),
+                   full_scan_time * 1e6, indexed_time * 1e6, full_scan_time / indexed_time))
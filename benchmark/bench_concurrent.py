@@ -0,0 +1,87 @@
+"""
+Several simulations in one process: the results of running them one after another, in threads, and interleaved in one
+asyncio event loop should be exactly the same
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_concurrent
+"""
+
+import time
+import asyncio
+import threading
+import simpy
+from simulator.simulator import Simulator, run_headless
+
+CASES = [dict(seed=2025, n_drones=15), dict(seed=7, n_drones=20), dict(seed=3, n_drones=10)]
+SIM_TIME = 0.5e6
+
+
+def statistics_state(statistics):
+    """The whole state of the online statistics, which depends on the order of the samples too"""
+
+    quantiles = statistics.quantiles
+    return (statistics.count, statistics.mean, statistics.m2, statistics.minimum, statistics.maximum,
+            (quantiles.samples, quantiles.heights) if quantiles is not None else None)
+
+
+def fingerprint(metrics):
+    """Everything that is recorded, so that a mix-up of packet identifiers would be noticed"""
+
+    return (metrics.datapacket_generated_num, list(metrics.datapacket_arrived),
+            statistics_state(metrics.delivery_time), statistics_state(metrics.hop_cnt), metrics.collision_num,
+            metrics.control_packet_num, statistics_state(metrics.mac_delay))
+
+
+def run_sequentially():
+    return [fingerprint(run_headless(total_simulation_time=SIM_TIME, **case)) for case in CASES]
+
+
+def run_in_threads():
+    results = [None] * len(CASES)
+
+    def worker(i):
+        results[i] = fingerprint(run_headless(total_simulation_time=SIM_TIME, **CASES[i]))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(CASES))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results
+
+
+async def run_stepwise(seed, n_drones, steps_per_yield=1000):
+    env = simpy.Environment()
+    channel_states = {i: simpy.Resource(env, capacity=1) for i in range(n_drones)}
+    sim = Simulator(seed=seed, env=env, channel_states=channel_states, n_drones=n_drones,
+                    total_simulation_time=SIM_TIME, headless=True)
+
+    steps = 0
+    while env.peek() < SIM_TIME:
+        env.step()
+        steps += 1
+        if steps % steps_per_yield == 0:
+            await asyncio.sleep(0)  # let the other simulations proceed
+
+    return fingerprint(sim.metrics)
+
+
+async def run_interleaved():
+    return list(await asyncio.gather(*[run_stepwise(**case) for case in CASES]))
+
+
+if __name__ == "__main__":
+    for name, function in [('sequential', run_sequentially),
+                           ('threads', run_in_threads),
+                           ('asyncio', lambda: asyncio.run(run_interleaved()))]:
+        start = time.perf_counter()
+        results = function()
+        print('%-12s %6.1f s' % (name, time.perf_counter() - start))
+
+        if name == 'sequential':
+            expected = results
+        else:
+            assert results == expected, name
+
+    print('all the results are identical')
@@ -0,0 +1,91 @@
+"""
+DSDV control overhead: cost of processing the hello packets at 50, 100 and 200 drones. For each hello packet received,
+the incremental update (the records of the snapshot that are new to the receiver) is compared with the former update,
+which walked through every entry of the routing table of the sender. The former update is replayed on a scratch copy
+of the routing table of the receiver, so that both are timed on the same tables
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_dsdv_snapshot
+"""
+
+import time
+from benchmark.common import run_scenario
+from routing.dsdv.dsdv_routing_table import DsdvRoutingTable
+from utils import config
+
+
+def full_table_update(routing_table, src_drone, sender_table, cur_time):
+    """The former "DsdvRoutingTable.update_item", kept as the reference"""
+
+    for dst_id in sender_table.keys():
+        metric = sender_table[dst_id][1]
+        seq_num = sender_table[dst_id][2]
+        if dst_id not in routing_table.keys():
+            routing_table[dst_id] = [src_drone.identifier, metric+1, seq_num, cur_time]
+        elif seq_num > routing_table[dst_id][2]:
+            routing_table[dst_id] = [src_drone.identifier, metric+1, seq_num, cur_time]
+        elif seq_num == routing_table[dst_id][2]:
+            if metric < routing_table[dst_id][1]:
+                routing_table[dst_id] = [src_drone.identifier, metric+1, seq_num, cur_time]
+
+
+class Probe:
+    def __init__(self):
+        self.hellos = 0
+        self.full_entries = 0
+        self.delta_records = 0
+        self.full_time = 0
+        self.delta_time = 0
+
+    def install(self):
+        incremental_update = DsdvRoutingTable.update_item
+        probe = self
+
+        def update_item(table, packet, cur_time):
+            if packet.src_drone is table.my_drone:
+                return incremental_update(table, packet, cur_time)
+
+            snapshot = packet.snapshot
+            last_version = table.applied.get(packet.src_drone.identifier, 0)
+
+            scratch = {dst_id: list(entry) for dst_id, entry in table.routing_table.items()}
+            begin = time.perf_counter()
+            full_table_update(scratch, packet.src_drone, packet.routing_table.routing_table, cur_time)
+            probe.full_time += time.perf_counter() - begin
+
+            begin = time.perf_counter()
+            updated = incremental_update(table, packet, cur_time)
+            probe.delta_time += time.perf_counter() - begin
+
+            # both updates reach the same routes, apart from the equal-cost next hops
+            for dst_id, entry in scratch.items():
+                assert table.routing_table[dst_id][1:3] == entry[1:3]
+
+            probe.hellos += 1
+            probe.full_entries += len(snapshot.entries)
+            probe.delta_records += sum(1 for item in snapshot.entries.values() if item[2] > last_version)
+            return updated
+
+        DsdvRoutingTable.update_item = update_item
+        return incremental_update
+
+
+if __name__ == "__main__":
+    config.ROUTING_PROTOCOL = 'Dsdv'
+
+    print('%8s %10s %16s %16s %14s %14s' % ('drones', 'hellos', 'entries (full)', 'records (delta)', 'full (us)',
+                                            'delta (us)'))
+
+    for n_drones, sim_time in [(50, 2e6), (100, 1e6), (200, 0.75e6)]:
+        probe = Probe()
+        original = probe.install()
+        try:
+            run_scenario(n_drones=n_drones, sim_time=sim_time)
+        finally:
+            DsdvRoutingTable.update_item = original
+
+        # entries examined and time spent per hello packet received
+        print('%8d %10d %16.1f %16.1f %14.2f %14.2f' % (n_drones, probe.hellos, probe.full_entries / probe.hellos,
+                                                        probe.delta_records / probe.hellos,
+                                                        probe.full_time / probe.hellos * 1e6,
+                                                        probe.delta_time / probe.hellos * 1e6))
@@ -0,0 +1,191 @@
+"""
+Purging the tables with expiry heaps:
+    1) "ExpiringTable" is checked against a plain dictionary that is scanned entirely, with random updates, removals
+       and purges, for both expiry conditions ("<" and "<=")
+    2) the purge of the neighbor tables (1000 neighbors, a few of them expire at each purge) is timed with the heap and
+       with the former scan
+    3) every purge of the DSDV routing tables is replayed with the former one (which walked through the whole routing
+       table for each expired entry) on a scratch copy of the routing table: both must produce the same routing table
+       and the same flag. This is done with a few tables exchanging hello packets at random (so that many routes
+       expire), then during DSDV simulations at 50 and 100 drones, where the purges are also timed
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_expiring_table
+"""
+
+import random
+import time
+from types import SimpleNamespace
+from benchmark.common import run_scenario
+from routing.dsdv.dsdv_routing_table import DsdvRoutingTable
+from utils import config
+from utils.expiring_table import ExpiringTable
+
+
+def check_expiring_table(inclusive, rng, n_steps=20000, n_keys=50, entry_life_time=10):
+    expiry = ExpiringTable(entry_life_time, inclusive)
+    reference = dict()
+    now = 0
+
+    for _ in range(n_steps):
+        now += rng.randint(0, 2)
+        action = rng.random()
+        key = rng.randrange(n_keys)
+
+        if action < 0.6:
+            expiry.update(key, now)
+            reference[key] = now
+        elif action < 0.7:
+            expiry.remove(key)
+            reference.pop(key, None)
+        else:
+            expired = expiry.pop_expired(now)
+            expected = [key for key, updated_time in reference.items()
+                        if (updated_time + entry_life_time <= now if inclusive else updated_time + entry_life_time < now)]
+            assert sorted(expired) == sorted(expected)
+            for key in expected:
+                del reference[key]
+
+        assert len(expiry) == len(reference)
+
+
+def time_neighbor_table_purge(n_neighbors=1000, n_purges=2000, entry_life_time=1e6):
+    expiry = ExpiringTable(entry_life_time)
+    neighbor_table = dict()
+    rng = random.Random(1)
+
+    for drone_id in range(n_neighbors):
+        updated_time = rng.uniform(0, entry_life_time)
+        neighbor_table[drone_id] = [None, updated_time]
+        expiry.update(drone_id, updated_time)
+
+    # a few neighbors expire at each purge, and are heard again right away
+    now = entry_life_time
+    scan_time = 0
+    heap_time = 0
+    for _ in range(n_purges):
+        now += entry_life_time / n_purges
+
+        begin = time.perf_counter()
+        expected = [key for key in list(neighbor_table) if neighbor_table[key][1] + entry_life_time < now]
+        scan_time += time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        expired = expiry.pop_expired(now)
+        heap_time += time.perf_counter() - begin
+
+        assert sorted(expired) == sorted(expected)
+        for key in expired:
+            neighbor_table[key] = [None, now]
+            expiry.update(key, now)
+
+    return scan_time / n_purges, heap_time / n_purges
+
+
+def former_purge(table, routing_table, now):
+    """The former "DsdvRoutingTable.purge", applied to "routing_table" (a copy of the routing table of "table")"""
+
+    def get_updated_time(drone_id):
+        next_hop_id, metric, _, updated_time = routing_table[drone_id]
+        if next_hop_id != table.my_drone.identifier and metric != float('inf'):
+            return max(updated_time, table.last_heard.get(next_hop_id, updated_time))
+        else:
+            return updated_time
+
+    flag = 0
+    for key in list(routing_table):
+        if key is not table.my_drone.identifier:
+            if get_updated_time(key) + table.entry_life_time < now:
+                expired_next_hop = routing_table[key][0]
+
+                for key2 in list(routing_table):
+                    if routing_table[key2][0] == expired_next_hop:
+                        routing_table[key2][1] = float('inf')
+                        routing_table[key2][2] += 1
+                        routing_table[key2][3] = now
+
+                flag = 1
+
+    return flag
+
+
+class Probe:
+    def __init__(self):
+        self.purges = 0
+        self.flags = 0
+        self.former_time = 0
+        self.heap_time = 0
+
+    def install(self):
+        heap_purge = DsdvRoutingTable.purge
+        probe = self
+
+        def purge(table):
+            scratch = {dst_id: list(entry) for dst_id, entry in table.routing_table.items()}
+            begin = time.perf_counter()
+            expected_flag = former_purge(table, scratch, table.env.now)
+            probe.former_time += time.perf_counter() - begin
+
+            begin = time.perf_counter()
+            flag = heap_purge(table)
+            probe.heap_time += time.perf_counter() - begin
+
+            assert flag == expected_flag
+            assert dict(table.routing_table) == scratch
+
+            probe.purges += 1
+            probe.flags += flag
+            return flag
+
+        DsdvRoutingTable.purge = purge
+        return heap_purge
+
+
+def check_dsdv_purge(rng, n_tables=12, n_steps=5000):
+    env = SimpleNamespace(now=0)
+    drones = [SimpleNamespace(identifier=i) for i in range(n_tables)]
+    tables = [DsdvRoutingTable(env, drone) for drone in drones]
+
+    for _ in range(n_steps):
+        env.now += rng.uniform(0, 0.3 * 1e6)
+
+        sender = rng.randrange(n_tables)
+        tables[sender].increase_sequence_number()
+        packet = SimpleNamespace(src_drone=drones[sender], snapshot=tables[sender].snapshot())
+
+        for receiver in rng.sample(range(n_tables), rng.randint(0, 3)):
+            tables[receiver].update_item(packet, env.now)
+
+        tables[rng.randrange(n_tables)].purge()
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    check_expiring_table(False, rng)
+    check_expiring_table(True, rng)
+
+    scan_time, heap_time = time_neighbor_table_purge()
+    print('neighbor table purge (1000 neighbors): scan %.2f us, heap %.2f us' % (scan_time * 1e6, heap_time * 1e6))
+
+    probe = Probe()
+    original = probe.install()
+    try:
+        check_dsdv_purge(rng)
+    finally:
+        DsdvRoutingTable.purge = original
+    print('random hello packets: %d purges checked, %d with broken links' % (probe.purges, probe.flags))
+
+    config.ROUTING_PROTOCOL = 'Dsdv'
+    print('%8s %10s %14s %14s %14s' % ('drones', 'purges', 'broken links', 'former (us)', 'heap (us)'))
+
+    for n_drones, sim_time in [(50, 4e6), (100, 3e6)]:
+        probe = Probe()
+        original = probe.install()
+        try:
+            run_scenario(n_drones=n_drones, sim_time=sim_time)
+        finally:
+            DsdvRoutingTable.purge = original
+
+        print('%8d %10d %14d %14.2f %14.2f' % (n_drones, probe.purges, probe.flags,
+                                               probe.former_time / probe.purges * 1e6,
+                                               probe.heap_time / probe.purges * 1e6))
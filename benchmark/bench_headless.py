@@ -0,0 +1,61 @@
+"""
+Headless batch-run mode: start-up time (importing the simulator) and the per-run cost of the figures that a run with
+plotting renders, i.e., the scatter plots at the beginning and at the end of the simulation
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_headless
+"""
+
+import os
+import sys
+import time
+import subprocess
+from benchmark.common import run_scenario
+
+# what every run imported before the headless mode was introduced
+PLOTTING_IMPORTS = 'import matplotlib.pyplot, mpl_toolkits.mplot3d, visualization.scatter, simulator.simulator'
+HEADLESS_IMPORTS = 'import simulator.simulator; import sys; assert "matplotlib" not in sys.modules'
+
+
+def import_time(statement, repeat=5):
+    """Wall-clock time of a fresh interpreter that executes "statement", the best of several runs"""
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], check=True, env=dict(os.environ, MPLBACKEND='Agg'))
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def plotting_time(sim):
+    """Render the two scatter plots of a run with plotting, on a non-interactive backend"""
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from visualization.scatter import scatter_plot
+
+    start = time.perf_counter()
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection='3d')
+    for _ in range(2):
+        scatter_plot(sim, target_ax=ax)
+        fig.canvas.draw()
+    plt.close(fig)
+
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    plotting_import = import_time(PLOTTING_IMPORTS)
+    headless_import = import_time(HEADLESS_IMPORTS)
+
+    print('start-up (fresh interpreter + imports): with matplotlib %.2f s, headless %.2f s, saved %.2f s'
+          % (plotting_import, headless_import, plotting_import - headless_import))
+
+    print('%8s %16s %16s' % ('drones', 'run (s)', 'figures (s)'))
+    for n_drones in [15, 30]:
+        sim, env, wall_time = run_scenario(n_drones, sim_time=0.5e6)
+        print('%8d %16.2f %16.2f' % (n_drones, wall_time, plotting_time(sim)))
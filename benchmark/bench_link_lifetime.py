@@ -0,0 +1,66 @@
+"""
+Link lifetime prediction for all pairs of drones, from 50 to 1000 drones: "link_lifetime_matrix" (vectorized) is
+compared with calling "link_lifetime_predictor" for each pair. The drones are placed at random in the map with random
+velocities. Wherever the scalar function is defined, both must give the same result (up to rounding errors: the
+squares are computed with "pow" by python and with a multiplication by numpy)
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_link_lifetime
+"""
+
+import random
+import time
+import numpy as np
+from types import SimpleNamespace
+from phy.large_scale_fading import maximum_communication_range
+from routing.opar.opar import link_lifetime_predictor, link_lifetime_matrix
+from utils import config
+from utils.util_function import euclidean_distance_3d
+
+
+def random_drones(n_drones, rng):
+    drones = []
+    for _ in range(n_drones):
+        coords = [rng.uniform(0, config.MAP_LENGTH), rng.uniform(0, config.MAP_WIDTH),
+                  rng.uniform(0, config.MAP_HEIGHT)]
+        velocity = [rng.uniform(-config.BASE_SPEED, config.BASE_SPEED) for _ in range(3)]
+        drones.append(SimpleNamespace(coords=coords, velocity=velocity))
+
+    return drones
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    max_comm_range = maximum_communication_range()
+
+    print('%8s %12s %14s %14s %10s' % ('drones', 'links', 'scalar (ms)', 'matrix (ms)', 'speedup'))
+
+    for n_drones in [50, 100, 200, 500, 1000]:
+        drones = random_drones(n_drones, rng)
+
+        begin = time.perf_counter()
+        coords = np.array([drone.coords for drone in drones])
+        velocities = np.array([drone.velocity for drone in drones])
+        matrix = link_lifetime_matrix(coords, velocities, max_comm_range)
+        matrix_time = time.perf_counter() - begin
+
+        links = 0
+        scalar_time = 0
+        for i in range(n_drones):
+            for j in range(i + 1, n_drones):
+                begin = time.perf_counter()
+                try:
+                    delta_t = link_lifetime_predictor(drones[i], drones[j], max_comm_range)
+                except (ValueError, ZeroDivisionError):
+                    delta_t = None  # the drones never get within range of each other
+                scalar_time += time.perf_counter() - begin
+
+                assert matrix[i, j] == matrix[j, i]
+                if delta_t is not None:
+                    assert abs(matrix[i, j] - delta_t) <= 1e-9 * max(1.0, abs(delta_t)), (i, j, matrix[i, j], delta_t)
+                if euclidean_distance_3d(drones[i].coords, drones[j].coords) < max_comm_range:
+                    assert delta_t is not None and matrix[i, j] > 0
+                    links += 1
+
+        print('%8d %12d %14.2f %14.2f %10.1f' % (n_drones, links, scalar_time * 1e3, matrix_time * 1e3,
+                                                 scalar_time / matrix_time))
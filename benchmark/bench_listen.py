@@ -0,0 +1,21 @@
+"""
+Number of events scheduled by the CSMA/CA backoff, compared with the other processes of the simulation
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_listen [n_drones] [sim_time_in_seconds]
+"""
+
+import sys
+from benchmark.common import run_scenario
+
+
+if __name__ == "__main__":
+    n_drones = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    sim_time = float(sys.argv[2]) * 1e6 if len(sys.argv) > 2 else 2e6
+
+    sim, env, wall_time = run_scenario(n_drones, sim_time)
+
+    print('drones: %d, simulated time: %.1f s, wall-clock time: %.2f s' % (n_drones, sim_time / 1e6, wall_time))
+    print('events scheduled: %d' % env.event_count)
+    for name, count in sorted(env.events_by_process.items(), key=lambda item: -item[1]):
+        print('  %-45s %10d' % (name, count))
@@ -0,0 +1,35 @@
+"""
+MAC bookkeeping: number of "mac_send" processes launched and number of "wait_ack" states kept by all the drones as the
+simulation goes on. The string-keyed dictionaries used before kept one entry per packet id for each of them, while the
+"AckWaitTable" only keeps the waits that have not finished
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_mac_state
+"""
+
+import simpy
+from utils import config
+from simulator.simulator import Simulator
+
+
+if __name__ == "__main__":
+    n_drones = config.NUMBER_OF_DRONES
+    sim_time = 4e6
+
+    env = simpy.Environment()
+    channel_states = {i: simpy.Resource(env, capacity=1) for i in range(n_drones)}
+    sim = Simulator(seed=2025, env=env, channel_states=channel_states, n_drones=n_drones,
+                    total_simulation_time=sim_time, headless=True)
+
+    print('%10s %18s %18s %18s' % ('time (s)', 'mac_send launched', 'ack waits kept', 'max per drone'))
+
+    for step in range(1, 9):
+        env.run(until=sim_time * step / 8)
+
+        launched = sum(drone.mac_process_count for drone in sim.drones)
+        kept = [len(drone.mac_protocol.ack_waits) for drone in sim.drones]
+
+        print('%10.1f %18d %18d %18d' % (env.now / 1e6, launched, sum(kept), max(kept)))
+
+        # each drone waits for at most one ACK at a time (stop-and-wait), plus the re-transmissions in progress
+        assert max(kept) <= config.MAX_RETRANSMISSION_ATTEMPT
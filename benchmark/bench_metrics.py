@@ -0,0 +1,160 @@
+"""
+Online metrics:
+    1) "RunningStatistics" is checked against NumPy on streams of 1e5 samples (exponential, log-normal, uniform and
+       the end-to-end delays of a simulation): the mean and the variance must agree to 1e-9, and the estimated
+       50th, 95th and 99th percentiles must be in order and within a few percent of the exact ones
+    2) "Bitset" is checked against a python set, with random identifiers
+    3) the memory taken by the metrics of a long run is measured (with tracemalloc) for the former metrics, which kept
+       every sample in dictionaries and lists, and for the online ones: 1e6 data packets are generated, 80% of them
+       arrive (some of them twice), and each of them has a MAC delay. The time to record them is reported too, the
+       online statistics cost a few microseconds per sample, i.e., a few milliseconds per simulated second
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_metrics
+"""
+
+import random
+import time
+import tracemalloc
+import numpy as np
+from collections import defaultdict
+from types import SimpleNamespace
+from benchmark.common import run_scenario
+from simulator.metrics import Metrics
+from utils.bitset import Bitset
+from utils.online_statistics import RunningStatistics
+
+PERCENTILES = (0.5, 0.95, 0.99)
+N_DRONES = 100  # sources of the data packets of the long run
+
+
+class SampleList(list):
+    add = list.append
+
+
+class FormerMetrics:
+    """The samples that the former "Metrics" kept (see "record_delivery" for the online ones)"""
+
+    def __init__(self):
+        self.datapacket_arrived = set()
+        self.deliver_time_dict = defaultdict()
+        self.throughput_dict = defaultdict()
+        self.hop_cnt_dict = defaultdict()
+        self.mac_delay = SampleList()
+
+    def record_delivery(self, packet_id, src_id, latency, packet_length, hop_count):
+        self.deliver_time_dict[packet_id] = latency
+        self.throughput_dict[packet_id] = packet_length / (latency / 1e6)
+        self.hop_cnt_dict[packet_id] = hop_count
+        self.datapacket_arrived.add(packet_id)
+
+
+def check_statistics(name, samples, statistics=None, tolerance=0.05):
+    """The online statistics of "samples", computed here if "statistics" is not given"""
+
+    if statistics is None:
+        statistics = RunningStatistics(PERCENTILES)
+        for x in samples:
+            statistics.add(x)
+
+    samples = np.asarray(samples)
+    assert statistics.count == len(samples)
+    assert np.isclose(statistics.mean, np.mean(samples), rtol=1e-9, atol=0)
+    assert np.isclose(statistics.variance(), np.var(samples, ddof=1), rtol=1e-9, atol=0)
+    assert statistics.minimum == samples.min() and statistics.maximum == samples.max()
+
+    estimates = [statistics.quantile(p) for p in PERCENTILES]
+    exact = np.percentile(samples, [p * 100 for p in PERCENTILES])
+    assert estimates == sorted(estimates)
+
+    errors = [abs(estimate - value) / value for estimate, value in zip(estimates, exact)]
+    assert max(errors) < tolerance, errors
+
+    print('%24s %8d samples, relative error of p50/p95/p99: %s' %
+          (name, len(samples), ' '.join('%.4f' % error for error in errors)))
+
+
+def check_bitset(rng, n_operations=100000, largest=50000):
+    bitset = Bitset()
+    reference = set()
+
+    for _ in range(n_operations):
+        element = rng.randrange(largest)
+        if rng.random() < 0.5:
+            bitset.add(element)
+            reference.add(element)
+        else:
+            assert (element in bitset) == (element in reference)
+
+    assert len(bitset) == len(reference)
+    assert list(bitset) == sorted(reference)
+
+
+def record_long_run(metrics, n_packets, rng_seed=1):
+    """Deliveries and MAC delays of "n_packets" data packets, in the order in which a simulation could report them"""
+
+    rng = random.Random(rng_seed)
+    for packet_id in range(1, n_packets + 1):
+        if rng.random() < 0.8:
+            latency = rng.expovariate(1 / 20000)
+            hop_count = rng.randint(1, 6)
+            for _ in range(2 if rng.random() < 0.05 else 1):  # duplicates, e.g., when an ACK is lost
+                if packet_id not in metrics.datapacket_arrived:
+                    metrics.record_delivery(packet_id, packet_id % N_DRONES, latency, 8000, hop_count)
+
+        metrics.mac_delay.add(rng.expovariate(1 / 5))
+
+
+def measure(make_metrics, n_packets):
+    """The metrics of the long run, the memory they take and the time to record them (without tracemalloc)"""
+
+    start = time.perf_counter()
+    record_long_run(make_metrics(), n_packets)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    metrics = make_metrics()
+    record_long_run(metrics, n_packets)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return metrics, memory, elapsed
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(2025)
+    check_statistics('exponential', rng.exponential(20000, 100000).tolist())
+    check_statistics('log-normal', rng.lognormal(3, 1, 100000).tolist())
+    check_statistics('uniform', rng.uniform(100, 200, 100000).tolist())
+
+    # the end-to-end delays of a simulation, recorded on the side
+    latencies = []
+    record_delivery = Metrics.record_delivery
+
+    def recording_delivery(self, packet_id, src_id, latency, packet_length, hop_count):
+        first_arrival = record_delivery(self, packet_id, src_id, latency, packet_length, hop_count)
+        if first_arrival:
+            latencies.append(latency)
+        return first_arrival
+
+    Metrics.record_delivery = recording_delivery
+    try:
+        sim, env, wall_time = run_scenario(n_drones=30, sim_time=5e6)
+    finally:
+        Metrics.record_delivery = record_delivery
+
+    check_statistics('simulated end-to-end delay', latencies, sim.metrics.delivery_time, tolerance=0.2)
+
+    check_bitset(random.Random(3))
+    print('Bitset: same answers as a python set')
+
+    n_packets = 10 ** 6
+    print('%d data packets: %16s %14s' % (n_packets, 'memory (MB)', 'time (s)'))
+    former, former_memory, former_time = measure(FormerMetrics, n_packets)
+    online, online_memory, online_time = measure(lambda: Metrics(SimpleNamespace(n_drones=N_DRONES)), n_packets)
+    print('%21s %16.2f %14.2f' % ('former', former_memory / 1e6, former_time))
+    print('%21s %16.2f %14.2f' % ('online', online_memory / 1e6, online_time))
+
+    assert len(online.datapacket_arrived) == len(former.datapacket_arrived)
+    assert np.isclose(online.delivery_time.mean, np.mean(list(former.deliver_time_dict.values())), rtol=1e-9)
+    assert np.isclose(online.mac_delay.mean, np.mean(former.mac_delay), rtol=1e-9)
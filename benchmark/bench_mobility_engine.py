@@ -0,0 +1,266 @@
+"""
+Mobility of 100 to 1000 drones with the three mobility models, without any communication. All the drones are now moved
+by a single process of the mobility engine, with NumPy operations on the positions and velocities of all of them,
+instead of one SimPy process per drone. The former per-drone processes are replayed on a second set of drones, with the
+same seed: at every step, both must give the same positions, velocities, directions, pitches and residual energies.
+They are exactly the same with the Gauss-Markov and random walk models, whose random velocities are still computed
+for each drone in python. The random waypoint model computes the distances to the waypoints with NumPy, whose square
+and square root may differ from those of python ("**", i.e., "pow" of the C library) by one unit in the last place, so
+its velocities are only compared up to a relative tolerance of 1e-9. This also reports the wall-clock time of both to
+simulate the mobility
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_mobility_engine
+"""
+
+import math
+import random
+import time
+import numpy as np
+import simpy
+from types import SimpleNamespace
+from energy.energy_model import EnergyModel
+from entities.drone_states import DroneStates
+from mobility import start_coords
+from mobility.gauss_markov_3d import GaussMarkov3D
+from mobility.mobility_engine import MobilityEngine
+from mobility.random_walk_3d import RandomWalk3D
+from mobility.random_waypoint_3d import RandomWaypoint3D
+from topology.connectivity_graph import ConnectivityGraph
+from utils import config
+from utils.util_function import euclidean_distance_3d
+
+
+def former_gauss_markov(model, drone):
+    """The former "GaussMarkov3D.mobility_update" (without the trajectory)"""
+
+    env = drone.simulator.env
+    while True:
+        cur_position = drone.coords
+        cur_velocity = drone.velocity
+        direction_mean = drone.direction_mean
+        pitch_mean = drone.pitch_mean
+
+        next_position = [cur_position[k] + cur_velocity[k] * model.position_update_interval / 1e6 for k in range(3)]
+
+        if env.now % model.direction_update_interval == 0:
+            cur_speed = ((cur_velocity[0] ** 2) + (cur_velocity[1] ** 2) + (cur_velocity[2] ** 2)) ** 0.5
+            alpha2 = 1.0 - model.alpha
+            alpha3 = math.sqrt(1.0 - model.alpha * model.alpha)
+
+            next_speed = (model.alpha * cur_speed + alpha2 * drone.velocity_mean +
+                          alpha3 * model.rng_mobility.normalvariate(0, 1))
+            next_direction = (model.alpha * drone.direction + alpha2 * direction_mean +
+                              alpha3 * model.rng_mobility.normalvariate(0, 1))
+            next_pitch = (model.alpha * drone.pitch + alpha2 * pitch_mean +
+                          alpha3 * model.rng_mobility.normalvariate(0, 1))
+
+            next_velocity = [next_speed * math.cos(next_direction) * math.cos(next_pitch),
+                             next_speed * math.sin(next_direction) * math.cos(next_pitch),
+                             next_speed * math.sin(next_pitch)]
+        else:
+            next_velocity = list(cur_velocity)
+
+        if next_position[0] < model.min_x + model.b1 or next_position[0] > model.max_x - model.b1:
+            next_velocity[0] = -next_velocity[0]
+            direction_mean = np.pi - direction_mean
+        if next_position[1] < model.min_y + model.b2 or next_position[1] > model.max_y - model.b2:
+            next_velocity[1] = -next_velocity[1]
+            direction_mean = -direction_mean
+        if next_position[2] < model.min_z + model.b3 or next_position[2] > model.max_z - model.b3:
+            next_velocity[2] = -next_velocity[2]
+            pitch_mean = -pitch_mean
+
+        next_position[0] = max(model.min_x + model.b1, min(next_position[0], model.max_x - model.b1))
+        next_position[1] = max(model.min_y + model.b2, min(next_position[1], model.max_y - model.b2))
+        next_position[2] = max(model.min_z + model.b3, min(next_position[2], model.max_z - model.b3))
+
+        drone.coords = next_position
+        drone.direction = direction_mean
+        drone.pitch = pitch_mean
+        drone.velocity = next_velocity
+        drone.direction_mean = direction_mean
+        drone.pitch_mean = pitch_mean
+
+        yield env.timeout(model.position_update_interval)
+        drone.residual_energy -= (model.position_update_interval / 1e6) * \
+            drone.energy_model.power_consumption(drone.speed)
+
+
+def former_random_walk(model, drone):
+    """The former "RandomWalk3D.mobility_update" (without the trajectory)"""
+
+    env = drone.simulator.env
+    while True:
+        cur_position = drone.coords
+        cur_velocity = drone.velocity
+
+        next_position = [cur_position[k] + cur_velocity[k] * model.position_update_interval / 1e6 for k in range(3)]
+
+        if env.now % model.travel_duration == 0:
+            cur_speed = ((cur_velocity[0] ** 2) + (cur_velocity[1] ** 2) + (cur_velocity[2] ** 2)) ** 0.5
+            drone.direction = model.rng_mobility.uniform(0, 2 * math.pi)
+            drone.pitch = model.rng_mobility.uniform(-math.pi / 2, math.pi / 2)
+
+            next_velocity = [cur_speed * math.cos(drone.direction) * math.cos(drone.pitch),
+                             cur_speed * math.sin(drone.direction) * math.cos(drone.pitch),
+                             cur_speed * math.sin(drone.pitch)]
+        else:
+            next_velocity = list(cur_velocity)
+
+        if next_position[0] < model.min_x + model.b1 or next_position[0] > model.max_x - model.b1:
+            next_velocity[0] = -next_velocity[0]
+        if next_position[1] < model.min_y + model.b2 or next_position[1] > model.max_y - model.b2:
+            next_velocity[1] = -next_velocity[1]
+        if next_position[2] < model.min_z + model.b3 or next_position[2] > model.max_z - model.b3:
+            next_velocity[2] = -next_velocity[2]
+
+        next_position[0] = max(model.min_x + model.b1, min(next_position[0], model.max_x - model.b1))
+        next_position[1] = max(model.min_y + model.b2, min(next_position[1], model.max_y - model.b2))
+        next_position[2] = max(model.min_z + model.b3, min(next_position[2], model.max_z - model.b3))
+
+        drone.coords = next_position
+        drone.velocity = next_velocity
+
+        yield env.timeout(model.position_update_interval)
+        drone.residual_energy -= (model.position_update_interval / 1e6) * \
+            drone.energy_model.power_consumption(drone.speed)
+
+
+def former_random_waypoint(model, drone):
+    """The former "RandomWaypoint3D.mobility_update" (without the trajectory)"""
+
+    env = drone.simulator.env
+    while True:
+        cur_position = drone.coords
+        target_waypoint, target_waypoint_idx = model.get_first_unvisited_waypoint()
+
+        distance = euclidean_distance_3d(cur_position, target_waypoint)
+        drone.velocity = [(target_waypoint[k] - cur_position[k]) / distance * drone.speed for k in range(3)]
+
+        next_position = [cur_position[k] + drone.velocity[k] * model.position_update_interval / 1e6 for k in range(3)]
+
+        if euclidean_distance_3d(next_position, target_waypoint) < 20:
+            model.waypoint_visited[target_waypoint_idx] = 1
+            model.pauses += 1
+            yield env.timeout(model.pause_time)
+
+        drone.coords = next_position
+        yield env.timeout(model.position_update_interval)
+        drone.residual_energy -= (model.position_update_interval / 1e6) * \
+            drone.energy_model.power_consumption(drone.speed)
+
+
+FORMER_PROCESSES = {GaussMarkov3D: former_gauss_markov, RandomWalk3D: former_random_walk,
+                    RandomWaypoint3D: former_random_waypoint}
+
+
+class MovingDrone(SimpleNamespace):
+    """Drone moved by the mobility engine, its residual energy is kept in the state store as in "Drone" """
+
+    @property
+    def residual_energy(self):
+        return self.simulator.drone_states.residual_energy[self.identifier]
+
+    def moved(self, coords, velocity):
+        self.velocity = velocity
+        self.coords = coords
+
+
+def build_fleet(env, model_class, n_drones, seed, with_engine):
+    """Drones that only move (as in "Drone.__init__"), with the mobility engine or with the former processes"""
+
+    simulator = SimpleNamespace(env=env, seed=seed, n_drones=n_drones, headless=True)
+    simulator.drone_states = DroneStates(n_drones)
+    simulator.connectivity = ConnectivityGraph(simulator)  # never built, the moving drones do not update it
+    simulator.mobility = MobilityEngine(simulator)
+
+    drones = []
+    for drone_id, coords in enumerate(start_coords.get_random_start_point_3d(seed, n_drones)):
+        rng_drone = random.Random(drone_id + seed)
+        direction = rng_drone.uniform(0, 2 * np.pi)
+        pitch = rng_drone.uniform(-0.05, 0.05)
+        speed = config.BASE_SPEED
+
+        velocity = [speed * math.cos(direction) * math.cos(pitch),
+                    speed * math.sin(direction) * math.cos(pitch),
+                    speed * math.sin(pitch)]
+
+        if with_engine:
+            drone = MovingDrone(identifier=drone_id, simulator=simulator, coords=coords, velocity=velocity,
+                                speed=speed, direction=direction, pitch=pitch, direction_mean=direction,
+                                pitch_mean=pitch, velocity_mean=speed, energy_model=EnergyModel())
+            simulator.drone_states.positions[drone_id] = coords
+            simulator.drone_states.velocities[drone_id] = velocity
+
+            drone.mobility_model = model_class(drone)
+        else:
+            drone = SimpleNamespace(identifier=drone_id, simulator=simulator, coords=coords, velocity=velocity,
+                                    speed=speed, direction=direction, pitch=pitch, direction_mean=direction,
+                                    pitch_mean=pitch, velocity_mean=speed, energy_model=EnergyModel(),
+                                    residual_energy=config.INITIAL_ENERGY)
+
+            register = MobilityEngine.register
+            MobilityEngine.register = lambda engine, model: None  # the former processes are started instead
+            try:
+                drone.mobility_model = model_class(drone)
+            finally:
+                MobilityEngine.register = register
+
+            drone.mobility_model.pauses = 0
+            env.process(FORMER_PROCESSES[model_class](drone.mobility_model, drone))
+
+        drones.append(drone)
+
+    return drones
+
+
+def state(drones):
+    return np.array([list(drone.coords) + list(drone.velocity) + [drone.direction, drone.pitch, drone.residual_energy]
+                     for drone in drones], dtype=float)
+
+
+def check(model_class, n_drones=50, sim_time=120 * 1e6, seed=2025):
+    env = simpy.Environment()
+    drones = build_fleet(env, model_class, n_drones, seed, with_engine=True)
+    former_drones = build_fleet(env, model_class, n_drones, seed, with_engine=False)
+
+    def compare():
+        yield env.timeout(1)  # once both have moved
+        while True:
+            if model_class is RandomWaypoint3D:
+                assert np.allclose(state(drones), state(former_drones), rtol=1e-9, atol=0)
+            else:
+                assert np.array_equal(state(drones), state(former_drones))
+            yield env.timeout(1 * 1e5)
+
+    env.process(compare())
+    env.run(until=sim_time)
+
+    if model_class is RandomWaypoint3D:
+        assert [drone.mobility_model.waypoint_visited for drone in drones] == \
+               [drone.mobility_model.waypoint_visited for drone in former_drones]
+        return sum(drone.mobility_model.pauses for drone in former_drones)
+
+
+def time_mobility(model_class, n_drones, with_engine, sim_time=10 * 1e6, seed=2025):
+    env = simpy.Environment()
+    build_fleet(env, model_class, n_drones, seed, with_engine)
+
+    begin = time.perf_counter()
+    env.run(until=sim_time)
+    return (time.perf_counter() - begin) / (sim_time / 1e6)
+
+
+if __name__ == "__main__":
+    for model_class in FORMER_PROCESSES:
+        pauses = check(model_class)
+        print('%s: same trajectories as the former processes%s' %
+              (model_class.__name__, '' if pauses is None else ' (%d pauses at waypoints)' % pauses))
+
+    print('%18s %8s %18s %18s' % ('model', 'drones', 'former (ms/s)', 'engine (ms/s)'))
+    for model_class in FORMER_PROCESSES:
+        for n_drones in [100, 500, 1000]:
+            former_time = time_mobility(model_class, n_drones, with_engine=False)
+            engine_time = time_mobility(model_class, n_drones, with_engine=True)
+            print('%18s %8d %18.2f %18.2f' % (model_class.__name__, n_drones, former_time * 1e3, engine_time * 1e3))
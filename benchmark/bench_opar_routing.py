@@ -0,0 +1,168 @@
+"""
+OPAR route computation at 50, 100 and 200 drones. At a given instant of the simulation, the path optimization of the
+source is run for many (source, destination) pairs with:
+    - the former implementation, which rebuilt the full cost matrix and ran an O(N^2) Dijkstra for every packet,
+    - the search on the shared connectivity graph (heap-based Dijkstra over the neighbor sets),
+    - the cached path, which is what the source uses as long as none of the links of the path breaks
+The paths found by the search on the connectivity graph must be the same as the ones of the former implementation
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_opar_routing
+"""
+
+import random
+import time
+import numpy as np
+from benchmark.common import run_scenario
+from phy.large_scale_fading import maximum_communication_range
+from routing.opar.opar import link_lifetime_predictor
+from utils import config
+from utils.util_function import euclidean_distance_3d
+
+
+def calculate_cost_matrix(drones, max_comm_range):
+    """The former "Opar.calculate_cost_matrix", kept as the reference"""
+
+    n_drones = len(drones)
+    cost = np.zeros((n_drones, n_drones))
+    cost.fill(np.inf)
+
+    for i in range(n_drones):
+        for j in range((i+1), n_drones):
+            if euclidean_distance_3d(drones[i].coords, drones[j].coords) < max_comm_range:
+                cost[i, j] = 1
+                cost[j, i] = 1
+
+    return cost
+
+
+def dijkstra(drones, cost, src_id, dst_id, minimum_link_lifetime, max_comm_range):
+    """The former "Opar.dijkstra", kept as the reference"""
+
+    n_drones = len(drones)
+    distance_list = [np.inf for _ in range(n_drones)]
+    distance_list[src_id] = 0
+
+    prev_list = [-1 for _ in range(n_drones)]
+    prev_list[src_id] = -2
+
+    visited_list = [False for _ in range(n_drones)]
+
+    for i in range(n_drones):
+        unvisited_list = [(index, value) for index, value in enumerate(distance_list) if not visited_list[index]]
+        min_distance_node, _ = min(unvisited_list, key=lambda x: x[1])
+
+        visited_list[min_distance_node] = True
+
+        for j in range(n_drones):
+            if (visited_list[j] is False) and (cost[min_distance_node, j] != np.inf):
+                delta_temp = link_lifetime_predictor(drones[min_distance_node], drones[j], max_comm_range)
+
+                if delta_temp <= minimum_link_lifetime:
+                    cost[min_distance_node, j] = np.inf
+                    cost[j, min_distance_node] = np.inf
+
+                alt = distance_list[min_distance_node] + cost[min_distance_node, j]
+                if alt < distance_list[j]:
+                    distance_list[j] = alt
+                    prev_list[j] = min_distance_node
+
+    current_node = dst_id
+    path = [dst_id]
+
+    while current_node != -2:
+        current_node = prev_list[current_node]
+
+        if current_node != -1:
+            path.insert(0, current_node)
+        else:
+            path = []
+            break
+
+    return path
+
+
+def reference_routing_path(drones, src_id, dst_id, w1=0.5, w2=0.5):
+    """The former source-side optimization of "Opar.next_hop_selection", returns the path without the source"""
+
+    max_comm_range = maximum_communication_range()
+    cost = calculate_cost_matrix(drones, max_comm_range)
+    best_obj = 0
+    best_path = [src_id, src_id]
+    minimum_link_lifetime = 0
+
+    first = True
+    while True:
+        path = dijkstra(drones, cost, src_id, dst_id, minimum_link_lifetime, max_comm_range)
+        if len(path) == 0:
+            break
+
+        path.pop(0)
+        total_cost = 0
+        t = 0
+        minimum_link_lifetime = 1e11
+
+        for link in range(len(path) - 1):
+            total_cost += cost[path[link], path[link + 1]]
+            delta_t = link_lifetime_predictor(drones[path[link]], drones[path[link + 1]], max_comm_range)
+
+            if 1 / delta_t > t:
+                t = delta_t
+
+            if delta_t < minimum_link_lifetime:
+                minimum_link_lifetime = delta_t
+
+        obj = w1 * total_cost + w2 * t
+        if first or obj < best_obj:
+            best_obj = obj
+            best_path = path
+            first = False
+
+    best_path.pop(0)
+    return best_path
+
+
+if __name__ == "__main__":
+    config.ROUTING_PROTOCOL = 'Opar'
+    rng = random.Random(0)
+
+    print('%8s %8s %16s %16s %16s' % ('drones', 'pairs', 'former (ms)', 'graph (ms)', 'cached (us)'))
+
+    for n_drones, sim_time, n_pairs in [(50, 0.5e6, 100), (100, 0.3e6, 40), (200, 0.2e6, 10)]:
+        sim, env, _ = run_scenario(n_drones=n_drones, sim_time=sim_time)
+        drones = sim.drones
+        connectivity = sim.connectivity
+        opar = drones[0].routing_protocol
+
+        # the incrementally updated graph must match the one built from scratch
+        connectivity.get_neighbors(0)
+        max_comm_range = maximum_communication_range()
+        for drone in drones:
+            expected = {other.identifier for other in drones if other is not drone and
+                        euclidean_distance_3d(drone.coords, other.coords) < max_comm_range}
+            assert connectivity.neighbors[drone.identifier] == expected
+
+        pairs = [tuple(rng.sample(range(n_drones), 2)) for _ in range(n_pairs)]
+
+        former_time = 0
+        graph_time = 0
+        cached_time = 0
+        for src_id, dst_id in pairs:
+            begin = time.perf_counter()
+            expected = reference_routing_path(drones, src_id, dst_id)
+            former_time += time.perf_counter() - begin
+
+            begin = time.perf_counter()
+            path = opar.optimize_path(src_id, dst_id)
+            graph_time += time.perf_counter() - begin
+
+            routing_path = path[1:] if len(path) != 0 else [src_id]
+            assert routing_path == expected, (src_id, dst_id, routing_path, expected)
+
+            connectivity.cache_path(path)
+            begin = time.perf_counter()
+            connectivity.cached_path(src_id, dst_id)
+            cached_time += time.perf_counter() - begin
+
+        print('%8d %8d %16.3f %16.3f %16.2f' % (n_drones, n_pairs, former_time / n_pairs * 1e3,
+                                                graph_time / n_pairs * 1e3, cached_time / n_pairs * 1e6))
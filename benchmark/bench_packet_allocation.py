@@ -0,0 +1,83 @@
+"""
+Packet allocation: memory and time of creating a data packet, with a retransmission counter for every drone created in
+advance (as before) versus the "__slots__" packet whose counters are created when a drone first handles it
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_packet_allocation
+"""
+
+import timeit
+import tracemalloc
+from types import SimpleNamespace
+from utils import config
+from entities.packet import DataPacket
+
+
+class DictDataPacket:
+    """The data packet before "__slots__" was introduced, kept as the reference"""
+
+    def __init__(self, src_drone, dst_drone, creation_time, data_packet_id, data_packet_length, simulator, channel_id):
+        self.packet_id = data_packet_id
+        self.packet_length = data_packet_length
+        self.creation_time = creation_time
+        self.deadline = config.PACKET_LIFETIME
+        self.simulator = simulator
+        self.channel_id = channel_id
+        self.__ttl = 0
+
+        self.number_retransmission_attempt = {}
+
+        for drone in self.simulator.drones:
+            self.number_retransmission_attempt[drone.identifier] = 0  # initialization
+
+        self.waiting_start_time = None
+        self.first_attempt_time = None
+        self.transmitting_start_time = None
+
+        self.time_delivery = None
+        self.time_transmitted_at_last_hop = 0
+        self.transmission_mode = None
+
+        self.intermediate_drones = []
+
+        self.src_drone = src_drone
+        self.dst_drone = dst_drone
+
+        self.routing_path = None
+        self.next_hop_id = None
+
+
+def create_packets(packet_class, simulator, n_packets):
+    src_drone, dst_drone = simulator.drones[0], simulator.drones[-1]
+    return [packet_class(src_drone, dst_drone, 0, i, 8000, simulator, 1) for i in range(n_packets)]
+
+
+def bytes_per_packet(packet_class, simulator, n_packets=2000):
+    tracemalloc.start()
+    packets = create_packets(packet_class, simulator, n_packets)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # the first hop handles the packet, as in "packet_coming"
+    for pkd in packets:
+        pkd.number_retransmission_attempt[simulator.drones[0].identifier] += 1
+        assert pkd.number_retransmission_attempt[simulator.drones[0].identifier] == 1
+        assert pkd.number_retransmission_attempt[simulator.drones[-1].identifier] == 0
+
+    return current / n_packets
+
+
+if __name__ == "__main__":
+    print('%8s %16s %16s %16s %16s' % ('drones', 'dict (bytes)', 'slots (bytes)', 'dict (us)', 'slots (us)'))
+
+    for n_drones in [15, 50, 100, 500, 2000]:
+        simulator = SimpleNamespace(drones=[SimpleNamespace(identifier=i) for i in range(n_drones)])
+
+        dict_bytes = bytes_per_packet(DictDataPacket, simulator)
+        slots_bytes = bytes_per_packet(DataPacket, simulator)
+
+        dict_time = min(timeit.Timer(lambda: create_packets(DictDataPacket, simulator, 100)).repeat(5, 10)) / 1000
+        slots_time = min(timeit.Timer(lambda: create_packets(DataPacket, simulator, 100)).repeat(5, 10)) / 1000
+
+        print('%8d %16.0f %16.0f %16.2f %16.2f' % (n_drones, dict_bytes, slots_bytes, dict_time * 1e6,
+                                                   slots_time * 1e6))
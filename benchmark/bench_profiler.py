@@ -0,0 +1,74 @@
+"""
+Built-in profiler: a run of each routing protocol with and without it
+    1) the profiler only observes the simulation: the metrics must be the same
+    2) it must count the same events as "CountingEnvironment", per kind of process
+    3) the times of the sections and of the SimPy kernel must add up to the wall-clock time, and the report must be
+       the same once dumped as JSON
+Its overhead is reported, and the report of the last run is printed
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_profiler
+"""
+
+import os
+import json
+import tempfile
+from collections import defaultdict
+from benchmark.common import run_scenario
+
+PROTOCOLS = ('Dsdv', 'Greedy', 'Grad', 'Opar', 'QRouting', 'QGeo')
+N_DRONES = 30
+SIM_TIME = 1e6
+
+
+def digest(metrics):
+    return (metrics.datapacket_generated_num, list(metrics.datapacket_arrived), metrics.collision_num,
+            metrics.control_packet_num, repr(metrics.get_metrics_dict()))
+
+
+def check_events(profiler, env):
+    """The profiler counts the events under the qualified name of the generator function, e.g., "Drone.receive" """
+
+    events = defaultdict(int)
+    for name, count in profiler.events.items():
+        events[name.split('.')[-1]] += count
+
+    assert events == env.events_by_process, (dict(events), dict(env.events_by_process))
+
+
+def check_report(profiler):
+    report = profiler.report()
+    assert abs(sum(report['subsystems'].values()) - report['wall_time']) < 1e-6
+    assert report['subsystems']['kernel and callbacks'] > 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'profile.json')
+        profiler.save(filename)
+        with open(filename) as f:
+            saved = json.load(f)
+
+    assert saved['events_by_process'] == report['events_by_process']
+    assert saved['sections'].keys() == report['sections'].keys()
+
+
+if __name__ == "__main__":
+    print('%d drones, %.1f s simulated' % (N_DRONES, SIM_TIME / 1e6))
+    print('%10s %14s %14s %10s %12s' % ('protocol', 'off (s)', 'profiled (s)', 'overhead', 'events/sim s'))
+
+    for protocol in PROTOCOLS:
+        sim, env, wall_time = run_scenario(N_DRONES, sim_time=SIM_TIME, routing_protocol=protocol)
+        assert sim.profiler is None
+        profiled, profiled_env, profiled_time = run_scenario(N_DRONES, sim_time=SIM_TIME, routing_protocol=protocol,
+                                                             profile=True)
+
+        assert digest(profiled.metrics) == digest(sim.metrics), 'the profiler has changed the simulation'
+        check_events(profiled.profiler, profiled_env)
+        check_report(profiled.profiler)
+
+        report = profiled.profiler.report()
+        print('%10s %14.2f %14.2f %9.1f%% %12.0f' % (protocol, wall_time, profiled_time,
+                                                   (profiled_time / wall_time - 1) * 100,
+                                                   report['events_per_simulated_second']))
+
+    print()
+    profiled.profiler.print_report()
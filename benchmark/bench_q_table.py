@@ -0,0 +1,128 @@
+"""
+Next hop selection with the Q-tables of Q-routing and QGeo, for 100 to 1000 drones. The Q-values of the neighbors are
+now read at once from the Q-table (with the array of neighbor ids) instead of scanning the neighbor table twice in
+python, and the neighbor table is only walked through by "purge" when an item may have expired. The former selection
+is replayed on the same table with a random number generator in the same state: both must choose the same next hops
+and return the same minimum / maximum Q-values
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_q_table
+"""
+
+import math
+import random
+import time
+import simpy
+from types import SimpleNamespace
+from routing.q_routing.q_routing_table import QRoutingTable
+from routing.qgeo.qgeo_table import QGeoTable
+
+
+def former_purge(table):
+    """The former "purge" of both tables, which walked through the whole neighbor table every time"""
+
+    for key in list(table.neighbor_table):
+        updated_time = table.get_updated_time(key)
+        if updated_time + table.entry_life_time <= table.env.now:  # expired
+            table.remove_neighbor(key)
+
+
+def former_best_neighbor(table, dst_id, minimize):
+    """The former "best_neighbor" of "QRoutingTable" (minimize=True) and "QGeoTable" (minimize=False)"""
+
+    former_purge(table)
+
+    if table.rng_routing.random() < 0.9 * math.pow(0.5, table.env.now / 1e6):
+        return table.rng_routing.choice(list(table.neighbor_table.keys()))
+
+    best_q_value = 1e10 if minimize else -10000
+    best_id = table.my_drone.identifier
+
+    for neighbor in table.neighbor_table.keys():
+        if neighbor != table.my_drone.identifier:
+            next_hop_q_value = table.q_table[neighbor][dst_id]
+            if (next_hop_q_value <= best_q_value) if minimize else (next_hop_q_value > best_q_value):
+                best_q_value = next_hop_q_value
+
+    candidates = [neighbor for neighbor in table.neighbor_table.keys()
+                  if neighbor != table.my_drone.identifier and table.q_table[neighbor][dst_id] == best_q_value]
+
+    if len(candidates) != 0:
+        best_id = table.rng_routing.choice(candidates)
+
+    return best_id
+
+
+def former_extreme_q_value(table, dst_id, minimize):
+    """The former "get_min_q_value" of "QRoutingTable" and "get_max_q_value" of "QGeoTable" """
+
+    former_purge(table)
+
+    extreme_q = 1e10 if minimize else -10000
+    for neighbor in table.neighbor_table.keys():
+        q = table.q_table[neighbor][dst_id]
+        if (q <= extreme_q) if minimize else (q > extreme_q):
+            extreme_q = q
+
+    return extreme_q
+
+
+def build_table(table_class, n_drones, n_neighbors, rng):
+    env = simpy.Environment(initial_time=10 * 1e6)  # late enough for the exploitation to dominate
+    my_drone = SimpleNamespace(identifier=0, simulator=SimpleNamespace(n_drones=n_drones))
+    table = table_class(env, my_drone, random.Random(1))
+
+    for drone_id in rng.sample(range(1, n_drones), n_neighbors):
+        hello_packet = SimpleNamespace(src_drone=SimpleNamespace(identifier=drone_id), cur_position=[0, 0, 0],
+                                       cur_velocity=[0, 0, 0])
+        table.add_neighbor(hello_packet, env.now)
+
+    # integer Q-values, so that there are ties between the neighbors
+    for row in range(n_drones):
+        for col in range(n_drones):
+            table.q_table[row, col] = rng.randint(0, 20)
+
+    return table
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    n_queries = 2000
+
+    print('%14s %8s %10s %14s %14s %14s %14s' % ('table', 'drones', 'neighbors', 'former (us)', 'array (us)',
+                                                 'former q (us)', 'array q (us)'))
+
+    for table_class, minimize in [(QRoutingTable, True), (QGeoTable, False)]:
+        for n_drones, n_neighbors in [(100, 30), (500, 100), (1000, 300)]:
+            table = build_table(table_class, n_drones, n_neighbors, rng)
+            extreme_q_value = table.get_min_q_value if minimize else table.get_max_q_value
+            destinations = [rng.randrange(n_drones) for _ in range(n_queries)]
+            state = table.rng_routing.getstate()
+
+            begin = time.perf_counter()
+            expected = [former_best_neighbor(table, dst_id, minimize) for dst_id in destinations]
+            former_time = time.perf_counter() - begin
+
+            table.rng_routing.setstate(state)
+            begin = time.perf_counter()
+            chosen = [table.best_neighbor(table.my_drone, SimpleNamespace(identifier=dst_id))
+                      for dst_id in destinations]
+            array_time = time.perf_counter() - begin
+
+            assert chosen == expected
+
+            begin = time.perf_counter()
+            expected = [former_extreme_q_value(table, dst_id, minimize) for dst_id in destinations]
+            former_q_time = time.perf_counter() - begin
+
+            begin = time.perf_counter()
+            values = [extreme_q_value(dst_id) for dst_id in destinations]
+            array_q_time = time.perf_counter() - begin
+
+            assert values == expected
+
+            print('%14s %8d %10d %14.2f %14.2f %14.2f %14.2f' % (table_class.__name__, n_drones, n_neighbors,
+                                                                 former_time / n_queries * 1e6,
+                                                                 array_time / n_queries * 1e6,
+                                                                 former_q_time / n_queries * 1e6,
+                                                                 array_q_time / n_queries * 1e6))
@@ -0,0 +1,23 @@
+"""
+Event count and wall-clock time of the simulation with event-driven packet reception
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_reception [n_drones] [sim_time_in_seconds]
+"""
+
+import sys
+from benchmark.common import run_scenario
+
+
+if __name__ == "__main__":
+    n_drones = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    sim_time = float(sys.argv[2]) * 1e6 if len(sys.argv) > 2 else 2e6
+
+    sim, env, wall_time = run_scenario(n_drones, sim_time)
+    metrics = sim.metrics
+
+    print('drones: %d, simulated time: %.1f s' % (n_drones, sim_time / 1e6))
+    print('events scheduled: %d' % env.event_count)
+    print('wall-clock time: %.2f s' % wall_time)
+    print('packets generated: %d, delivered: %d, collisions: %d' %
+          (metrics.datapacket_generated_num, len(metrics.datapacket_arrived), metrics.collision_num))
@@ -0,0 +1,76 @@
+"""
+Compare the speed of the batched SINR engine with the scalar path. "sinr_calculator" takes the scalar path below
+"config.SINR_BATCH_SIZE" pairs of main link and transmitting drone, the speedup column shows on which side of it the
+batched kernel wins. That both give the same SINR is checked by "test/test_sinr.py"
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_sinr
+"""
+
+import random
+import timeit
+import numpy as np
+from types import SimpleNamespace
+from allocation.channel_assignment import ChannelAssigner
+from entities.drone_states import DroneStates
+from phy.large_scale_fading import batched_sinr_calculator, scalar_sinr_calculator, sinr_matrix
+from utils import config
+
+
+def build_scenario(n_drones, n_transmitters, seed=2025):
+    """Place drones randomly in the map, and let some of them transmit on random sub-channels"""
+
+    rng = random.Random(seed)
+    simulator = SimpleNamespace(seed=seed, drones=[], drone_states=DroneStates(n_drones))
+
+    for i in range(n_drones):
+        drone = SimpleNamespace(identifier=i, simulator=simulator, drone_states=simulator.drone_states,
+                                coords=(rng.uniform(0, 600), rng.uniform(0, 600), rng.uniform(0, 100)))
+        simulator.drone_states.positions[i] = drone.coords
+        drone.channel_assigner = ChannelAssigner(simulator, drone)
+        simulator.drones.append(drone)
+
+    transmitters = rng.sample(range(n_drones), n_transmitters)
+    transmitting_list = [[i, rng.choice([1, 6, 11])] for i in transmitters]
+
+    return simulator, transmitting_list
+
+
+def time_matrix_mode(simulator, transmitting_list):
+    receivers = simulator.drones
+    channel_overlap = receivers[0].channel_assigner.adjacent_channel_interference_matrix
+
+    receiver_coords = np.array([drone.coords for drone in receivers], dtype=float)
+    transmitter_ids = np.array([x[0] for x in transmitting_list])
+    transmitter_coords = np.array([simulator.drones[i].coords for i in transmitter_ids], dtype=float)
+    transmitter_channels = np.array([x[1] for x in transmitting_list])
+
+    return time_call(sinr_matrix, receiver_coords, transmitter_coords, transmitter_ids, transmitter_channels,
+                     channel_overlap, number=20)
+
+
+def time_call(function, *args, number=50):
+    return min(timeit.Timer(lambda: function(*args)).repeat(5, number)) / number
+
+
+if __name__ == "__main__":
+    print('%8s %8s %6s %14s %14s %9s %10s' %
+          ('drones', 'active', 'main', 'scalar (us)', 'batched (us)', 'speedup', 'chosen'))
+
+    for n_drones, n_transmitters in [(15, 4), (50, 10), (100, 25), (200, 50), (500, 100)]:
+        simulator, transmitting_list = build_scenario(n_drones, n_transmitters)
+
+        for n_main in [1, 3]:
+            receiver = simulator.drones[0]
+            main_list = transmitting_list[:n_main]
+
+            scalar = time_call(scalar_sinr_calculator, receiver, main_list, transmitting_list)
+            batched = time_call(batched_sinr_calculator, receiver, main_list, transmitting_list)
+            chosen = 'batched' if n_main * n_transmitters >= config.SINR_BATCH_SIZE else 'scalar'
+
+            print('%8d %8d %6d %14.1f %14.1f %8.1fx %10s' %
+                  (n_drones, n_transmitters, n_main, scalar * 1e6, batched * 1e6, scalar / batched, chosen))
+
+        matrix_time = time_matrix_mode(simulator, transmitting_list)
+        print('%8d %8d %6s matrix mode for all %d receivers: %.1f us' %
+              (n_drones, n_transmitters, 'all', n_drones, matrix_time * 1e6))
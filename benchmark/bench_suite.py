@@ -0,0 +1,318 @@
+"""
+Benchmark suite of the simulator core: fixed-seed scenarios for several numbers of drones, with each routing protocol
+and each MAC protocol. Each scenario runs in a fresh process (so that its peak memory is its own), one after another
+by default (so that they do not disturb each other's timing), and the following are recorded:
+    wall-clock time (the best of a few runs, since short runs are noisy), number of SimPy events scheduled, peak
+    resident set size (RSS) and simulated seconds per second, with the number of data packets generated and the PDR,
+    so that a change of behavior is noticed too
+The scenarios are not traced by default, so that the trace does not count in the wall-clock time. With "--trace-level",
+each scenario writes its own trace file (see "sweep.trace_filename"), and the wall-clock time and the peak RSS are only
+compared with a baseline traced at the same level
+
+The results are written to a versioned JSON file (the version of its format, the commit, the versions of Python,
+NumPy and SimPy, the platform and the settings of the run), and the scaling curves (wall-clock time versus number of
+drones, and the exponent of a power law fitted to them) are printed. Each scenario is then compared with a baseline:
+    1) by default, the committed "benchmark/results/baseline.json", which only holds what does not depend on the
+       machine (the number of events, of data packets generated and the PDR) for the default grid, so only the number
+       of events is compared
+    2) with "--baseline", a results file of a former run on the same machine, and the wall-clock time and the peak
+       RSS are compared too
+A scenario has regressed if one of them has grown by more than the threshold, and its behavior has changed if its
+number of data packets or its PDR is not the same. In both cases, the script exits with status 1. After a change that
+is meant to change the behavior, the committed baseline is written again with "--save-baseline"
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_suite                                   # the whole grid, it takes a while
+    python -m benchmark.bench_suite --drones 15 50 --routing Dsdv Greedy --mac CsmaCa --sim-time 0.1
+    python -m benchmark.bench_suite --baseline benchmark/results/results-20250514-120000.json --threshold 0.1
+    python -m benchmark.bench_suite --repeat 1 --save-baseline       # the number of events does not need repeats
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import logging
+import argparse
+import datetime
+import functools
+import subprocess
+import multiprocessing
+import numpy as np
+import simpy
+from simulator.sweep import make_grid, trace_filename
+
+RESULTS_VERSION = 1
+RESULTS_DIRECTORY = os.path.join(os.path.dirname(__file__), 'results')
+BASELINE = os.path.join(RESULTS_DIRECTORY, 'baseline.json')  # committed, see "save_baseline"
+
+N_DRONES = (15, 50, 100, 200, 500)
+ROUTING_PROTOCOLS = ('Dsdv', 'Greedy', 'Grad', 'Opar', 'QRouting', 'QGeo')
+MAC_PROTOCOLS = ('CsmaCa', 'PureAloha')
+SEED = 2025
+SIM_TIME = 0.2  # s, short enough for 500 drones
+REPEAT = 3  # runs of each scenario, the best wall-clock time is kept
+TRACE_LEVEL = 'WARNING'  # no trace, so that the wall-clock time does not include it
+
+# what identifies a scenario in the results, what is compared with the baseline and what tells a change of behavior
+CASE_FIELDS = ('n_drones', 'routing_protocol', 'mac_protocol', 'mobility_model', 'traffic_rate', 'seed', 'sim_time')
+COMPARED = ('wall_time', 'peak_rss', 'events')
+MACHINE_INDEPENDENT = ('events',)  # compared with the committed baseline
+BEHAVIOR = ('generated', 'pdr')
+
+
+def peak_rss():
+    """Peak resident set size of this process, in MB"""
+
+    import resource
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / 2 ** 20 if sys.platform == 'darwin' else maxrss / 2 ** 10  # bytes on macOS, KB on Linux
+
+
+def measure_case(case, sim_time, repeat=REPEAT, trace_level=TRACE_LEVEL):
+    """
+    Worker of the suite, it runs one scenario in its own process
+    :param case: a case of "make_grid"
+    :param sim_time: simulated time, in s
+    :param repeat: number of runs, the best wall-clock time is kept
+    :param trace_level: name of the level of the trace, e.g., "WARNING" (no trace) or "INFO"
+    :return: the case and its measurements
+    """
+
+    from benchmark.common import run_scenario
+    from utils import trace
+
+    options = {key: value for key, value in case.items() if key not in ('seed', 'n_drones')}
+    trace.tracer.configure(filename=trace_filename(case))  # only created if the scenario is traced
+    wall_time = float('inf')
+    for _ in range(repeat):
+        trace.tracer.close()  # the trace file holds the last run only
+        sim, env, run_time = run_scenario(case['n_drones'], sim_time=sim_time * 1e6, seed=case['seed'],
+                                          trace_level=logging.getLevelName(trace_level), **options)
+        wall_time = min(wall_time, run_time)
+
+    metrics = sim.metrics.get_metrics_dict()
+
+    result = dict(case, sim_time=sim_time)
+    result.update(wall_time=wall_time, events=env.event_count, peak_rss=peak_rss(),
+                  sim_seconds_per_second=sim_time / wall_time, generated=metrics['generated'], pdr=metrics['pdr'])
+
+    return result
+
+
+def run_suite(grid, sim_time, repeat=REPEAT, max_workers=1, trace_level=TRACE_LEVEL):
+    """
+    Run the scenarios in fresh processes, one after another by default, and print them as they finish. The processes
+    are spawned rather than forked, so that they do not inherit the peak RSS of this one
+    """
+
+    print('%8s %10s %10s %12s %12s %12s %14s' % ('drones', 'routing', 'mac', 'wall (s)', 'events', 'RSS (MB)',
+                                                  'sim s per s'))
+
+    results = []
+    pool = multiprocessing.get_context('spawn').Pool(processes=max_workers, maxtasksperchild=1)
+    try:
+        for result in pool.imap(functools.partial(measure_case, sim_time=sim_time, repeat=repeat,
+                                                  trace_level=trace_level), grid):
+            print('%8d %10s %10s %12.2f %12d %12.1f %14.4f' %
+                  (result['n_drones'], result['routing_protocol'], result['mac_protocol'], result['wall_time'],
+                   result['events'], result['peak_rss'], result['sim_seconds_per_second']))
+            results.append(result)
+    finally:
+        pool.terminate()
+
+    return results
+
+
+def environment():
+    """What the results depend on, besides the scenarios"""
+
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+                                         universal_newlines=True, cwd=os.path.dirname(__file__)).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'version': RESULTS_VERSION,
+        'created_at': datetime.datetime.now().replace(microsecond=0).isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'simpy': simpy.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def save_results(results, filename, settings):
+    document = environment()
+    document['settings'] = settings
+    document['results'] = results
+
+    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+    with open(filename, 'w') as f:
+        json.dump(document, f, indent=4)
+
+
+def save_baseline(results, filename, settings):
+    """Save only what does not depend on the machine, so that the baseline can be committed and compared anywhere"""
+
+    fields = CASE_FIELDS + MACHINE_INDEPENDENT + BEHAVIOR
+    save_results([{field: result[field] for field in fields} for result in results], filename, settings)
+
+
+def load_results(filename):
+    with open(filename) as f:
+        document = json.load(f)
+
+    if document.get('version') != RESULTS_VERSION:
+        raise ValueError('%s has the version %s of the results, %s is expected' %
+                         (filename, document.get('version'), RESULTS_VERSION))
+
+    return document
+
+
+def case_key(result):
+    return tuple(result[field] for field in CASE_FIELDS)
+
+
+def compare(results, baseline, threshold, measurements=COMPARED):
+    """
+    Compare the results with those of the baseline, scenario by scenario
+    :param results: list of measurements, see "measure_case"
+    :param baseline: list of measurements of the baseline
+    :param threshold: relative growth above which a measurement has regressed, e.g., 0.1 for 10%
+    :param measurements: names of the measurements that are compared, those missing in the baseline are skipped
+    :return: list of (result, name of the measurement, baseline value, new value) that have regressed, list of the
+             results whose behavior has changed, and the number of scenarios that were compared
+    """
+
+    baseline = {case_key(result): result for result in baseline}
+
+    regressions = []
+    changes = []
+    compared = 0
+    print('%8s %10s %10s ' % ('drones', 'routing', 'mac') + ''.join('%16s' % name for name in measurements))
+    for result in results:
+        former = baseline.get(case_key(result))
+        if former is None:
+            continue
+
+        compared += 1
+        cells = []
+        for name in measurements:
+            if name not in former:
+                cells.append('%16s' % '-')
+                continue
+
+            ratio = result[name] / former[name] if former[name] else float('inf')
+            cells.append('%+15.1f%%' % ((ratio - 1) * 100) + ('!' if ratio > 1 + threshold else ' '))
+            if ratio > 1 + threshold:
+                regressions.append((result, name, former[name], result[name]))
+
+        print('%8d %10s %10s %s' % (result['n_drones'], result['routing_protocol'], result['mac_protocol'],
+                                    ''.join(cells)))
+
+        if (result['generated'], str(result['pdr'])) != (former['generated'], str(former['pdr'])):  # nan != nan
+            print('%8s the behavior has changed: %s data packets (PDR %s) instead of %s (PDR %s)' %
+                  ('', result['generated'], result['pdr'], former['generated'], former['pdr']))
+            changes.append(result)
+
+    return regressions, changes, compared
+
+
+def print_scaling(results):
+    """Wall-clock time versus number of drones, and the exponent of the power law fitted to it"""
+
+    n_drones = sorted({result['n_drones'] for result in results})
+    curves = {}
+    for result in results:
+        curve = curves.setdefault((result['routing_protocol'], result['mac_protocol']), {})
+        curve[result['n_drones']] = result['wall_time']
+
+    print('wall-clock time (s) versus number of drones')
+    print('%10s %10s ' % ('routing', 'mac') + ''.join('%10d' % n for n in n_drones) + '%10s' % 'exponent')
+    for (routing_protocol, mac_protocol), curve in curves.items():
+        cells = ''.join('%10.2f' % curve[n] if n in curve else '%10s' % '-' for n in n_drones)
+        if len(curve) > 1:
+            exponent = np.polyfit(np.log(list(curve.keys())), np.log(list(curve.values())), 1)[0]
+        else:
+            exponent = float('nan')
+        print('%10s %10s %s%10.2f' % (routing_protocol, mac_protocol, cells, exponent))
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='benchmark suite of the simulator core')
+    parser.add_argument('--drones', type=int, nargs='+', default=N_DRONES, help='numbers of drones')
+    parser.add_argument('--routing', nargs='+', default=ROUTING_PROTOCOLS, help='routing protocols')
+    parser.add_argument('--mac', nargs='+', default=MAC_PROTOCOLS, help='MAC protocols')
+    parser.add_argument('--seed', type=int, default=SEED, help='random seed of every scenario')
+    parser.add_argument('--sim-time', type=float, default=SIM_TIME, help='simulated time of each scenario, in s')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help='runs of each scenario, the best time is kept')
+    parser.add_argument('--workers', type=int, default=1, help='scenarios run at the same time')
+    parser.add_argument('--trace-level', default=TRACE_LEVEL, choices=('DEBUG', 'INFO', 'WARNING'),
+                        help='level of the trace of each scenario, no trace by default')
+    parser.add_argument('--output', help='results file, by default in benchmark/results, named after the date')
+    parser.add_argument('--baseline', help='results file of a former run on this machine to compare with, by default '
+                                           'the committed baseline (number of events and behavior only)')
+    parser.add_argument('--save-baseline', action='store_true', help='write the committed baseline again')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative growth that is a regression')
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+
+    grid = make_grid(seeds=[arguments.seed], n_drones=arguments.drones, routing_protocols=arguments.routing,
+                     mac_protocols=arguments.mac)
+
+    start = time.perf_counter()
+    results = run_suite(grid, arguments.sim_time, arguments.repeat, arguments.workers, arguments.trace_level)
+    print('%d scenarios in %.1f s' % (len(results), time.perf_counter() - start))
+
+    output = arguments.output or os.path.join(RESULTS_DIRECTORY,
+                                              datetime.datetime.now().strftime('results-%Y%m%d-%H%M%S.json'))
+    settings = {'drones': arguments.drones, 'routing': arguments.routing, 'mac': arguments.mac,
+                'seed': arguments.seed, 'sim_time': arguments.sim_time, 'repeat': arguments.repeat,
+                'workers': arguments.workers, 'trace_level': arguments.trace_level}
+    save_results(results, output, settings)
+    print('results written to %s' % output)
+
+    print()
+    print_scaling(results)
+
+    if arguments.save_baseline:
+        save_baseline(results, BASELINE, settings)
+        print('baseline written to %s' % BASELINE)
+        sys.exit(0)
+
+    if arguments.baseline:
+        baseline_file, measurements = arguments.baseline, COMPARED
+    else:
+        baseline_file, measurements = BASELINE, MACHINE_INDEPENDENT
+
+    baseline = load_results(baseline_file)
+    print()
+    print('compared with %s (commit %s)' % (baseline_file, baseline['commit']))
+
+    baseline_trace_level = baseline['settings'].get('trace_level', 'INFO')  # the first results were traced
+    if baseline_trace_level != arguments.trace_level and measurements != MACHINE_INDEPENDENT:
+        print('the baseline was traced at %s, not at %s: only %s compared' %
+              (baseline_trace_level, arguments.trace_level, ', '.join(MACHINE_INDEPENDENT)))
+        measurements = MACHINE_INDEPENDENT
+    regressions, changes, compared = compare(results, baseline['results'], arguments.threshold, measurements)
+    print('%d scenarios compared, %d not in the baseline' % (compared, len(results) - compared))
+
+    for result, name, former, value in regressions:
+        print('REGRESSION: %d drones, %s, %s: %s %.4g -> %.4g' % (result['n_drones'], result['routing_protocol'],
+                                                                 result['mac_protocol'], name, former, value))
+    for result in changes:
+        print('BEHAVIOR CHANGED: %d drones, %s, %s (if it is meant to, write the baseline again with '
+              '--save-baseline)' % (result['n_drones'], result['routing_protocol'], result['mac_protocol']))
+    if regressions or changes:
+        sys.exit(1)
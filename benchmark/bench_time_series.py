@@ -0,0 +1,133 @@
+"""
+Time series of the metrics:
+    1) the snapshots must add up to the totals of "Metrics": over the windows, for each drone and for the network
+       (the data packets generated and delivered, the collisions, the control packets and the mean end-to-end delay),
+       and the per-drone percentiles must be those of "np.percentile"
+    2) a ring buffer smaller than the number of snapshots must keep the latest ones, in chronological order, and the
+       series must be the same once saved and loaded again (.npz, and .parquet if pyarrow is installed, else
+       the .npz file written instead)
+    3) the snapshots only observe the simulation: the metrics must be the same without them, and their cost is reported.
+       The windows with the largest 99th percentile of the end-to-end delay are printed, as an example of the transient
+       congestion that the totals hide
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_time_series
+"""
+
+import os
+import tempfile
+import warnings
+import numpy as np
+from benchmark.common import run_scenario
+from simulator.time_series import _group_percentiles
+from utils import config
+
+N_DRONES = 30
+SIM_TIME = 3e6
+WINDOW = 0.1e6
+
+
+def run(window, history=1000):
+    config.METRICS_WINDOW, config.METRICS_HISTORY = window, history
+    sim, env, wall_time = run_scenario(N_DRONES, sim_time=SIM_TIME)
+    if sim.time_series is not None:
+        sim.time_series.snapshot()
+
+    metrics = sim.metrics
+    digest = (metrics.datapacket_generated_num, list(metrics.datapacket_arrived), metrics.collision_num,
+              metrics.control_packet_num, repr(metrics.get_metrics_dict()))
+
+    return sim, digest, wall_time
+
+
+def check_totals(sim):
+    metrics = sim.metrics
+    columns = sim.time_series.columns()
+    assert len(columns['time']) == round(SIM_TIME / WINDOW)
+
+    for name, total, per_drone in [('generated', metrics.datapacket_generated_num, metrics.generated),
+                                   ('arrived', len(metrics.datapacket_arrived), metrics.arrived),
+                                   ('collision', metrics.collision_num, metrics.collisions),
+                                   ('control', metrics.control_packet_num, metrics.control_packets)]:
+        assert columns[name].sum() == total, name
+        assert np.array_equal(columns['drone_' + name].sum(axis=0), per_drone), name
+        assert np.array_equal(columns['drone_' + name].sum(axis=1), columns[name]), name
+
+    delivered = columns['arrived'] > 0
+    mean_delay = np.sum(columns['e2e'][delivered] * columns['arrived'][delivered]) / columns['arrived'].sum()
+    assert np.isclose(mean_delay, metrics.delivery_time.mean / 1e3, rtol=1e-9)
+
+
+def check_group_percentiles(rng, n_values=5000, n_groups=40):
+    groups = rng.integers(0, n_groups - 3, n_values)  # the last groups have no value
+    values = rng.exponential(20.0, n_values)
+    ps = (0.5, 0.95, 0.99)
+
+    result = _group_percentiles(groups, values, n_groups, ps)
+    for group in range(n_groups):
+        group_values = values[groups == group]
+        if len(group_values):
+            assert np.allclose(result[:, group], np.percentile(group_values, [p * 100 for p in ps]), rtol=1e-12)
+        else:
+            assert np.isnan(result[:, group]).all()
+
+
+def check_ring_and_files(sim):
+    full = sim.time_series.columns()
+
+    capacity = 8
+    small, _, _ = run(WINDOW, history=capacity)
+    latest = small.time_series.columns()
+    for name, values in full.items():
+        assert np.array_equal(latest[name], values[-capacity:], equal_nan=True), name
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'metrics.npz')
+        sim.time_series.save(filename)
+        with np.load(filename) as loaded:
+            assert loaded['window'] == WINDOW
+            for name, values in full.items():
+                assert np.array_equal(loaded[name], values, equal_nan=True), name
+        print('ring buffer and .npz file: same snapshots')
+
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                written = sim.time_series.save(os.path.join(directory, 'metrics.parquet'))
+            assert caught and written == os.path.join(directory, 'metrics.npz')
+            print('pyarrow is not installed, the .parquet file falls back to %s' % os.path.basename(written))
+            return
+
+        filename = os.path.join(directory, 'metrics.parquet')
+        sim.time_series.save(filename)
+        table = pq.read_table(filename)
+        for name, values in full.items():
+            column = np.array(table.column(name).to_pylist(), dtype=values.dtype)
+            assert np.array_equal(column, values, equal_nan=True), name
+        print('.parquet file: same snapshots')
+
+
+if __name__ == "__main__":
+    check_group_percentiles(np.random.default_rng(5))
+
+    without, reference, without_time = run(0)
+    assert without.time_series is None
+    sim, digest, wall_time = run(WINDOW)
+    assert digest == reference, 'the snapshots have changed the simulation'
+
+    check_totals(sim)
+    print('%d drones, %.1f s simulated, %d snapshots: they add up to the totals' %
+          (N_DRONES, SIM_TIME / 1e6, len(sim.time_series)))
+    print('wall time: %.2f s without the snapshots, %.2f s with them' % (without_time, wall_time))
+
+    check_ring_and_files(sim)
+
+    columns = sim.time_series.columns()
+    print('%8s %10s %8s %12s %12s %12s %10s' % ('time (s)', 'generated', 'PDR (%)', 'e2e (ms)', 'e2e p99 (ms)',
+                                                 'collisions', 'control'))
+    for row in sorted(np.argsort(-np.nan_to_num(columns['e2e_p99'], nan=-1))[:5]):
+        print('%8.1f %10d %8.1f %12.2f %12.2f %12d %10d' %
+              tuple(columns[name][row] for name in ('time', 'generated', 'pdr', 'e2e', 'e2e_p99', 'collision',
+                                                     'control')))
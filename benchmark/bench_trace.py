@@ -0,0 +1,97 @@
+"""
+Cost of the trace in a 100-drone run: tracing off, INFO records only and the full trace (DEBUG), next to the former
+logging calls, which wrote every record through the logging module (a log record, a lock and a flush of the file for
+each of them). All the modes must give the same metrics, the trace only observes the simulation. This also compares a
+disabled call site with a "logging.info" call whose level is disabled, which still builds its arguments and goes
+through the logging module before dropping the record
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_trace
+"""
+
+import os
+import logging
+import tempfile
+import timeit
+from benchmark.common import run_scenario
+from utils import trace
+
+MODES = {'off': logging.WARNING, 'INFO': logging.INFO, 'full': logging.DEBUG, 'former logging': logging.DEBUG}
+
+
+def run_traced(mode, filename, n_drones, sim_time):
+    trace.tracer.configure(level=MODES[mode], categories=None, filename=filename)
+
+    info, debug = trace.TraceCategory.info, trace.TraceCategory.debug
+    if mode == 'former logging':
+        # every record goes through the logging module, as with the former "logging.basicConfig" of each module
+        handler = logging.FileHandler(filename, mode='w')
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        logging.root.addHandler(handler)
+        logging.root.setLevel(logging.INFO)
+        trace.TraceCategory.info = trace.TraceCategory.debug = lambda self, msg, *args: logging.info(msg, *args)
+
+    try:
+        sim, env, wall_time = run_scenario(n_drones, sim_time=sim_time)
+        trace.tracer.close()
+    finally:
+        trace.TraceCategory.info, trace.TraceCategory.debug = info, debug
+        if mode == 'former logging':
+            logging.root.removeHandler(handler)
+            handler.close()
+
+    metrics = sim.metrics
+    digest = (metrics.datapacket_generated_num, list(metrics.datapacket_arrived), metrics.collision_num,
+              metrics.control_packet_num, repr(metrics.get_metrics_dict()))
+
+    return digest, wall_time
+
+
+def call_site_cost(number=10 ** 6):
+    """Time of one disabled call site, in ns"""
+
+    trace_category = trace.TraceCategory('benchmark')  # disabled
+    namespace = {'TRACE': trace_category, 'logging': logging, 'pkd_id': 10007, 'drone_id': 6, 'now': 480.0}
+
+    guarded = timeit.timeit("if TRACE.full:\n    TRACE.debug('Packet: %s from UAV: %s at: %s', pkd_id, drone_id, now)",
+                            globals=namespace, number=number)
+
+    # as if "logging.basicConfig" had been called with the level WARNING
+    handler = logging.NullHandler()
+    logging.root.addHandler(handler)
+    logging.root.setLevel(logging.WARNING)
+    try:
+        former = timeit.timeit("logging.info('Packet: %s from UAV: %s at: %s', pkd_id, drone_id, now)",
+                               globals=namespace, number=number)
+    finally:
+        logging.root.removeHandler(handler)
+
+    return guarded / number * 1e9, former / number * 1e9
+
+
+if __name__ == "__main__":
+    guarded_ns, former_ns = call_site_cost()
+    print('disabled call site: guarded trace %.1f ns, logging.info below its level %.1f ns' % (guarded_ns, former_ns))
+
+    n_drones, sim_time = 100, 0.5 * 1e6
+    print('%d drones, %.1f s simulated' % (n_drones, sim_time / 1e6))
+    print('%16s %12s %12s %14s' % ('mode', 'wall (s)', 'records', 'file (MB)'))
+
+    with tempfile.TemporaryDirectory() as directory:
+        reference = None
+        for mode in MODES:
+            filename = os.path.join(directory, mode.replace(' ', '_') + '.log')
+            digest, wall_time = run_traced(mode, filename, n_drones, sim_time)
+
+            if reference is None:
+                reference = digest
+            assert digest == reference, 'the trace has changed the simulation'
+
+            if os.path.exists(filename):
+                with open(filename) as f:
+                    records = sum(1 for _ in f)
+                size = os.path.getsize(filename) / 1e6
+            else:
+                records, size = 0, 0.0
+
+            print('%16s %12.2f %12d %14.2f' % (mode, wall_time, records, size))
@@ -0,0 +1,97 @@
+"""
+Interference lookup: scanning the inboxes of all drones versus the interval query on the transmission log
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_transmission_log
+"""
+
+import random
+import timeit
+import simpy
+from utils import config
+
+DATA_PACKET_LENGTH = (config.IP_HEADER_LENGTH + config.MAC_HEADER_LENGTH + config.PHY_HEADER_LENGTH +
+                      config.AVERAGE_PAYLOAD_LENGTH)
+from utils.util_function import has_intersection
+from phy.channel import Channel
+
+
+def build_traffic(n_drones, n_transmissions, seed=2025):
+    """
+    Put a mix of broadcast (hello) and unicast (data) messages into the channel. The inboxes of the old
+    implementation are rebuilt aside, with one copy of each broadcast message per drone
+    """
+
+    rng = random.Random(seed)
+    env = simpy.Environment()
+    channel = Channel(env)
+    old_inboxes = {i: [] for i in range(n_drones)}
+
+    for i in range(n_drones):
+        channel.create_inbox_for_receiver(i)
+
+    for _ in range(n_transmissions):
+        env.run(until=env.now + rng.randint(1, 200))
+
+        transmitter = rng.randrange(n_drones)
+        if rng.random() < 0.3:
+            length = config.HELLO_PACKET_LENGTH
+            dst_ids = list(range(n_drones))
+        else:
+            length = DATA_PACKET_LENGTH
+            dst_ids = [rng.randrange(n_drones)]
+
+        transmitting_time = length / config.BIT_RATE * 1e6
+        packet = type('Packet', (), {'packet_length': length})()
+        message = (packet, env.now, transmitter, env.now + transmitting_time, rng.choice([1, 6, 11]))
+
+        if len(dst_ids) > 1:
+            channel.broadcast_put(message)
+        else:
+            channel.unicast_put(message, dst_ids[0])
+
+        for dst_id in dst_ids:
+            old_inboxes[dst_id].append(list(message))
+
+            # the old inboxes were pruned after two data packets
+            horizon = env.now - 2 * DATA_PACKET_LENGTH / config.BIT_RATE * 1e6
+            if old_inboxes[dst_id][0][1] < horizon:
+                old_inboxes[dst_id] = [item for item in old_inboxes[dst_id] if item[1] >= horizon]
+
+    return env, channel, old_inboxes
+
+
+def scan_all_inboxes(old_inboxes, time_span):
+    """The interference lookup before the transmission log was introduced"""
+
+    transmitting_node_list = []
+    for inbox in old_inboxes.values():
+        for item in inbox:
+            transmitting_time = item[0].packet_length / config.BIT_RATE * 1e6
+            interval = [item[1], item[1] + transmitting_time]
+
+            for interval2 in time_span:
+                if has_intersection(interval, interval2):
+                    transmitting_node_list.append([item[2], item[4]])
+
+    return transmitting_node_list
+
+
+if __name__ == "__main__":
+    print('%8s %16s %16s %9s' % ('drones', 'inbox scan (us)', 'log query (us)', 'speedup'))
+
+    for n_drones in [15, 50, 100, 200, 500]:
+        env, channel, old_inboxes = build_traffic(n_drones, n_transmissions=200)
+
+        # the packet that has just been received
+        last = channel.transmission_log[-1]
+        time_span = [[last[1], last[3]]]
+
+        expected = {tuple(i) for i in scan_all_inboxes(old_inboxes, time_span)}
+        result = {tuple(i) for i in channel.overlapping_transmissions(time_span)}
+        assert result == expected
+
+        scan_time = min(timeit.Timer(lambda: scan_all_inboxes(old_inboxes, time_span)).repeat(5, 20)) / 20
+        query_time = min(timeit.Timer(lambda: channel.overlapping_transmissions(time_span)).repeat(5, 20)) / 20
+
+        print('%8d %16.1f %16.1f %8.1fx' % (n_drones, scan_time * 1e6, query_time * 1e6, scan_time / query_time))
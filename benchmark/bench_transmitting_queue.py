@@ -0,0 +1,97 @@
+"""
+Transmitting queue: time of the operations performed on the queue of a drone, "queue.Queue" with the removal by
+draining and rebuilding the whole queue (as before) versus "TransmittingQueue", as the queue fills up to the maximum
+queue size. A random sequence of operations is also checked against a plain list
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_transmitting_queue
+"""
+
+import queue
+import random
+import timeit
+from utils import config
+from entities.transmitting_queue import TransmittingQueue
+
+
+class Packet:
+    pass
+
+
+def remove_by_rebuilding(transmitting_queue, data_pkd):
+    """The former "Drone.remove_from_queue", kept as the reference"""
+
+    temp_queue = queue.Queue()
+
+    while not transmitting_queue.empty():
+        pkd_entry = transmitting_queue.get()
+        if pkd_entry != data_pkd:
+            temp_queue.put(pkd_entry)
+
+    while not temp_queue.empty():
+        transmitting_queue.put(temp_queue.get())
+
+
+def check_against_list(n_operations=20000, seed=0):
+    rng = random.Random(seed)
+    packets = [Packet() for _ in range(50)]
+
+    reference = []
+    transmitting_queue = TransmittingQueue(maxsize=30)
+
+    for _ in range(n_operations):
+        operation = rng.random()
+        packet = rng.choice(packets)
+
+        if operation < 0.3:
+            transmitting_queue.put(packet)
+            reference.append(packet)
+        elif operation < 0.6:
+            added = transmitting_queue.offer(packet)
+            assert added == (len(reference) < 30)
+            if added:
+                reference.append(packet)
+        elif operation < 0.85:
+            if reference:
+                assert transmitting_queue.get() is reference.pop(0)
+        else:
+            transmitting_queue.remove(packet)
+            reference = [pkd for pkd in reference if pkd is not packet]
+
+        assert transmitting_queue.qsize() == len(reference)
+        assert transmitting_queue.empty() == (not reference)
+        assert all((pkd in transmitting_queue) == any(pkd is x for x in reference) for pkd in packets)
+
+    while reference:
+        assert transmitting_queue.get() is reference.pop(0)
+    assert transmitting_queue.empty()
+
+
+def one_round(make_queue, remove, queue_size):
+    """Fill the queue, remove the acked packet (absent as in most of the ACKs) and the middle one, then drain it"""
+
+    packets = [Packet() for _ in range(queue_size)]
+    transmitting_queue = make_queue()
+
+    for pkd in packets:
+        transmitting_queue.put(pkd)
+
+    remove(transmitting_queue, Packet())
+    remove(transmitting_queue, packets[queue_size // 2])
+
+    while not transmitting_queue.empty():
+        transmitting_queue.get()
+
+
+if __name__ == "__main__":
+    check_against_list()
+
+    print('%8s %18s %18s' % ('size', 'queue.Queue (us)', 'indexed (us)'))
+
+    for queue_size in [10, 50, 100, config.MAX_QUEUE_SIZE]:
+        old_time = min(timeit.Timer(lambda: one_round(queue.Queue, remove_by_rebuilding, queue_size)).repeat(5, 20))
+        new_time = min(timeit.Timer(lambda: one_round(TransmittingQueue, TransmittingQueue.remove,
+                                                      queue_size)).repeat(5, 20))
+
+        # time per packet going through the queue
+        print('%8d %18.3f %18.3f' % (queue_size, old_time / 20 / queue_size * 1e6, new_time / 20 / queue_size * 1e6))
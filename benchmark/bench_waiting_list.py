@@ -0,0 +1,96 @@
+"""
+Waiting list of the data packets that have no route, with DSDV, Greedy and Q-routing at 50 and 100 drones. The packets are woken
+up by the updates of the routing information about their destination, instead of the former periodic check of the
+whole waiting list (every 0.6s). This reports:
+    - the number of packets put into the waiting list and how long they waited before getting a next hop
+    - the number of next hop selections made to wake them up, compared with the number the periodic check would have
+      made (the size of every waiting list, sampled every 0.6s)
+
+Usage (from the root of the repository):
+    python -m benchmark.bench_waiting_list
+"""
+
+from benchmark.common import run_scenario
+from entities.waiting_list import WaitingList
+from simulator.simulator import Simulator
+
+
+class Probe:
+    def __init__(self):
+        self.sim = None
+        self.waited = 0
+        self.attempts = 0
+        self.waiting_since = dict()  # id of a waiting packet -> when it was put into the waiting list
+        self.woken = dict()  # id of a woken packet -> (when it was put into the waiting list, when it was woken)
+
+    def install(self):
+        append = WaitingList.append
+        take = WaitingList.take
+        probe = self
+
+        def probed_append(waiting_list, packet):
+            if id(packet) in probe.woken:
+                probe.waiting_since[id(packet)] = probe.woken.pop(id(packet))[0]  # still no next hop
+            elif id(packet) not in probe.waiting_since:
+                probe.waiting_since[id(packet)] = probe.sim.env.now
+                probe.waited += 1
+            return append(waiting_list, packet)
+
+        def probed_take(waiting_list, dst_id):
+            packets = take(waiting_list, dst_id)
+            probe.attempts += len(packets)
+            for packet in packets:
+                probe.woken[id(packet)] = (probe.waiting_since.pop(id(packet)), probe.sim.env.now)
+            return packets
+
+        WaitingList.append = probed_append
+        WaitingList.take = probed_take
+        return append, take
+
+    def mean_waiting_time(self):
+        if not self.woken:
+            return 0
+        return sum(woken - since for since, woken in self.woken.values()) / len(self.woken)
+
+
+def periodic_check_cost(sim, check_interval=0.6 * 1e6):
+    """Number of next hop selections made by the former periodic check, i.e., the size of the waiting lists"""
+
+    cost = [0]
+
+    def sample():
+        while True:
+            yield sim.env.timeout(check_interval)
+            cost[0] += sum(len(drone.waiting_list) for drone in sim.drones)
+
+    sim.env.process(sample())
+    return cost
+
+
+if __name__ == "__main__":
+    print('%10s %8s %10s %14s %16s %16s' % ('protocol', 'drones', 'waited', 'wait (ms)', 'wake-up checks',
+                                            'periodic checks'))
+
+    for protocol in ['Dsdv', 'Greedy', 'QRouting']:
+        for n_drones, sim_time in [(50, 3e6), (100, 2e6)]:
+            probe = Probe()
+            append, take = probe.install()
+
+            # keep the simulator as soon as it is created, so that the probe can read the simulation time
+            costs = []
+            init = Simulator.__init__
+
+            def probed_init(sim, *args, **kwargs):
+                probe.sim = sim
+                init(sim, *args, routing_protocol=protocol, **kwargs)
+                costs.append(periodic_check_cost(sim))
+
+            Simulator.__init__ = probed_init
+            try:
+                run_scenario(n_drones=n_drones, sim_time=sim_time)
+            finally:
+                Simulator.__init__ = init
+                WaitingList.append, WaitingList.take = append, take
+
+            print('%10s %8d %10d %14.1f %16d %16d' % (protocol, n_drones, probe.waited, probe.mean_waiting_time() / 1e3,
+                                                      probe.attempts, costs[0][0]))
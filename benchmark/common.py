@@ -0,0 +1,58 @@
+import time
+import simpy
+from collections import defaultdict
+from utils import config, trace
+
+
+class CountingEnvironment(simpy.Environment):
+    """
+    SimPy environment that counts every event it schedules, used to measure how much work the simulation kernel does
+
+    Attributes:
+        event_count: number of events that have been scheduled so far
+        events_by_process: number of events scheduled by each kind of process (name of the generator function), events
+                           scheduled outside any process are counted under "callback"
+    """
+
+    def __init__(self, initial_time=0):
+        super().__init__(initial_time)
+        self.event_count = 0
+        self.events_by_process = defaultdict(int)
+
+    def schedule(self, event, priority=1, delay=0):
+        self.event_count += 1
+
+        process = self.active_process
+        self.events_by_process[process._generator.__name__ if process is not None else 'callback'] += 1
+
+        super().schedule(event, priority, delay)
+
+
+def run_scenario(n_drones=config.NUMBER_OF_DRONES, sim_time=2e6, seed=2025, trace_level=None, **options):
+    """
+    Build a headless simulator and run it for "sim_time" (in us)
+    :param n_drones: number of drones
+    :param sim_time: simulated time
+    :param seed: random seed of the simulation
+    :param trace_level: level of the trace during the run, "config.HEADLESS_LOGGING_LEVEL" (no trace) by default, so
+                        that the wall-clock time does not include the trace
+    :param options: other keyword arguments of "Simulator", e.g., "routing_protocol", "profile"
+    :return: the simulator, the environment (which counts the scheduled events) and the wall-clock time in seconds
+    """
+
+    from simulator.simulator import Simulator
+
+    if trace_level is None:
+        trace_level = config.HEADLESS_LOGGING_LEVEL
+
+    env = CountingEnvironment()
+    channel_states = {i: simpy.Resource(env, capacity=1) for i in range(n_drones)}
+
+    with trace.level(trace_level):
+        start = time.perf_counter()
+        sim = Simulator(seed=seed, env=env, channel_states=channel_states, n_drones=n_drones,
+                        total_simulation_time=sim_time, headless=True, **options)
+        env.run(until=sim_time)
+        wall_time = time.perf_counter() - start
+
+    return sim, env, wall_time
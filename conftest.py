@@ -0,0 +1,2 @@
+# the unit tests are in "test/", they import the packages of the simulator from the root of the repository:
+#     python -m pytest test
@@ -1,5 +1,4 @@
 import math
-import matplotlib.pyplot as plt
 from utils import config
 
 
@@ -29,7 +28,7 @@ class EnergyModel:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/3/21
-    Updated at: 2024/3/21
+    Updated at: 2025/5/14
     """
 
     def __init__(self):
@@ -56,6 +55,8 @@ class EnergyModel:
         return p
 
     def test(self):
+        import matplotlib.pyplot as plt
+
         total_power = []
 
         test_speed = [i for i in range(0, 71, 2)]  # speed ranges from 0m/s to 70m/s
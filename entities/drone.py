@@ -1,10 +1,11 @@
 import simpy
-import logging
 import numpy as np
 import random
 import math
-import queue
 from entities.packet import DataPacket
+from entities.transmitting_queue import TransmittingQueue
+from entities.waiting_list import WaitingList
+from mac.transmission_state import MacSendState
 from routing.dsdv.dsdv import Dsdv
 from routing.greedy.greedy import Greedy
 from routing.grad.grad import Grad
@@ -19,18 +20,15 @@ from mobility.random_waypoint_3d import RandomWaypoint3D
 from topology.virtual_force.vf_motion_control import VfMotionController
 from energy.energy_model import EnergyModel
 from allocation.channel_assignment import ChannelAssigner
-from utils import config
-from utils.util_function import has_intersection
+from utils import config, trace
 from phy.large_scale_fading import sinr_calculator
 
-# config logging
-logging.basicConfig(filename='running_log.log',
-                    filemode='w',  # there are two modes: 'a' and 'w'
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    level=config.LOGGING_LEVEL
-                    )
+TRACE = trace.category('entities.drone')
 
-GLOBAL_DATA_PACKET_ID = 0
+# the modules that can be installed on the drone, chosen by their names (see "config.ROUTING_PROTOCOL", etc.)
+ROUTING_PROTOCOLS = {'Dsdv': Dsdv, 'Greedy': Greedy, 'Grad': Grad, 'Opar': Opar, 'QRouting': QRouting, 'QGeo': QGeo}
+MAC_PROTOCOLS = {'CsmaCa': CsmaCa, 'PureAloha': PureAloha}
+MOBILITY_MODELS = {'GaussMarkov3D': GaussMarkov3D, 'RandomWalk3D': RandomWalk3D, 'RandomWaypoint3D': RandomWaypoint3D}
 
 
 class Drone:
@@ -47,39 +45,51 @@ class Drone:
         simulator: the simulation platform that contains everything
         env: simulation environment created by simpy
         identifier: used to uniquely represent a drone
-        coords: the 3-D position of the drone
+        drone_states: state store of all the drones, the position, velocity, residual energy and sleep state of this
+                      drone are kept there (see "DroneStates")
+        coords: the 3-D position of the drone, as a list that is replaced (never modified) when the drone moves
+        position: view of the position of the drone in the array of the state store
         start_coords: the initial position of drone
         direction: current direction of the drone
         pitch: current pitch of the drone
         speed: current speed of the drone
-        velocity: velocity components in three directions
+        velocity: velocity components in three directions, as a list that is replaced (never modified)
         direction_mean: mean direction
         pitch_mean: mean pitch
         velocity_mean: mean velocity
-        inbox: a "Store" in simpy, used to receive the packets from other drones (calculate SINR)
+        inbox: a "Store" in simpy, used to receive the packets from other drones, it holds references to the messages
+               in the transmission log of the channel, in the order of their end time
+        inbox_cursor: the messages in the inbox before this index have been processed by this drone, since the
+                      messages are shared with other receivers, this state is kept by the receiver itself
+        reception_signal: the event that "receive()" is waiting for, it is triggered by the channel when a packet in the
+                          inbox has been transmitted completely
         buffer: used to describe the queuing delay of sending packet
         transmitting_queue: when the next hop node receives the packet, it should first temporarily store the packet in
                     "transmitting_queue" instead of immediately yield "packet_coming" process. It can prevent the buffer
-                    resource of the previous hop node from being occupied all the time
+                    resource of the previous hop node from being occupied all the time. Packets can be removed from it
+                    in O(1), and "offer" drops the packet when the queue already holds "max_queue_size" packets
         waiting_list: for reactive routing protocol, if there is no available next hop, it will put the data packet into
                       "waiting_list". Once the routing information bound for a destination is obtained, drone will get
-                      the data packets related to this destination, and put them into "transmitting_queue"
+                      the data packets related to this destination, and put them into "transmitting_queue". The
+                      packets are indexed by destination, the routing protocol wakes them up when its routing
+                      information about their destination is updated
         mac_protocol: installed mac protocol (CSMA/CA, ALOHA, etc.)
-        mac_process_dict: a dictionary, used to store the mac_process that is launched each time
-        mac_process_finish: a dictionary, used to indicate the completion of the process
-        mac_process_count: used to distinguish between different "mac_send" processes
+        mac_process_count: number of "mac_send" processes launched by this drone
         enable_blocking: describe whether the process of waiting for an ACK blocks the delivery of subsequent packets
                          1: stop-and-wait protocol; 0: sliding window (need further implemented)
         routing_protocol: routing protocol installed (GPSR, DSDV, etc.)
-        mobility_model: mobility model installed (3-D Gauss-markov, 3-D random waypoint, etc.)
+        mobility_model: mobility model installed (3-D Gauss-markov, 3-D random waypoint, etc.), all the drones are
+                        moved at once by the mobility engine of the simulator
         energy_model: energy consumption model installed
         residual_energy: the residual energy of drone in Joule
         sleep: if the drone is in a "sleep" state, it cannot perform packet sending and receiving operations
         channel_assigner: used to assign sub-channel for transmitting
+        sinr_calculator: computes the SINR of the packets being received, timed (as the next-hop selection of the
+                         routing protocol) when the simulation is profiled
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/11
-    Updated at: 2025/3/30
+    Updated at: 2025/5/14
     """
 
     def __init__(self,
@@ -92,7 +102,9 @@ class Drone:
         self.simulator = simulator
         self.env = env
         self.identifier = node_id
-        self.coords = coords
+        self.drone_states = simulator.drone_states
+        self._coords = coords
+        self.drone_states.positions[node_id] = coords
         self.start_coords = coords
 
         self.rng_drone = random.Random(self.identifier + self.simulator.seed)
@@ -109,21 +121,22 @@ class Drone:
         self.velocity_mean = self.speed
 
         self.inbox = inbox
+        self.inbox_cursor = 0
+        self.reception_signal = None
+        self.simulator.channel.register_receiver(self.identifier, self.wake_up)
 
         self.buffer = simpy.Resource(env, capacity=1)
         self.max_queue_size = config.MAX_QUEUE_SIZE
-        self.transmitting_queue = queue.Queue()  # queue in the real sense
-        self.waiting_list = []
+        self.transmitting_queue = TransmittingQueue(self.max_queue_size)  # queue in the real sense
+        self.waiting_list = WaitingList(env)
 
-        self.mac_protocol = CsmaCa(self)
-        self.mac_process_dict = dict()
-        self.mac_process_finish = dict()
+        self.mac_protocol = MAC_PROTOCOLS[self.simulator.mac_protocol](self)
         self.mac_process_count = 0
         self.enable_blocking = 1  # enable "stop-and-wait" protocol
 
-        self.routing_protocol = Dsdv(self.simulator, self)
+        self.routing_protocol = ROUTING_PROTOCOLS[self.simulator.routing_protocol](self.simulator, self)
 
-        self.mobility_model = GaussMarkov3D(self)
+        self.mobility_model = MOBILITY_MODELS[self.simulator.mobility_model](self)
         # self.motion_controller = VfMotionController(self)
 
         self.energy_model = EnergyModel()
@@ -132,12 +145,76 @@ class Drone:
 
         self.channel_assigner = ChannelAssigner(self.simulator, self)
 
+        self.sinr_calculator = sinr_calculator
+        profiler = self.simulator.profiler
+        if profiler is not None:
+            self.sinr_calculator = profiler.timed('phy.sinr', 'phy', sinr_calculator)
+            self.routing_protocol.next_hop_selection = profiler.timed('routing.next_hop', 'routing',
+                                                                     self.routing_protocol.next_hop_selection)
+
         self.env.process(self.generate_data_packet())
 
         self.env.process(self.feed_packet())
         # self.env.process(self.energy_monitor())
         self.env.process(self.receive())
 
+    @property
+    def coords(self):
+        return self._coords
+
+    @coords.setter
+    def coords(self, coords):
+        self.drone_states.positions[self.identifier] = coords
+        self.drone_states.positions_changed()
+        self.moved(coords, self._velocity)
+
+    @property
+    def position(self):
+        return self.drone_states.positions[self.identifier]
+
+    @property
+    def velocity(self):
+        return self._velocity
+
+    @velocity.setter
+    def velocity(self, velocity):
+        self.drone_states.velocities[self.identifier] = velocity
+        self._velocity = velocity
+
+    @property
+    def residual_energy(self):
+        return self.drone_states.residual_energy[self.identifier]
+
+    @residual_energy.setter
+    def residual_energy(self, residual_energy):
+        self.drone_states.residual_energy[self.identifier] = residual_energy
+
+    @property
+    def sleep(self):
+        return self.drone_states.sleep[self.identifier]
+
+    @sleep.setter
+    def sleep(self, sleep):
+        self.drone_states.sleep[self.identifier] = sleep
+
+    def moved(self, coords, velocity):
+        """
+        Called once the new position and velocity of this drone have been written into the state store (the mobility
+        engine writes those of all the drones at once)
+
+        Parameters:
+            coords: new position of the drone
+            velocity: new velocity of the drone
+        """
+
+        self._velocity = velocity
+        self._coords = coords
+
+        # every time the drone moves, the spatial index used for carrier sensing and the connectivity graph should be
+        # refreshed
+        self.simulator.carrier_sense.update_position(self)
+        self.simulator.connectivity.update_position(self)
+
     def generate_data_packet(self, traffic_pattern='Poisson'):
         """
         Generate one data packet, it should be noted that only when the current packet has been sent can the next
@@ -148,8 +225,6 @@ class Drone:
             traffic_pattern: characterize the time interval between generating data packets
         """
 
-        global GLOBAL_DATA_PACKET_ID
-
         while True:
             if not self.sleep:
                 if traffic_pattern == 'Uniform':
@@ -161,13 +236,13 @@ class Drone:
                     interval of data packets follows exponential distribution
                     """
 
-                    rate = 2  # on average, how many packets are generated in 1s
+                    rate = self.simulator.traffic_rate  # on average, how many packets are generated in 1s
                     yield self.env.timeout(round(self.rng_drone.expovariate(rate) * 1e6))
 
-                GLOBAL_DATA_PACKET_ID += 1  # data packet id
+                data_packet_id = self.simulator.id_allocator.next_id('data')
 
                 # randomly choose a destination
-                all_candidate_list = [i for i in range(config.NUMBER_OF_DRONES)]
+                all_candidate_list = [i for i in range(self.simulator.n_drones)]
                 all_candidate_list.remove(self.identifier)
                 dst_id = self.rng_drone.choice(all_candidate_list)
                 destination = self.simulator.drones[dst_id]  # obtain the destination drone
@@ -188,25 +263,23 @@ class Drone:
                 pkd = DataPacket(self,
                                  dst_drone=destination,
                                  creation_time=self.env.now,
-                                 data_packet_id=GLOBAL_DATA_PACKET_ID,
+                                 data_packet_id=data_packet_id,
                                  data_packet_length=data_packet_length,
                                  simulator=self.simulator,
                                  channel_id=channel_id)
                 pkd.transmission_mode = 0  # the default transmission mode of data packet is "unicast" (0)
 
-                self.simulator.metrics.datapacket_generated_num += 1
+                self.simulator.metrics.record_generation(self.identifier)
 
-                logging.info('------> UAV: %s generates a data packet (id: %s, dst: %s) at: %s, qsize is: %s',
-                             self.identifier, pkd.packet_id, destination.identifier, self.env.now,
-                             self.transmitting_queue.qsize())
+                if TRACE.on:
+                    TRACE.info('------> UAV: %s generates a data packet (id: %s, dst: %s) at: %s, qsize is: %s',
+                               self.identifier, pkd.packet_id, destination.identifier, self.env.now,
+                               self.transmitting_queue.qsize())
 
                 pkd.waiting_start_time = self.env.now
 
-                if self.transmitting_queue.qsize() < self.max_queue_size:
-                    self.transmitting_queue.put(pkd)
-                else:
-                    # the drone has no more room for new packets
-                    pass
+                # the packet is dropped if the drone has no more room for new packets
+                self.transmitting_queue.offer(pkd)
             else:  # cannot generate packets if "my_drone" is in sleep state
                 break
 
@@ -217,16 +290,8 @@ class Drone:
         """
 
         if self.enable_blocking:
-            if not self.mac_protocol.wait_ack_process_finish:
-                flag = False  # there is currently no waiting process for ACK
-            else:
-                # get the latest process status
-                final_indicator = list(self.mac_protocol.wait_ack_process_finish.items())[-1]
-
-                if final_indicator[1] == 0:
-                    flag = True  # indicates that the drone is still waiting
-                else:
-                    flag = False  # there is currently no waiting process for ACK
+            # True if the drone is still waiting for the ACK of the latest packet
+            flag = self.mac_protocol.ack_waits.is_waiting()
         else:
             flag = False
 
@@ -245,8 +310,10 @@ class Drone:
         2) control packet: no need to determine next hop, so it will directly start waiting for buffer
         """
 
+        sleep = self.drone_states.sleep  # read the state store directly, this loop runs every 10 us
+
         while True:
-            if not self.sleep:  # if drone still has enough energy to relay packets
+            if not sleep[self.identifier]:  # if drone still has enough energy to relay packets
                 yield self.env.timeout(10)  # for speed up the simulation
 
                 if not self.blocking():
@@ -261,8 +328,9 @@ class Drone:
                                     has_route, final_packet, enquire = self.routing_protocol.next_hop_selection(packet)
 
                                     if has_route:
-                                        logging.info('UAV: %s obtain the next hop: %s of data packet (id: %s)',
-                                                     self.identifier, packet.next_hop_id, packet.packet_id)
+                                        if TRACE.full:
+                                            TRACE.debug('UAV: %s obtain the next hop: %s of data packet (id: %s)',
+                                                        self.identifier, packet.next_hop_id, packet.packet_id)
 
                                         # in this case, the "final_packet" is actually the data packet
                                         yield self.env.process(self.packet_coming(final_packet))
@@ -295,33 +363,33 @@ class Drone:
 
         if not self.sleep:
             arrival_time = self.env.now
-            logging.info('Packet: %s waiting for UAV: %s buffer resource at: %s',
-                         pkd.packet_id, self.identifier, arrival_time)
+            if TRACE.full:
+                TRACE.debug('Packet: %s waiting for UAV: %s buffer resource at: %s',
+                            pkd.packet_id, self.identifier, arrival_time)
 
             with self.buffer.request() as request:
                 yield request  # wait to enter to buffer
 
-                logging.info('Packet: %s has been added to the buffer at: %s of UAV: %s, waiting time is: %s',
-                             pkd.packet_id, self.env.now, self.identifier, self.env.now - arrival_time)
+                if TRACE.full:
+                    TRACE.debug('Packet: %s has been added to the buffer at: %s of UAV: %s, waiting time is: %s',
+                                pkd.packet_id, self.env.now, self.identifier, self.env.now - arrival_time)
 
                 pkd.number_retransmission_attempt[self.identifier] += 1
 
                 if pkd.number_retransmission_attempt[self.identifier] == 1:
                     pkd.time_transmitted_at_last_hop = self.env.now
 
-                logging.info('Re-transmission times of pkd: %s at UAV: %s is: %s',
-                             pkd.packet_id, self.identifier, pkd.number_retransmission_attempt[self.identifier])
+                if TRACE.full:
+                    TRACE.debug('Re-transmission times of pkd: %s at UAV: %s is: %s',
+                                pkd.packet_id, self.identifier, pkd.number_retransmission_attempt[self.identifier])
 
                 # every time the drone initiates a data packet transmission, "mac_process_count" will be increased by 1
                 self.mac_process_count += 1
 
-                key=''.join(['mac_send', str(self.identifier), '_', str(pkd.packet_id)])
-
-                mac_process = self.env.process(self.mac_protocol.mac_send(pkd))
-                self.mac_process_dict[key] = mac_process
-                self.mac_process_finish[key] = 0
+                state = MacSendState()
+                state.process = self.env.process(self.mac_protocol.mac_send(pkd, state))
 
-                yield mac_process
+                yield state.process
         else:
             pass
 
@@ -339,21 +407,14 @@ class Drone:
         Parameter:
             data_pkd: the acked data packet
         """
-        temp_queue = queue.Queue()
 
-        while not self.transmitting_queue.empty():
-            pkd_entry = self.transmitting_queue.get()
-            if pkd_entry != data_pkd:
-                temp_queue.put(pkd_entry)
-
-        while not temp_queue.empty():
-            self.transmitting_queue.put(temp_queue.get())
+        self.transmitting_queue.remove(data_pkd)
 
     def receive(self):
         """
         Core receiving function of drone
-        1. the drone checks its "inbox" to see if there is incoming packet every 5 units (in us) from the time it is
-           instantiated to the end of the simulation
+        1. the drone sleeps until the channel signals that a packet in its "inbox" has been transmitted completely,
+           instead of checking the "inbox" every 5 units (in us)
         2. update the "inbox" by deleting the inconsequential data packet
         3. then the drone will detect if it receives a (or multiple) complete data packet(s)
         4. SINR calculation
@@ -369,24 +430,12 @@ class Drone:
 
                 if flag:
                     # find the transmitters of all packets currently transmitted on the channel
-                    transmitting_node_list = []
-                    for drone in self.simulator.drones:
-                        for item in drone.inbox:
-                            packet = item[0]
-                            insertion_time = item[1]
-                            transmitter = item[2]
-                            channel_used = item[4]
-                            transmitting_time = packet.packet_length / config.BIT_RATE * 1e6
-                            interval = [insertion_time, insertion_time + transmitting_time]
-
-                            for interval2 in time_span:
-                                if has_intersection(interval, interval2):
-                                    transmitting_node_list.append([transmitter, channel_used])
+                    transmitting_node_list = self.simulator.channel.overlapping_transmissions(time_span)
 
                     # remove duplicates
                     transmitting_node_list = [list(x) for x in {tuple(i) for i in transmitting_node_list}]
 
-                    sinr_list = sinr_calculator(self, all_drones_send_to_me, transmitting_node_list)
+                    sinr_list = self.sinr_calculator(self, all_drones_send_to_me, transmitting_node_list)
 
                     # receive the packet of the transmitting node corresponding to the maximum SINR
                     max_sinr = max(sinr_list)
@@ -395,23 +444,37 @@ class Drone:
 
                         pkd = potential_packet[which_one]
 
-                        if pkd.get_current_ttl() < config.MAX_TTL:
+                        if pkd.get_current_ttl() < self.simulator.max_ttl:
                             sender = all_drones_send_to_me[which_one][0]
 
-                            logging.info('Packet %s from UAV: %s is received by UAV: %s at time: %s, sinr is: %s',
-                                         pkd.packet_id, sender, self.identifier, self.simulator.env.now, max_sinr)
+                            if TRACE.on:
+                                TRACE.info('Packet %s from UAV: %s is received by UAV: %s at time: %s, sinr is: %s',
+                                           pkd.packet_id, sender, self.identifier, self.simulator.env.now, max_sinr)
 
                             yield self.env.process(self.routing_protocol.packet_reception(pkd, sender))
                         else:
-                            logging.info('Packet %s is dropped due to exceeding max TTL', pkd.packet_id)
+                            if TRACE.on:
+                                TRACE.info('Packet %s is dropped due to exceeding max TTL', pkd.packet_id)
                     else:  # sinr is lower than threshold
-                        self.simulator.metrics.collision_num += len(sinr_list)
+                        self.simulator.metrics.record_collision(self.identifier, len(sinr_list))
                         pass
-
-                yield self.env.timeout(5)
+                else:
+                    # nothing is complete in the inbox, wait for the channel to wake me up
+                    self.reception_signal = self.env.event()
+                    yield self.reception_signal
+                    self.reception_signal = None
             else:
                 break
 
+    def wake_up(self, event):
+        """
+        Callback of the completion event scheduled by the channel, resume "receive()" if it is idle. If the drone is
+        still busy with the previous packet, the completed packet will be found by the next "trigger()" anyway
+        """
+
+        if self.reception_signal is not None and not self.reception_signal.triggered:
+            self.reception_signal.succeed()
+
     def update_inbox(self):
         """
         Clear the packets that have been processed.
@@ -420,20 +483,15 @@ class Drone:
                        |==========|←- (packet p2 that has been processed, but also can affect p1, so reserve it)
         |==========|←- (packet p3 that has been processed, no impact on p1, can be deleted)
         --------------------------------------------------------> time
-        """
 
-        if config.VARIABLE_PAYLOAD_LENGTH:
-            max_transmission_time = ((config.AVERAGE_PAYLOAD_LENGTH + config.MAXIMUM_PAYLOAD_VARIATION)
-                                     / config.BIT_RATE) * 1e6  # for a single data packet
-        else:
-            max_transmission_time = (config.AVERAGE_PAYLOAD_LENGTH / config.BIT_RATE) * 1e6  # for a single data packet
+        The interference is now looked up in the transmission log of the channel, so a processed message can be
+        deleted from the inbox at once
+        """
 
-        for item in self.inbox:
-            insertion_time = item[1]  # the moment that this packet begins to be sent to the channel
-            received = item[3]  # used to indicate if this packet has been processed (1: processed, 0: unprocessed)
-            if insertion_time + 2 * max_transmission_time < self.env.now:  # no impact on the current packet
-                if received:
-                    self.inbox.remove(item)
+        if self.inbox_cursor:
+            # the inbox is shared with the channel, so it should be modified in place
+            del self.inbox[:self.inbox_cursor]
+            self.inbox_cursor = 0
 
     def trigger(self):
         """
@@ -451,25 +509,22 @@ class Drone:
         time_span = []
         potential_packet = []
 
-        for item in self.inbox:
-            packet = item[0]  # not sure yet whether it has been completely transmitted
+        # the channel only delivers the messages that have been completely transmitted, and in the order of end time
+        for index in range(self.inbox_cursor, len(self.inbox)):
+            item = self.inbox[index]
+            packet = item[0]
             insertion_time = item[1]  # transmission start time
             transmitter = item[2]
-            processed = item[3]  # indicate if this packet has been processed
+            end_time = item[3]  # the moment that the last bit of this packet arrives
             channel_used = item[4]  # indicate the sub-channel that used to transmit this packet
 
-            transmitting_time = packet.packet_length / config.BIT_RATE * 1e6  # expected transmission time
-
-            if not processed:  # this packet has not been processed yet
-                if self.env.now >= insertion_time + transmitting_time:  # it has been transmitted completely
-                    flag = 1
-                    all_drones_send_to_me.append([transmitter, channel_used])
-                    time_span.append([insertion_time, insertion_time + transmitting_time])
-                    potential_packet.append(packet)
-                    item[3] = 1
-                else:
-                    pass
+            if self.env.now >= end_time:  # it has been transmitted completely
+                flag = 1
+                all_drones_send_to_me.append([transmitter, channel_used])
+                time_span.append([insertion_time, end_time])
+                potential_packet.append(packet)
+                self.inbox_cursor = index + 1
             else:
-                pass
+                break
 
         return flag, all_drones_send_to_me, time_span, potential_packet
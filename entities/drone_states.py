@@ -0,0 +1,45 @@
+import numpy as np
+from phy.large_scale_fading import distance_array
+from utils import config
+
+
+class DroneStates:
+    """
+    State of all the drones of the simulation, kept as arrays (one row per drone)
+
+    The position, velocity, residual energy and sleep state of each drone are stored here, the drone exposes them
+    through properties, so that the modules which deal with many drones at once (the mobility engine, the SINR
+    calculation, the channel assignment...) can take slices of the whole swarm instead of walking through the drones.
+    The matrix of the distances between all pairs of drones is computed when it is needed, and kept until a drone moves
+
+    Attributes:
+        positions: array with shape (N, 3), position of each drone
+        velocities: array with shape (N, 3), velocity of each drone
+        residual_energy: array with shape (N,), residual energy of each drone in Joule
+        sleep: array with shape (N,), whether each drone has run out of energy
+        distances: matrix of the distances between all pairs of drones, None if a drone has moved since it was computed
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/14
+    Updated at: 2025/5/14
+    """
+
+    def __init__(self, n_drones):
+        self.positions = np.zeros((n_drones, 3))
+        self.velocities = np.zeros((n_drones, 3))
+        self.residual_energy = np.full(n_drones, config.INITIAL_ENERGY, dtype=float)
+        self.sleep = np.zeros(n_drones, dtype=bool)
+        self.distances = None
+
+    def positions_changed(self):
+        """Called every time some positions are updated"""
+
+        self.distances = None
+
+    def distance_matrix(self):
+        """Distances between all pairs of drones, computed at most once between two moves"""
+
+        if self.distances is None:
+            self.distances = distance_array(self.positions[:, np.newaxis, :], self.positions[np.newaxis, :, :])
+
+        return self.distances
@@ -1,3 +1,4 @@
+from collections import defaultdict
 from utils import config
 
 
@@ -5,14 +6,17 @@ class Packet:
     """
     Basic properties of the packet
 
-    all other packets need to inherit this class
+    all other packets need to inherit this class. Since thousands of packets (and their copies) can be in flight at
+    the same time, all the packet classes declare "__slots__" instead of carrying a "__dict__", so each subclass
+    should list the attributes it introduces in its own "__slots__"
 
     Attributes:
         packet_id: identifier of the packet, used to uniquely represent a packet
         creation_time: the generation time of the packet
         deadline: maximum segment lifetime of packet, in second
         __ttl: current "Time to live (TTL)"
-        number_retransmission_attempt: record the number of retransmissions of packet on different drones
+        number_retransmission_attempt: record the number of retransmissions of packet on different drones, the counter
+                                       of a drone is created when it first handles this packet
         waiting_start_time: the time at which tha packet is added to the "transmitting queue" of drone
         first_attempt_time: the time at which the packet starts the backoff stage
         transmitting_start_time: the time at which the packet can be transmitted to the channel after backoff
@@ -20,12 +24,19 @@ class Packet:
         time_transmitted_at_last_hop: the transmitting time at last drone
         transmission_mode: unicast or multicast or broadcast?
         channel_id: the identity of the channel that used to transmit this packet
+        intermediate_drones: the drones that this packet has passed through
+        msg_type: the type of control message (e.g., "hello" or "ack"), used by some protocol packets
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/11
-    Updated at: 2025/3/30
+    Updated at: 2025/5/14
     """
 
+    __slots__ = ('packet_id', 'packet_length', 'creation_time', 'deadline', 'simulator', 'channel_id', '__ttl',
+                 'number_retransmission_attempt', 'waiting_start_time', 'first_attempt_time',
+                 'transmitting_start_time', 'time_delivery', 'time_transmitted_at_last_hop', 'transmission_mode',
+                 'intermediate_drones', 'msg_type')
+
     def __init__(self,
                  packet_id,
                  packet_length,
@@ -41,10 +52,8 @@ class Packet:
         self.channel_id = channel_id
         self.__ttl = 0
 
-        self.number_retransmission_attempt = {}
-
-        for drone in self.simulator.drones:
-            self.number_retransmission_attempt[drone.identifier] = 0  # initialization
+        # the number of retransmission attempts is 0 for the drones that have not handled this packet
+        self.number_retransmission_attempt = defaultdict(int)
 
         # for calculating the queuing delay
         self.waiting_start_time = None
@@ -73,12 +82,15 @@ class DataPacket(Packet):
         dst_drone: destination drone of this data packet
         routing_path: record to whole routing path in centralized routing protocol
         next_hop_id: identifier of the next hop drone
+        previous_drone: the drone from which this packet is received, set by some routing protocols
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/11
-    Updated at: 2025/3/30
+    Updated at: 2025/5/14
     """
 
+    __slots__ = ('src_drone', 'dst_drone', 'routing_path', 'next_hop_id', 'previous_drone')
+
     def __init__(self,
                  src_drone,
                  dst_drone,
@@ -97,6 +109,8 @@ class DataPacket(Packet):
 
 
 class AckPacket(Packet):
+    __slots__ = ('src_drone', 'dst_drone', 'ack_packet')
+
     def __init__(self,
                  src_drone,
                  dst_drone,
@@ -0,0 +1,96 @@
+from collections import deque
+
+
+class TransmittingQueue:
+    """
+    FIFO queue of the packets that are waiting to be transmitted by a drone
+
+    It replaces "queue.Queue", which takes a lock on every operation (useless in a single-threaded SimPy simulation),
+    and can only delete a packet by draining and rebuilding the whole queue. Here each packet in the queue is wrapped in
+    a one-element list (a "cell"), and the cells of each packet object are indexed, so that a packet can be deleted in
+    O(1) by emptying its cells. The empty cells are discarded lazily when they reach the head of the queue
+
+    The packets are identified by the objects themselves (as the "!=" comparison of the former implementation), not by
+    their packet id, since the copies of a packet forwarded by different drones share the same packet id
+
+    Attributes:
+        maxsize: the number of packets above which "offer" refuses new packets
+        cells: cells in FIFO order, including the emptied ones
+        index: id of a packet object -> its cells that are still in the queue, in FIFO order
+        size: number of packets in the queue
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/14
+    Updated at: 2025/5/14
+    """
+
+    def __init__(self, maxsize=0):
+        self.maxsize = maxsize  # 0 means unbounded
+        self.cells = deque()
+        self.index = dict()
+        self.size = 0
+
+    def put(self, packet):
+        """Append the packet regardless of the size of the queue"""
+
+        cell = [packet]
+        self.cells.append(cell)
+        self.index.setdefault(id(packet), deque()).append(cell)
+        self.size += 1
+
+    def offer(self, packet):
+        """
+        Append the packet only if the queue has not reached "maxsize"
+        :return: True if the packet has been added, False if it has been dropped
+        """
+
+        if 0 < self.maxsize <= self.size:
+            return False
+
+        self.put(packet)
+        return True
+
+    def get(self):
+        """Remove and return the packet at the head of the queue, the queue should not be empty"""
+
+        while True:
+            cell = self.cells.popleft()
+            if cell[0] is not None:
+                break
+
+        packet = cell[0]
+        self._forget(packet)
+        self.size -= 1
+
+        return packet
+
+    def remove(self, packet):
+        """Delete all the occurrences of the packet from the queue, nothing happens if it is not in the queue"""
+
+        cells = self.index.pop(id(packet), None)
+        if cells is not None:
+            for cell in cells:
+                cell[0] = None
+            self.size -= len(cells)
+
+            if self.size == 0:
+                self.cells.clear()  # every remaining cell has been emptied
+
+    def _forget(self, packet):
+        # the cell at the head of the queue is always the earliest cell of its packet
+        cells = self.index[id(packet)]
+        cells.popleft()
+        if not cells:
+            del self.index[id(packet)]
+
+    def qsize(self):
+        return self.size
+
+    def empty(self):
+        return self.size == 0
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, packet):
+        return id(packet) in self.index
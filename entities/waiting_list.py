@@ -0,0 +1,118 @@
+import heapq
+
+
+class WaitingList:
+    """
+    Data packets that are waiting for a route, indexed by their destination
+
+    For the reactive routing protocols, a data packet for which no next hop is available is put into the waiting list.
+    Instead of checking the whole waiting list periodically, the routing protocol takes out the packets bound for a
+    destination when its routing information about this destination is updated (e.g., a route to this destination is
+    learned, or a neighbor that is closer to this destination is found), and tries to send them again (see "wake")
+
+    A destination may never be woken up, so the packets are also dropped once their deadline has passed: the deadlines
+    are kept in a heap, and the expired packets are removed every time a packet is put into or taken out of the list
+
+    Attributes:
+        env: simulation environment
+        packets: destination id -> packets bound for this destination, in the order they were added
+        size: number of packets in the waiting list
+        deadlines: heap of (expiry time, order of insertion, packet), a packet that has already been taken out of the
+                   list stays in the heap until it expires
+        tracked: ids of the packet objects in "deadlines", so that a packet put back into the list is not pushed again
+        order: number of packets pushed into "deadlines" so far, it breaks the ties between equal expiry times
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/14
+    Updated at: 2025/5/14
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self.packets = dict()
+        self.size = 0
+        self.deadlines = []
+        self.tracked = set()
+        self.order = 0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for packets in self.packets.values():
+            yield from packets
+
+    def append(self, packet):
+        """Put a packet into the waiting list, a packet that is already waiting is not added twice"""
+
+        self.purge()
+
+        packets = self.packets.setdefault(packet.dst_drone.identifier, [])
+        if not any(waiting_pkd is packet for waiting_pkd in packets):
+            packets.append(packet)
+            self.size += 1
+
+        if id(packet) not in self.tracked:
+            self.tracked.add(id(packet))
+            heapq.heappush(self.deadlines, (packet.creation_time + packet.deadline, self.order, packet))
+            self.order += 1
+
+    def is_waiting_for(self, dst_id):
+        return dst_id in self.packets
+
+    def destinations(self):
+        """Ids of the destinations that have waiting packets"""
+
+        return list(self.packets)
+
+    def take(self, dst_id):
+        """Take all the packets bound for "dst_id" out of the waiting list"""
+
+        self.purge()
+
+        packets = self.packets.pop(dst_id, [])
+        self.size -= len(packets)
+
+        return packets
+
+    def purge(self):
+        """Drop the packets whose deadline has passed"""
+
+        now = self.env.now
+        while self.deadlines and self.deadlines[0][0] < now:
+            _, _, packet = heapq.heappop(self.deadlines)
+            self.tracked.discard(id(packet))
+
+            dst_id = packet.dst_drone.identifier
+            packets = self.packets.get(dst_id, [])
+            for i, waiting_pkd in enumerate(packets):
+                if waiting_pkd is packet:
+                    del packets[i]
+                    self.size -= 1
+                    if not packets:
+                        del self.packets[dst_id]
+                    break
+
+    def wake(self, dst_id, routing_protocol, has_route=None):
+        """
+        Try again to send the packets waiting for "dst_id", called by the routing protocol once its routing information
+        about this destination is updated. The packets that still have no next hop wait for the next update
+        :param dst_id: the destination whose routing information has been updated
+        :param routing_protocol: the routing protocol of the drone that owns this waiting list
+        :param has_route: function that tells whether a packet has a next hop now, by default the first value returned
+                          by "routing_protocol.next_hop_selection"
+        """
+
+        my_drone = routing_protocol.my_drone
+        if my_drone.sleep:
+            return
+
+        if has_route is None:
+            def has_route(packet):
+                return routing_protocol.next_hop_selection(packet)[0]
+
+        for waiting_pkd in self.take(dst_id):
+            if has_route(waiting_pkd):
+                my_drone.transmitting_queue.put(waiting_pkd)
+            else:
+                self.append(waiting_pkd)  # wait for the next update
@@ -1,16 +1,10 @@
 import simpy
-import logging
 import random
 from phy.phy import Phy
-from utils import config
-from utils.util_function import check_channel_availability
+from mac.transmission_state import AckWaitTable
+from utils import config, trace
 
-# config logging
-logging.basicConfig(filename='running_log.log',
-                    filemode='w',  # there are two modes: 'a' and 'w'
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    level=config.LOGGING_LEVEL
-                    )
+TRACE = trace.category('mac.csma_ca')
 
 
 class CsmaCa:
@@ -32,8 +26,10 @@ class CsmaCa:
         rng_mac: a Random class based on which we can call the function that generates the random number
         env: simulation environment created by simpy
         phy: the installed physical layer
-        channel_states: used to determine if the channel is idle
+        channel_states: used to occupy the channel
+        carrier_sense: used to determine if the channel is idle
         enable_ack: use ack or not
+        ack_waits: the processes of waiting for ACK that have not finished
 
     References:
         [1] J. Li, et al., "Packet Delay in UAV Wireless Networks Under Non-saturated Traffic and Channel Fading
@@ -48,7 +44,7 @@ class CsmaCa:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/11
-    Updated at: 2025/2/25
+    Updated at: 2025/5/12
     """
 
     def __init__(self, drone):
@@ -58,17 +54,16 @@ class CsmaCa:
         self.env = drone.env
         self.phy = Phy(self)
         self.channel_states = self.simulator.channel_states
+        self.carrier_sense = self.simulator.carrier_sense
         self.enable_ack = True
 
-        self.wait_ack_process_dict = dict()
-        self.wait_ack_process_finish = dict()
-        self.wait_ack_process_count = 0
-        self.wait_ack_process = None
+        self.ack_waits = AckWaitTable()
 
-    def mac_send(self, pkd):
+    def mac_send(self, pkd, state):
         """
         Control when drone can send packet
         :param pkd: the packet that needs to send
+        :param state: the "MacSendState" of this transmission attempt
         :return: none
         """
 
@@ -78,7 +73,8 @@ class CsmaCa:
         backoff = self.rng_mac.randint(0, contention_window - 1) * config.SLOT_DURATION  # random backoff, in us
         to_wait = config.DIFS_DURATION + backoff
 
-        logging.info('UAV: %s back-off is: %s', self.my_drone.identifier, backoff)
+        if TRACE.full:
+            TRACE.debug('UAV: %s back-off is: %s', self.my_drone.identifier, backoff)
 
         while to_wait:
             # wait until the channel becomes idle
@@ -93,61 +89,64 @@ class CsmaCa:
                 pkd.first_attempt_time = self.env.now
 
             # start listen the channel at backoff stage
-            self.env.process(self.listen(self.channel_states, self.simulator.drones, pkd))
+            self.env.process(self.listen(self.channel_states, self.simulator.drones, state))
 
-            logging.info('UAV: %s should wait from: %s, and wait for %s',
-                         self.my_drone.identifier, self.env.now, to_wait)
+            if TRACE.full:
+                TRACE.debug('UAV: %s should wait from: %s, and wait for %s',
+                            self.my_drone.identifier, self.env.now, to_wait)
             start_time = self.env.now  # start to wait
 
             try:
                 yield self.env.timeout(to_wait)
                 to_wait = 0  # to break the while loop
 
-                key = ''.join(['mac_send', str(self.my_drone.identifier), '_', str(pkd.packet_id)])
-
-                self.my_drone.mac_process_finish[key] = 1  # mark the process as "finished"
+                state.finished = True  # mark the process as "finished"
+                self.carrier_sense.remove_contender(self.my_drone)  # stop listening
 
                 # occupy the channel to send packet
                 with self.channel_states[self.my_drone.identifier].request() as req:
-                    yield req
-
-                    logging.info('UAV: %s can send packet (pkd id: %s) at: %s ',
-                                 self.my_drone.identifier, pkd.packet_id, self.env.now)
+                    self.carrier_sense.channel_occupied(self.my_drone)
+                    try:
+                        yield req
 
-                    pkd.transmitting_start_time = self.env.now
-                    transmission_mode = pkd.transmission_mode
+                        if TRACE.on:
+                            TRACE.info('UAV: %s can send packet (pkd id: %s) at: %s ',
+                                       self.my_drone.identifier, pkd.packet_id, self.env.now)
 
-                    if transmission_mode == 0:  # for unicast
-                        next_hop_id = pkd.next_hop_id
+                        pkd.transmitting_start_time = self.env.now
+                        transmission_mode = pkd.transmission_mode
 
-                        pkd.increase_ttl()
-                        self.phy.unicast(pkd, next_hop_id)  # note: unicast function should be executed first!
-                        yield self.env.timeout(pkd.packet_length / config.BIT_RATE * 1e6)  # transmission delay
+                        if transmission_mode == 0:  # for unicast
+                            next_hop_id = pkd.next_hop_id
 
-                        # only unicast data packets need to wait for ACK
-                        logging.info('UAV: %s start to wait ACK for packet: %s at time: %s',
-                                     self.my_drone.identifier, pkd.packet_id, self.env.now)
+                            pkd.increase_ttl()
+                            self.phy.unicast(pkd, next_hop_id)  # note: unicast function should be executed first!
+                            yield self.env.timeout(pkd.packet_length / config.BIT_RATE * 1e6)  # transmission delay
 
-                        if self.enable_ack:
-                            # used to identify the process of waiting ack
-                            key2 = ''.join(['wait_ack', str(self.my_drone.identifier), '_', str(pkd.packet_id)])
+                            # only unicast data packets need to wait for ACK
+                            if TRACE.full:
+                                TRACE.debug('UAV: %s start to wait ACK for packet: %s at time: %s',
+                                            self.my_drone.identifier, pkd.packet_id, self.env.now)
 
-                            self.wait_ack_process = self.env.process(self.wait_ack(pkd))
-                            self.wait_ack_process_dict[key2] = self.wait_ack_process
-                            self.wait_ack_process_finish[key2] = 0  # indicate that this process hasn't finished
+                            if self.enable_ack:
+                                self.ack_waits.start(pkd.packet_id, self.env.process(self.wait_ack(pkd)))
 
-                            # continue to occupy the channel to prevent the ACK from being interfered
-                            yield self.env.timeout(config.SIFS_DURATION + config.ACK_PACKET_LENGTH / config.BIT_RATE * 1e6)
+                                # continue to occupy the channel to prevent the ACK from being interfered
+                                yield self.env.timeout(config.SIFS_DURATION +
+                                                       config.ACK_PACKET_LENGTH / config.BIT_RATE * 1e6)
 
-                    elif transmission_mode == 1:
-                        pkd.increase_ttl()
-                        self.phy.broadcast(pkd)
-                        yield self.env.timeout(pkd.packet_length / config.BIT_RATE * 1e6)
+                        elif transmission_mode == 1:
+                            pkd.increase_ttl()
+                            self.phy.broadcast(pkd)
+                            yield self.env.timeout(pkd.packet_length / config.BIT_RATE * 1e6)
+                    finally:
+                        self.carrier_sense.channel_released(self.my_drone)  # even if the process is interrupted
 
             except simpy.Interrupt:
                 already_wait = self.env.now - start_time
-                logging.info('UAV: %s was interrupted at: %s, already waits for: %s, original to_wait is: %s',
-                             self.my_drone.identifier, self.env.now, already_wait, to_wait)
+                if TRACE.full:
+                    TRACE.debug('UAV: %s was interrupted at: %s, already waits for: %s, original to_wait is: %s',
+                                self.my_drone.identifier, self.env.now, already_wait, to_wait)
 
                 to_wait -= already_wait  # the remaining waiting time
 
@@ -171,23 +170,23 @@ class CsmaCa:
             yield self.env.timeout(config.ACK_TIMEOUT)
             self.my_drone.routing_protocol.penalize(pkd)
 
-            logging.info('ACK timeout of packet: %s at: %s', pkd.packet_id, self.env.now)
+            if TRACE.on:
+                TRACE.info('ACK timeout of packet: %s at: %s', pkd.packet_id, self.env.now)
 
             if pkd.number_retransmission_attempt[self.my_drone.identifier] < config.MAX_RETRANSMISSION_ATTEMPT:
                 yield self.env.process(self.my_drone.packet_coming(pkd))
             else:
-                self.simulator.metrics.mac_delay.append((self.simulator.env.now - pkd.first_attempt_time) / 1e3)
-
-                key2 = ''.join(['wait_ack', str(self.my_drone.identifier), '_', str(pkd.packet_id)])
+                self.simulator.metrics.mac_delay.add((self.simulator.env.now - pkd.first_attempt_time) / 1e3)
+                self.ack_waits.finish(pkd.packet_id)
 
-                self.my_drone.mac_protocol.wait_ack_process_finish[key2] = 1
-
-                logging.info('Packet: %s is dropped!', pkd.packet_id)
+                if TRACE.on:
+                    TRACE.info('Packet: %s is dropped!', pkd.packet_id)
 
         except simpy.Interrupt:
             # receive ACK in time
-            logging.info('UAV: %s receives the ACK for data packet: %s, at: %s',
-                         self.my_drone.identifier, pkd.packet_id, self.env.now)
+            if TRACE.on:
+                TRACE.info('UAV: %s receives the ACK for data packet: %s, at: %s',
+                           self.my_drone.identifier, pkd.packet_id, self.env.now)
 
     def wait_idle_channel(self, sender_drone, drones):
         """
@@ -197,34 +196,37 @@ class CsmaCa:
         :return: none
         """
 
-        while not check_channel_availability(self.channel_states, sender_drone, drones):
+        while not self.carrier_sense.check_channel_availability(sender_drone):
             yield self.env.timeout(config.SLOT_DURATION)
 
-    def listen(self, channel_states, drones, pkd):
+    def listen(self, channel_states, drones, state):
         """
         When the drone waits until the channel is idle, it starts its own timer to count down, in this time, the drone
         needs to detect the state of the channel during this period, and if the channel is found to be busy again, the
-        countdown process should be interrupted
+        countdown process should be interrupted. Rather than sensing the channel every 1 us, the drone registers itself
+        as a contender, and "carrier_sense" notifies it at the tick when a drone in its sensing range occupies the channel
         :param channel_states: a dictionary, indicates the use of the channel by different drones
         :param drones: a list, contains all drones in the simulation
-        :param pkd: listen to the channel for which packet
+        :param state: the "MacSendState" of the transmission attempt that listens to the channel
         :return: none
         """
 
-        logging.info('At time: %s, UAV: %s starts to listen the channel and perform backoff',
-                     self.env.now, self.my_drone.identifier)
+        if TRACE.full:
+            TRACE.debug('At time: %s, UAV: %s starts to listen the channel and perform backoff',
+                        self.env.now, self.my_drone.identifier)
 
-        key = ''.join(['mac_send', str(self.my_drone.identifier), '_', str(pkd.packet_id)])
+        start_time = self.env.now  # the sensing ticks are aligned with this moment
 
-        while self.my_drone.mac_process_finish[key] == 0:  # interrupt only if the process is not complete
-            if check_channel_availability(channel_states, self.my_drone, drones) is False:
+        while not state.finished:  # interrupt only if the process is not complete
+            if self.carrier_sense.check_channel_availability(self.my_drone) is False:
                 # found channel be occupied, start interrupt
-
-                key = ''.join(['mac_send',str(self.my_drone.identifier),'_',str(pkd.packet_id)])
-                if not self.my_drone.mac_process_dict[key].triggered:
-                    self.my_drone.mac_process_dict[key].interrupt()
+                if not state.process.triggered:
+                    state.process.interrupt()
                     break
             else:
                 pass
 
-            yield self.env.timeout(1)
+            # wait until the channel is found busy, or the backoff is finished
+            notification = self.env.event()
+            self.carrier_sense.add_contender(self.my_drone, start_time, notification)
+            yield notification
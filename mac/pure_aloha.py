@@ -1,15 +1,10 @@
 import simpy
-import logging
 import random
 from phy.phy import Phy
-from utils import config
+from mac.transmission_state import AckWaitTable
+from utils import config, trace
 
-# config logging
-logging.basicConfig(filename='running_log.log',
-                    filemode='w',  # there are two modes: 'a' and 'w'
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    level=config.LOGGING_LEVEL
-                    )
+TRACE = trace.category('mac.pure_aloha')
 
 
 class PureAloha:
@@ -40,12 +35,9 @@ class PureAloha:
         self.channel_states = self.simulator.channel_states
         self.enable_ack = True
 
-        self.wait_ack_process_dict = dict()
-        self.wait_ack_process_finish = dict()
-        self.wait_ack_process_count = 0
-        self.wait_ack_process = None
+        self.ack_waits = AckWaitTable()
 
-    def mac_send(self, pkd):
+    def mac_send(self, pkd, state):
         yield self.env.timeout(0.01)
 
         if pkd.number_retransmission_attempt[self.my_drone.identifier] == 1:
@@ -56,17 +48,18 @@ class PureAloha:
             """
             pkd.first_attempt_time = self.env.now
 
-        key = ''.join(['mac_send', str(self.my_drone.identifier), '_', str(pkd.packet_id)])
-        self.my_drone.mac_process_finish[key] = 1  # mark the process as "finished"
+        state.finished = True  # mark the process as "finished"
 
-        logging.info('UAV: %s can send packet at: %s', self.my_drone.identifier, self.env.now)
+        if TRACE.on:
+            TRACE.info('UAV: %s can send packet at: %s', self.my_drone.identifier, self.env.now)
 
         transmission_mode = pkd.transmission_mode
 
         if transmission_mode == 0:  # for unicast
             # only unicast data packets need to wait for ACK
-            logging.info('UAV: %s start to wait ACK for packet: %s at time: %s',
-                         self.my_drone.identifier, pkd.packet_id, self.env.now)
+            if TRACE.full:
+                TRACE.debug('UAV: %s start to wait ACK for packet: %s at time: %s',
+                            self.my_drone.identifier, pkd.packet_id, self.env.now)
 
             next_hop_id = pkd.next_hop_id
 
@@ -75,11 +68,7 @@ class PureAloha:
             yield self.env.timeout(pkd.packet_length / config.BIT_RATE * 1e6)  # transmission delay
 
             if self.enable_ack:
-                # used to identify the process of waiting ack
-                key2 = ''.join(['wait_ack', str(self.my_drone.identifier), '_', str(pkd.packet_id)])
-                self.wait_ack_process = self.env.process(self.wait_ack(pkd))
-                self.wait_ack_process_dict[key2] = self.wait_ack_process
-                self.wait_ack_process_finish[key2] = 0  # indicate that this process hasn't finished
+                self.ack_waits.start(pkd.packet_id, self.env.process(self.wait_ack(pkd)))
 
                 # continue to occupy the channel to prevent the ACK from being interfered
                 yield self.env.timeout(config.SIFS_DURATION + config.ACK_PACKET_LENGTH / config.BIT_RATE * 1e6)
@@ -101,7 +90,8 @@ class PureAloha:
             yield self.env.timeout(config.ACK_TIMEOUT)
             self.my_drone.routing_protocol.penalize(pkd)
 
-            logging.info('ACK timeout of packet: %s at: %s', pkd.packet_id, self.env.now)
+            if TRACE.on:
+                TRACE.info('ACK timeout of packet: %s at: %s', pkd.packet_id, self.env.now)
 
             if pkd.number_retransmission_attempt[self.my_drone.identifier] < config.MAX_RETRANSMISSION_ATTEMPT:
                 # random wait
@@ -112,14 +102,14 @@ class PureAloha:
                 yield self.env.timeout(waiting_time)
                 yield self.env.process(self.my_drone.packet_coming(pkd))  # resend
             else:
-                self.simulator.metrics.mac_delay.append((self.simulator.env.now - pkd.first_attempt_time) / 1e3)
+                self.simulator.metrics.mac_delay.add((self.simulator.env.now - pkd.first_attempt_time) / 1e3)
+                self.ack_waits.finish(pkd.packet_id)
 
-                key2 = ''.join(['wait_ack', str(self.my_drone.identifier), '_', str(pkd.packet_id)])
-                self.my_drone.mac_protocol.wait_ack_process_finish[key2] = 1
-
-                logging.info('Packet: %s is dropped!', pkd.packet_id)
+                if TRACE.on:
+                    TRACE.info('Packet: %s is dropped!', pkd.packet_id)
 
         except simpy.Interrupt:
             # receive ACK in time
-            logging.info('UAV: %s receives the ACK for data packet: %s, at: %s',
-                         self.my_drone.identifier, pkd.packet_id, self.env.now)
+            if TRACE.on:
+                TRACE.info('UAV: %s receives the ACK for data packet: %s, at: %s',
+                           self.my_drone.identifier, pkd.packet_id, self.env.now)
@@ -0,0 +1,92 @@
+class MacSendState:
+    """
+    State of one "mac_send" process, it is created by the drone for each transmission attempt and shared with the
+    "listen" processes of this attempt
+
+    Attributes:
+        process: the "mac_send" process, interrupted by "listen" when the channel is found busy during the backoff
+        finished: True once the backoff is over, "listen" stops listening then
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/14
+    Updated at: 2025/5/14
+    """
+
+    __slots__ = ('process', 'finished')
+
+    def __init__(self):
+        self.process = None
+        self.finished = False
+
+
+class AckWait:
+    """
+    State of one "wait_ack" process
+
+    Attributes:
+        packet_id: id of the data packet that waits for its ACK
+        process: the "wait_ack" process, interrupted by the routing protocol when the ACK is received
+        finished: True once the ACK is received or the packet is dropped
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/14
+    Updated at: 2025/5/14
+    """
+
+    __slots__ = ('packet_id', 'process', 'finished')
+
+    def __init__(self, packet_id, process):
+        self.packet_id = packet_id
+        self.process = process
+        self.finished = False
+
+
+class AckWaitTable:
+    """
+    The "wait_ack" processes of a drone that have not finished, indexed by packet id
+
+    A finished wait is removed from the table, so that its size is bounded by the number of packets that are waiting
+    for ACK at the same time, instead of growing with the number of packets sent during the simulation. The most recent
+    wait is also kept apart, since the "stop-and-wait" protocol only looks at it
+
+    Attributes:
+        waits: packet id -> "AckWait" that has not finished
+        latest: the "AckWait" that was started most recently, it may have finished
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/14
+    Updated at: 2025/5/14
+    """
+
+    def __init__(self):
+        self.waits = dict()
+        self.latest = None
+
+    def start(self, packet_id, process):
+        """Register a new "wait_ack" process, it replaces the previous wait of the same packet (re-transmission)"""
+
+        ack_wait = AckWait(packet_id, process)
+        self.waits[packet_id] = ack_wait
+        self.latest = ack_wait
+
+        return ack_wait
+
+    def get(self, packet_id):
+        """The wait of this packet, None if there is no such wait or it has finished"""
+
+        return self.waits.get(packet_id)
+
+    def finish(self, packet_id):
+        """Mark the wait of this packet as finished and remove it"""
+
+        ack_wait = self.waits.pop(packet_id, None)
+        if ack_wait is not None:
+            ack_wait.finished = True
+
+    def is_waiting(self):
+        """Whether the most recent wait has not finished"""
+
+        return self.latest is not None and not self.latest.finished
+
+    def __len__(self):
+        return len(self.waits)
@@ -2,8 +2,6 @@ import random
 import math
 import numpy as np
 from utils import config
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
 
 
 class GaussMarkov3D:
@@ -15,7 +13,8 @@ class GaussMarkov3D:
     is to determine how often the drone updates its position, velocity and other information, the denser this time
     interval is, the higher the simulation accuracy. 2) The second parameter is to determine how often the drone
     changes its velocity, direction, and other information. The smaller the interval is, the drone will change its
-    motion direction frequently. 3) The last parameter is to control the randomness of the mobility.
+    motion direction frequently. 3) The last parameter is to control the randomness of the mobility. All the drones
+    are moved at once by the mobility engine of the simulator, the model of each drone draws its own random velocity.
 
     Attributes:
         model_identifier: model name
@@ -33,7 +32,7 @@ class GaussMarkov3D:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/17
-    Updated at: 2025/1/7
+    Updated at: 2025/5/14
     """
 
     def __init__(self, drone):
@@ -59,84 +58,72 @@ class GaussMarkov3D:
         self.min_z = 0
         self.max_z = config.MAP_HEIGHT
 
-        self.my_drone.simulator.env.process(self.mobility_update(self.my_drone))
+        self.my_drone.simulator.mobility.register(self)
         self.trajectory = []
-        self.my_drone.simulator.env.process(self.show_trajectory())
-
-    def mobility_update(self, drone):
-        while True:
-            env = drone.simulator.env
-            drone_id = drone.identifier
-            cur_position = drone.coords
-            cur_velocity = drone.velocity
-            cur_direction = drone.direction
-            cur_pitch = drone.pitch
-            velocity_mean = drone.velocity_mean
-            direction_mean = drone.direction_mean
-            pitch_mean = drone.pitch_mean
-
-            # update the position of next time step
-            if config.STATIC_CASE == 0:
-                next_position_x = cur_position[0] + cur_velocity[0] * self.position_update_interval / 1e6
-                next_position_y = cur_position[1] + cur_velocity[1] * self.position_update_interval / 1e6
-                next_position_z = cur_position[2] + cur_velocity[2] * self.position_update_interval / 1e6
-            else:
-                next_position_x = cur_position[0]
-                next_position_y = cur_position[1]
-                next_position_z = cur_position[2]
-
-            cur_speed = ((cur_velocity[0] ** 2) + (cur_velocity[1] ** 2) + (cur_velocity[2] ** 2)) ** 0.5
-
-            if env.now % self.direction_update_interval == 0:  # update velocity and direction
-                self.move_counter += 1
-                alpha2 = 1.0 - self.alpha
-                alpha3 = math.sqrt(1.0 - self.alpha * self.alpha)
-
-                next_speed = (self.alpha * cur_speed + alpha2 * velocity_mean +
-                              alpha3 * self.rng_mobility.normalvariate(0, 1))
-
-                next_direction = (self.alpha * cur_direction + alpha2 * direction_mean +
-                                  alpha3 * self.rng_mobility.normalvariate(0, 1))
-
-                next_pitch = (self.alpha * cur_pitch + alpha2 * pitch_mean +
-                              alpha3 * self.rng_mobility.normalvariate(0, 1))
-
-                next_velocity_x = next_speed * math.cos(next_direction) * math.cos(next_pitch)
-                next_velocity_y = next_speed * math.sin(next_direction) * math.cos(next_pitch)
-                next_velocity_z = next_speed * math.sin(next_pitch)
-
-                next_position = [next_position_x, next_position_y, next_position_z]
-
-                if drone_id == 1:
-                    self.trajectory.append(next_position)
-
-                next_velocity = [next_velocity_x, next_velocity_y, next_velocity_z]
-            else:
-                next_position = [next_position_x, next_position_y, next_position_z]
-
-                # velocity, direction and pitch should stay the same
-                next_direction = cur_direction
-                next_pitch = cur_pitch
-                next_velocity = cur_velocity
-                next_speed = ((cur_velocity[0] ** 2) + (cur_velocity[1] ** 2) + (cur_velocity[2] ** 2)) ** 0.5
-
-            # wall rebound
-            next_position, next_velocity, next_direction, next_pitch, direction_mean, pitch_mean = \
-                self.boundary_test(next_position, next_velocity, direction_mean, pitch_mean)
-
-            drone.coords = next_position
-            drone.direction = next_direction
-            drone.pitch = next_pitch
-            drone.velocity = next_velocity
-            drone.velocity_mean = velocity_mean
-            drone.direction_mean = direction_mean
-            drone.pitch_mean = pitch_mean
-
-            yield env.timeout(self.position_update_interval)
-            energy_consumption = (self.position_update_interval / 1e6) * drone.energy_model.power_consumption(drone.speed)
-            drone.residual_energy -= energy_consumption
+        if not self.my_drone.simulator.headless:
+            self.my_drone.simulator.env.process(self.show_trajectory())
+
+    def next_velocity(self, cur_velocity):
+        """Draw the velocity, direction and pitch of the drone for the next period, from its current velocity"""
+
+        drone = self.my_drone
+        self.move_counter += 1
+
+        cur_speed = ((cur_velocity[0] ** 2) + (cur_velocity[1] ** 2) + (cur_velocity[2] ** 2)) ** 0.5
+
+        alpha2 = 1.0 - self.alpha
+        alpha3 = math.sqrt(1.0 - self.alpha * self.alpha)
+
+        next_speed = (self.alpha * cur_speed + alpha2 * drone.velocity_mean +
+                      alpha3 * self.rng_mobility.normalvariate(0, 1))
+
+        next_direction = (self.alpha * drone.direction + alpha2 * drone.direction_mean +
+                          alpha3 * self.rng_mobility.normalvariate(0, 1))
+
+        next_pitch = (self.alpha * drone.pitch + alpha2 * drone.pitch_mean +
+                      alpha3 * self.rng_mobility.normalvariate(0, 1))
+
+        next_velocity_x = next_speed * math.cos(next_direction) * math.cos(next_pitch)
+        next_velocity_y = next_speed * math.sin(next_direction) * math.cos(next_pitch)
+        next_velocity_z = next_speed * math.sin(next_pitch)
+
+        return [next_velocity_x, next_velocity_y, next_velocity_z]
+
+    @staticmethod
+    def move_all(engine, models):
+        """
+        Move all the drones by one step
+        :param engine: the mobility engine, which holds the positions and velocities of all the drones
+        :param models: mobility model of each drone
+        :return: identifiers of the drones that moved
+        """
+
+        env = engine.simulator.env
+        model = models[0]
+
+        # update the position of next time step
+        if config.STATIC_CASE == 0:
+            engine.positions += engine.velocities * model.position_update_interval / 1e6
+
+        update_direction = env.now % model.direction_update_interval == 0
+        if update_direction:  # update velocity and direction
+            for drone_id, cur_velocity in enumerate(engine.velocities.tolist()):
+                engine.velocities[drone_id] = models[drone_id].next_velocity(cur_velocity)
+
+        # wall rebound
+        model.boundary_test(engine, models)
+
+        moved = engine.publish()
+
+        if update_direction and len(models) > 1:
+            models[1].trajectory.append(models[1].my_drone.coords)
+
+        return moved
 
     def show_trajectory(self):
+        import matplotlib.pyplot as plt
+        from mpl_toolkits.mplot3d import Axes3D
+
         yield self.my_drone.simulator.env.timeout(config.SIM_TIME-1)
         if self.my_drone.identifier == config.chosen_drone:  # 选择要显示的无人机
             # 通过simulator获取GUI的axes引用
@@ -253,22 +240,23 @@ class GaussMarkov3D:
 
 
     # rebound scheme (refer to ns-3)
-    def boundary_test(self, next_position, next_velocity, direction_mean, pitch_mean):
-        if next_position[0] < self.min_x + self.b1 or next_position[0] > self.max_x - self.b1:
-            next_velocity[0] = -next_velocity[0]
-            direction_mean = np.pi - direction_mean
-        if next_position[1] < self.min_y + self.b2 or next_position[1] > self.max_y - self.b2:
-            next_velocity[1] = -next_velocity[1]
-            direction_mean = -direction_mean
-        if next_position[2] < self.min_z + self.b3 or next_position[2] > self.max_z - self.b3:
-            next_velocity[2] = -next_velocity[2]
-            pitch_mean = -pitch_mean
-
-        next_position[0] = max(self.min_x + self.b1, min(next_position[0], self.max_x - self.b1))
-        next_position[1] = max(self.min_y + self.b2, min(next_position[1], self.max_y - self.b2))
-        next_position[2] = max(self.min_z + self.b3, min(next_position[2], self.max_z - self.b3))
-
-        next_direction = direction_mean
-        next_pitch = pitch_mean
-
-        return next_position, next_velocity, next_direction, next_pitch, direction_mean, pitch_mean
+    def boundary_test(self, engine, models):
+        low = [self.min_x + self.b1, self.min_y + self.b2, self.min_z + self.b3]
+        high = [self.max_x - self.b1, self.max_y - self.b2, self.max_z - self.b3]
+
+        outside = engine.rebound(low, high)
+
+        # the mean direction and pitch are reflected as well, and the drone keeps flying along them
+        for drone_id in np.flatnonzero(outside.any(axis=1)).tolist():
+            drone = models[drone_id].my_drone
+            rebound_x, rebound_y, rebound_z = outside[drone_id].tolist()
+
+            if rebound_x:
+                drone.direction_mean = np.pi - drone.direction_mean
+            if rebound_y:
+                drone.direction_mean = -drone.direction_mean
+            if rebound_z:
+                drone.pitch_mean = -drone.pitch_mean
+
+            drone.direction = drone.direction_mean
+            drone.pitch = drone.pitch_mean
@@ -0,0 +1,108 @@
+import numpy as np
+
+
+class MobilityEngine:
+    """
+    Mobility engine that moves all the drones of the simulation at once
+
+    Instead of running one SimPy process per drone, a single process advances the positions and velocities of all the
+    drones every "position_update_interval", with NumPy operations on the arrays of the state store of the drones
+    (one row per drone). The mobility model installed on each drone keeps its own random number generator and draws
+    from it in the same order as before, so that a given seed still produces the same trajectories. After each step,
+    the new position and velocity of every drone that moved are handed to it as lists ("Drone.moved" also refreshes
+    the spatial indexes), these lists are never modified afterwards, so the packets can keep them
+
+    Attributes:
+        simulator: the simulation that the drones belong to
+        drone_states: state store of the drones
+        positions: positions of all the drones, one row per drone (the array of the state store)
+        velocities: velocities of all the drones, one row per drone (the array of the state store)
+        models: mobility model installed on each drone, in the order of their identifiers
+        state: arrays of the mobility model that are shared by all the drones (e.g., the waypoints they are heading for)
+        flight_energy: energy consumed by each drone to fly during one step
+        moved: identifiers of the drones that moved at the last step, they consume their flight energy at the next one
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/14
+    Updated at: 2025/5/14
+    """
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.drone_states = simulator.drone_states
+        self.positions = self.drone_states.positions
+        self.velocities = self.drone_states.velocities
+        self.models = []
+        self.state = dict()
+        self.flight_energy = None
+        self.moved = []
+
+    def register(self, model):
+        """Called by the mobility model of each drone when it is installed"""
+
+        if not self.models:
+            # the drones start moving at the moment when the first one used to
+            self.simulator.env.process(self.mobility_update())
+
+        self.models.append(model)
+
+    def mobility_update(self):
+        env = self.simulator.env
+        models = self.models
+        position_update_interval = models[0].position_update_interval
+
+        while True:
+            self.moved = type(models[0]).move_all(self, models)
+
+            yield env.timeout(position_update_interval)
+
+            if self.flight_energy is None:
+                self.flight_energy = np.array([(position_update_interval / 1e6) *
+                                               model.my_drone.energy_model.power_consumption(model.my_drone.speed)
+                                               for model in models])
+
+            self.drone_states.residual_energy[self.moved] -= self.flight_energy[self.moved]
+
+    def rebound(self, low, high):
+        """
+        Wall rebound (refer to ns-3): the velocity component of a drone is reversed along each axis on which it has
+        crossed the boundary, and the drone is put back inside the boundaries
+        :param low: lower boundary of x-, y- and z-axis
+        :param high: upper boundary of x-, y- and z-axis
+        :return: whether each drone has crossed the boundary along each axis
+        """
+
+        outside = (self.positions < low) | (self.positions > high)
+        np.negative(self.velocities, out=self.velocities, where=outside)
+        np.clip(self.positions, low, high, out=self.positions)
+
+        return outside
+
+    def publish(self, drone_ids=None):
+        """
+        Hand their new position and velocity to the drones
+        :param drone_ids: identifiers of the drones that moved, all the drones if it is not given
+        :return: identifiers of these drones
+        """
+
+        if drone_ids is None:
+            drone_ids = range(len(self.models))
+            positions = self.positions.tolist()
+            velocities = self.velocities.tolist()
+        else:
+            positions = self.positions[drone_ids].tolist()
+            velocities = self.velocities[drone_ids].tolist()
+
+        self.drone_states.positions_changed()
+
+        # the connectivity graph only tells the routing protocols about new links once every drone is up to date
+        connectivity = self.simulator.connectivity
+        connectivity.begin_batch()
+        try:
+            models = self.models
+            for drone_id, coords, velocity in zip(drone_ids, positions, velocities):
+                models[drone_id].my_drone.moved(coords, velocity)
+        finally:
+            connectivity.end_batch()
+
+        return drone_ids
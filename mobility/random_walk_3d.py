@@ -2,8 +2,6 @@ import math
 import numpy as np
 import random
 from utils import config
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
 
 
 class RandomWalk3D:
@@ -12,7 +10,8 @@ class RandomWalk3D:
 
     In this model, firstly, the drone will randomly choose a direction of motion, and move along this direction for a
     fixed amount of time ("travel_duration"). In addition to this, it is also possible to specify the drone to move a
-    fixed distance in this direction. In this code, we assume that the speed of drone is constant.
+    fixed distance in this direction. In this code, we assume that the speed of drone is constant. All the drones are
+    moved at once by the mobility engine of the simulator, the model of each drone draws its own random direction.
 
     Attributes:
         my_drone: the drone which installs this mobility model
@@ -34,7 +33,7 @@ class RandomWalk3D:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/20
-    Updated at: 2025/1/7
+    Updated at: 2025/5/14
     """
     def __init__(self, drone):
         self.my_drone = drone
@@ -55,74 +54,65 @@ class RandomWalk3D:
         self.min_z = 0
         self.max_z = config.MAP_HEIGHT
 
-        self.my_drone.simulator.env.process(self.mobility_update(self.my_drone))
+        self.my_drone.simulator.mobility.register(self)
         self.trajectory = []
-        self.my_drone.simulator.env.process(self.show_trajectory())
+        if not self.my_drone.simulator.headless:
+            self.my_drone.simulator.env.process(self.show_trajectory())
 
         self.rng_mobility = random.Random(self.my_drone.identifier+self.my_drone.simulator.seed + 1)
 
-    def mobility_update(self, drone):
-        while True:
-            env = drone.simulator.env
-            drone_id = drone.identifier
-            cur_position = drone.coords
-            cur_velocity = drone.velocity
-            cur_direction = drone.direction
-            cur_pitch = drone.pitch
+    def next_velocity(self, cur_velocity):
+        """Draw a new direction and pitch for the drone, it keeps flying at the same speed"""
 
-            # update the position of next time step
-            if config.STATIC_CASE == 0:
-                next_position_x = cur_position[0] + cur_velocity[0] * self.position_update_interval / 1e6
-                next_position_y = cur_position[1] + cur_velocity[1] * self.position_update_interval / 1e6
-                next_position_z = cur_position[2] + cur_velocity[2] * self.position_update_interval / 1e6
-            else:
-                next_position_x = cur_position[0]
-                next_position_y = cur_position[1]
-                next_position_z = cur_position[2]
+        drone = self.my_drone
+        self.move_counter += 1
 
-            cur_speed = ((cur_velocity[0] ** 2) + (cur_velocity[1] ** 2) + (cur_velocity[2] ** 2)) ** 0.5
+        cur_speed = ((cur_velocity[0] ** 2) + (cur_velocity[1] ** 2) + (cur_velocity[2] ** 2)) ** 0.5
 
-            if env.now % self.travel_duration == 0:  # update velocity and direction
-                self.move_counter += 1
+        drone.direction = self.rng_mobility.uniform(0, 2 * math.pi)
+        drone.pitch = self.rng_mobility.uniform(-math.pi / 2, math.pi / 2)
 
-                next_direction = self.rng_mobility.uniform(0, 2 * math.pi)
+        next_velocity_x = cur_speed * math.cos(drone.direction) * math.cos(drone.pitch)
+        next_velocity_y = cur_speed * math.sin(drone.direction) * math.cos(drone.pitch)
+        next_velocity_z = cur_speed * math.sin(drone.pitch)
 
-                next_pitch = self.rng_mobility.uniform(-math.pi / 2, math.pi / 2)
+        return [next_velocity_x, next_velocity_y, next_velocity_z]
 
-                next_velocity_x = cur_speed * math.cos(next_direction) * math.cos(next_pitch)
-                next_velocity_y = cur_speed * math.sin(next_direction) * math.cos(next_pitch)
-                next_velocity_z = cur_speed * math.sin(next_pitch)
+    @staticmethod
+    def move_all(engine, models):
+        """
+        Move all the drones by one step
+        :param engine: the mobility engine, which holds the positions and velocities of all the drones
+        :param models: mobility model of each drone
+        :return: identifiers of the drones that moved
+        """
 
-                next_position = [next_position_x, next_position_y, next_position_z]
+        env = engine.simulator.env
+        model = models[0]
 
-                if drone_id == 6:
-                    self.trajectory.append(next_position)
+        # update the position of next time step
+        if config.STATIC_CASE == 0:
+            engine.positions += engine.velocities * model.position_update_interval / 1e6
 
-                next_velocity = [next_velocity_x, next_velocity_y, next_velocity_z]
-                next_speed = ((next_velocity_x ** 2) + (next_velocity_y ** 2) + (next_velocity_z ** 2)) ** 0.5
-            else:
-                next_position = [next_position_x, next_position_y, next_position_z]
+        update_direction = env.now % model.travel_duration == 0
+        if update_direction:  # update velocity and direction
+            for drone_id, cur_velocity in enumerate(engine.velocities.tolist()):
+                engine.velocities[drone_id] = models[drone_id].next_velocity(cur_velocity)
 
-                # velocity, direction and pitch should stay the same
-                next_direction = cur_direction
-                next_pitch = cur_pitch
-                next_velocity = cur_velocity
-                next_speed = ((cur_velocity[0] ** 2) + (cur_velocity[1] ** 2) + (cur_velocity[2] ** 2)) ** 0.5
+        # wall rebound
+        model.boundary_test(engine)
 
-            # wall rebound
-            next_position, next_velocity, next_direction, next_pitch = self.boundary_test(next_position, next_velocity,
-                                                                                          next_direction, next_pitch)
+        moved = engine.publish()
 
-            drone.coords = next_position
-            drone.direction = next_direction
-            drone.pitch = next_pitch
-            drone.velocity = next_velocity
+        if update_direction and len(models) > 6:
+            models[6].trajectory.append(models[6].my_drone.coords)
 
-            yield env.timeout(self.position_update_interval)
-            energy_consumption = (self.position_update_interval / 1e6) * drone.energy_model.power_consumption(drone.speed)
-            drone.residual_energy -= energy_consumption
+        return moved
 
     def show_trajectory(self):
+        import matplotlib.pyplot as plt
+        from mpl_toolkits.mplot3d import Axes3D
+
         x = []
         y = []
         z = []
@@ -151,16 +141,8 @@ class RandomWalk3D:
             plt.show()
 
     # rebound scheme
-    def boundary_test(self, next_position, next_velocity, next_direction, next_pitch):
-        if next_position[0] < self.min_x + self.b1 or next_position[0] > self.max_x - self.b1:
-            next_velocity[0] = -next_velocity[0]
-        if next_position[1] < self.min_y + self.b2 or next_position[1] > self.max_y - self.b2:
-            next_velocity[1] = -next_velocity[1]
-        if next_position[2] < self.min_z + self.b3 or next_position[2] > self.max_z - self.b3:
-            next_velocity[2] = -next_velocity[2]
-
-        next_position[0] = max(self.min_x + self.b1, min(next_position[0], self.max_x - self.b1))
-        next_position[1] = max(self.min_y + self.b2, min(next_position[1], self.max_y - self.b2))
-        next_position[2] = max(self.min_z + self.b3, min(next_position[2], self.max_z - self.b3))
-
-        return next_position, next_velocity, next_direction, next_pitch
+    def boundary_test(self, engine):
+        low = [self.min_x + self.b1, self.min_y + self.b2, self.min_z + self.b3]
+        high = [self.max_x - self.b1, self.max_y - self.b2, self.max_z - self.b3]
+
+        engine.rebound(low, high)
@@ -1,9 +1,6 @@
 import random
 import numpy as np
 from utils import config
-import matplotlib.pyplot as plt
-from utils.util_function import euclidean_distance_3d
-from mpl_toolkits.mplot3d import Axes3D
 
 
 class RandomWaypoint3D:
@@ -13,11 +10,12 @@ class RandomWaypoint3D:
     In this mobility model, the waypoint of drone will be generated in advance. Then drone will visit these waypoints
     in order. When the drone reached the waypoint, it will pause for a while, and then start heading down to the next
     waypoint. Normally, we will set up multiple waypoints as many as possible to prevent the drone visiting all the
-    waypoints before the simulation is finished.
+    waypoints before the simulation is finished. All the drones are moved at once by the mobility engine of the
+    simulator, the model of each drone generates and keeps track of its own waypoints.
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/4/19
-    Updated at: 2025/1/7
+    Updated at: 2025/5/14
     """
 
     def __init__(self, drone):
@@ -48,9 +46,10 @@ class RandomWaypoint3D:
         # used to determine if the waypoint has been visited
         self.waypoint_visited = [0 for _ in range(self.waypoint_num)]
 
-        self.my_drone.simulator.env.process(self.mobility_update(self.my_drone))
+        self.my_drone.simulator.mobility.register(self)
         self.trajectory = []
-        self.my_drone.simulator.env.process(self.show_trajectory())
+        if not self.my_drone.simulator.headless:
+            self.my_drone.simulator.env.process(self.show_trajectory())
 
     def waypoint_generator(self, start_coords):
         for i in range(self.waypoint_num):
@@ -97,41 +96,66 @@ class RandomWaypoint3D:
         else:
             return self.waypoint_coords[-1], -1
 
-    def mobility_update(self, drone):
-        while True:
-            env = drone.simulator.env
-            drone_id = drone.identifier
-            drone_speed = drone.speed
-            cur_position = drone.coords
-            target_waypoint, target_waypoint_idx = self.get_first_unvisited_waypoint()
-            drone.velocity = calculate_velocity(cur_position, target_waypoint, drone_speed)
-
-            # update the position of next time step
-            if config.STATIC_CASE == 0:
-                next_position_x = cur_position[0] + drone.velocity[0] * self.position_update_interval / 1e6
-                next_position_y = cur_position[1] + drone.velocity[1] * self.position_update_interval / 1e6
-                next_position_z = cur_position[2] + drone.velocity[2] * self.position_update_interval / 1e6
-            else:
-                next_position_x = cur_position[0]
-                next_position_y = cur_position[1]
-                next_position_z = cur_position[2]
+    @staticmethod
+    def move_all(engine, models):
+        """
+        Move all the drones by one step, a drone that reaches its waypoint pauses there for a while
+        :param engine: the mobility engine, which holds the positions and velocities of all the drones
+        :param models: mobility model of each drone
+        :return: identifiers of the drones that moved
+        """
+
+        env = engine.simulator.env
+        model = models[0]
+        positions = engine.positions
+        velocities = engine.velocities
+
+        if not engine.state:
+            engine.state['targets'] = np.array([m.get_first_unvisited_waypoint()[0] for m in models], dtype=float)
+            engine.state['speeds'] = np.array([m.my_drone.speed for m in models], dtype=float)
+            engine.state['resume_time'] = np.full(len(models), -np.inf)  # end of the pause at the last waypoint
+            engine.state['next_positions'] = np.zeros((len(models), 3))  # where the paused drones will be
+
+        targets = engine.state['targets']
+        resume_time = engine.state['resume_time']
+        next_positions = engine.state['next_positions']
+
+        # the drones that paused at a waypoint move again once their pause is over
+        resumed = resume_time == env.now
+        positions[resumed] = next_positions[resumed]
+
+        active = resume_time < env.now
+        velocities[active] = calculate_velocities(positions, targets, engine.state['speeds'])[active]
+
+        # update the position of next time step
+        if config.STATIC_CASE == 0:
+            next_positions[active] = (positions + velocities * model.position_update_interval / 1e6)[active]
+        else:
+            next_positions[active] = positions[active]
 
-            next_position = [next_position_x, next_position_y, next_position_z]
+        if len(models) > 1 and active[1]:
+            models[1].trajectory.append(next_positions[1].tolist())
 
-            if drone_id == 1:
-                self.trajectory.append(next_position)
+        # judge if the drone has reach the target waypoint
+        gap = next_positions - targets
+        reached = active & ((gap[:, 0] ** 2 + gap[:, 1] ** 2 + gap[:, 2] ** 2) ** 0.5 < 20)
 
-            # judge if the drone has reach the target waypoint
-            if euclidean_distance_3d(next_position, target_waypoint) < 20:
-                self.waypoint_visited[target_waypoint_idx] = 1
-                yield env.timeout(self.pause_time)
+        for drone_id in np.flatnonzero(reached).tolist():
+            target_waypoint_idx = models[drone_id].get_first_unvisited_waypoint()[1]
+            models[drone_id].waypoint_visited[target_waypoint_idx] = 1
+            targets[drone_id] = models[drone_id].get_first_unvisited_waypoint()[0]
+            resume_time[drone_id] = env.now + model.pause_time
+            models[drone_id].my_drone.velocity = velocities[drone_id].tolist()  # but it does not move during the pause
 
-            drone.coords = next_position
-            yield env.timeout(self.position_update_interval)
-            energy_consumption = (self.position_update_interval / 1e6) * drone.energy_model.power_consumption(drone.speed)
-            drone.residual_energy -= energy_consumption
+        moving = active & ~reached
+        positions[moving] = next_positions[moving]
+
+        return engine.publish(np.flatnonzero(moving | resumed).tolist())
 
     def show_trajectory(self):
+        import matplotlib.pyplot as plt
+        from mpl_toolkits.mplot3d import Axes3D
+
         print(self.waypoint_coords)
         x = []
         y = []
@@ -165,11 +189,15 @@ class RandomWaypoint3D:
             plt.show()
 
 
-def calculate_velocity(current_pos, target_pos, moving_speed):
-    distance = euclidean_distance_3d(current_pos, target_pos)
-    normalized_vector = [(target_pos[0] - current_pos[0]) / distance,
-                         (target_pos[1] - current_pos[1]) / distance,
-                         (target_pos[2] - current_pos[2]) / distance]
-    moving_speed = [moving_speed] * 3
-    velocity = [d * v for d, v in zip(normalized_vector, moving_speed)]
-    return velocity
+def calculate_velocities(current_positions, target_positions, moving_speeds):
+    """
+    Velocities of the drones flying straight to their target at their own speed
+    :param current_positions: current position of each drone
+    :param target_positions: position of the target of each drone
+    :param moving_speeds: speed of each drone
+    :return: velocity of each drone
+    """
+
+    direction = target_positions - current_positions
+    distance = (direction[:, 0] ** 2 + direction[:, 1] ** 2 + direction[:, 2] ** 2) ** 0.5
+    return direction / distance[:, None] * moving_speeds[:, None]
@@ -0,0 +1,136 @@
+import math
+from utils import config
+from utils.spatial_index import UniformGrid
+from utils.util_function import euclidean_distance_3d
+
+
+class CarrierSense:
+    """
+    Carrier sensing based on the set of drones that are currently occupying the channel
+
+    Instead of scanning the states of all drones in "channel_states", the MAC layer reports when a drone starts and
+    stops occupying the channel. The busy drones are kept in a uniform grid whose cell size is the sensing range, so
+    checking whether the channel is idle only costs O(busy neighbours). The grid is refreshed every time a drone moves
+
+    The drones that are counting down their backoff timer (contenders) are also indexed. A contender used to sense the
+    channel every 1 us, now it is notified instead: when a drone within its sensing range occupies the channel (or
+    moves into its sensing range while occupying the channel), a check is scheduled at the next 1 us tick of the
+    contender, i.e., the moment at which the periodic sensing would have found the channel busy
+
+    Attributes:
+        simulator: the simulation platform that contains everything
+        busy_transmitters: a set, contains the ids of the drones that are occupying the channel
+        busy_grid: spatial index of the busy transmitters
+        contenders: a dictionary, the key is the id of the contender, the value is a list of the start time of its
+                    sensing, the event used to notify it and whether a check has been scheduled
+        contender_grid: spatial index of the contenders
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/12
+    Updated at: 2025/5/13
+    """
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.busy_transmitters = set()
+        self.busy_grid = UniformGrid(config.SENSING_RANGE)
+        self.contenders = dict()
+        self.contender_grid = UniformGrid(config.SENSING_RANGE)
+
+    def channel_occupied(self, drone):
+        """Called when "drone" requests its channel resource"""
+        self.busy_transmitters.add(drone.identifier)
+        self.busy_grid.insert(drone.identifier, drone.coords)
+        self.notify_contenders(drone)
+
+    def channel_released(self, drone):
+        """Called when "drone" releases its channel resource"""
+        self.busy_transmitters.discard(drone.identifier)
+        self.busy_grid.remove(drone.identifier)
+
+    def update_position(self, drone):
+        """Called every time the position of "drone" is updated"""
+        if drone.identifier in self.busy_grid:
+            self.busy_grid.move(drone.identifier, drone.coords)
+            self.notify_contenders(drone)
+
+        if drone.identifier in self.contender_grid:
+            self.contender_grid.move(drone.identifier, drone.coords)
+            if not self.check_channel_availability(drone):
+                self.schedule_check(drone.identifier)
+
+    def check_channel_availability(self, sender_drone):
+        """
+        Check if the channel is busy or idle, it gives the same answer as "util_function.check_channel_availability"
+        :param sender_drone: the drone that is about to send packet
+        :return: if the channel is busy, return "False", else, return "True"
+        """
+
+        if len(self.busy_transmitters) <= self.busy_grid.cells_per_query:
+            candidates = self.busy_transmitters  # cheaper than looking up the cells around the sender
+        else:
+            candidates = self.busy_grid.nearby(sender_drone.coords)
+
+        for node_id in candidates:
+            if node_id != sender_drone.identifier:
+                d = euclidean_distance_3d(sender_drone.coords, self.simulator.drones[node_id].coords)
+                if d < config.SENSING_RANGE:
+                    return False
+
+        return True
+
+    def add_contender(self, drone, start_time, notification):
+        """
+        Register a drone that is listening to the channel during its backoff
+        :param drone: the contender
+        :param start_time: the moment that the contender started to listen, its sensing ticks are aligned with it
+        :param notification: an event of simpy, it will be triggered at the tick when the channel is found busy
+        :return: none
+        """
+
+        self.contenders[drone.identifier] = [start_time, notification, False]
+        self.contender_grid.insert(drone.identifier, drone.coords)
+
+    def remove_contender(self, drone):
+        """Deregister a contender, its pending notification (if any) is triggered so that it can stop listening"""
+        contender = self.contenders.pop(drone.identifier, None)
+        self.contender_grid.remove(drone.identifier)
+
+        if contender is not None and not contender[1].triggered:
+            contender[1].succeed()
+
+    def notify_contenders(self, busy_drone):
+        """Schedule a check for all contenders within the sensing range of "busy_drone" """
+        for node_id in self.contender_grid.nearby(busy_drone.coords):
+            if node_id != busy_drone.identifier:
+                d = euclidean_distance_3d(busy_drone.coords, self.simulator.drones[node_id].coords)
+                if d < config.SENSING_RANGE:
+                    self.schedule_check(node_id)
+
+    def schedule_check(self, node_id):
+        """
+        The contender would have sensed the channel at every tick "start_time + k" (k = 1, 2, ...), so the busy channel
+        is found at the first tick that is not earlier than now. The tick at "start_time" itself has already passed
+        when the contender was registered
+        """
+
+        contender = self.contenders[node_id]
+        start_time, notification, scheduled = contender
+
+        if scheduled:
+            return  # the check that has been scheduled comes no later than this one
+
+        env = self.simulator.env
+        next_tick = start_time + max(1, math.ceil(env.now - start_time))
+
+        contender[2] = True
+        check = env.timeout(next_tick - env.now)
+        check.callbacks.append(lambda event: self.deferred_check(node_id, notification))
+
+    def deferred_check(self, node_id, notification):
+        contender = self.contenders.get(node_id)
+
+        if contender is not None and contender[1] is notification:  # the contender is still in the same round
+            self.contenders.pop(node_id)
+            self.contender_grid.remove(node_id)
+            notification.succeed()
@@ -1,6 +1,8 @@
 import logging
-import copy
-from collections import defaultdict
+from collections import defaultdict, deque
+from functools import partial
+from utils import config
+from utils.util_function import has_intersection
 
 
 class Channel:
@@ -8,23 +10,38 @@ class Channel:
     Wireless channel of the physical layer
 
     Format of pipes:
-    {UAV 0: [ [message 1], [message 2], ...],
-     UAV 1: [ [message 1], [message 3], ...],
+    {UAV 0: [ message 1, message 2, ...],
+     UAV 1: [ message 1, message 3, ...],
      ...
-     UAV N: [ [message m], [message n], ...]}
+     UAV N: [ message m, message n, ...]}
+
+    Format of message: (packet, insertion time, transmitter id, end time, channel id). A message is put into the
+    "transmission_log" once, and the inboxes only hold references to it, so a broadcast allocates the same number of
+    objects no matter how many receivers there are. The message must not be modified by the receivers
+
+    Instead of letting every drone poll its inbox, the channel schedules one completion event for each transmission.
+    At the exact moment the last bit arrives, the message is appended to the inboxes of its receivers and they are
+    woken up. Hence the messages in an inbox are sorted by their end time, and each receiver only needs to remember
+    how many of them it has processed
 
     Attributes:
         env: simulation environment created by simpy
         pipes: control the inboxes of all drones, format is shown above
+        receivers: the wake-up callback of each drone, invoked when a transmission bound for it is complete
+        transmission_log: all the recent transmissions on the channel, sorted by their insertion time
+        max_transmission_time: the longest transmission seen so far, it bounds the interval query
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/11
-    Updated at: 2024/4/25
+    Updated at: 2025/5/14
     """
 
     def __init__(self, env):
         self.env = env
         self.pipes = defaultdict(list)
+        self.receivers = dict()
+        self.transmission_log = deque()
+        self.max_transmission_time = 0
 
     def broadcast_put(self, value):
         """
@@ -36,10 +53,10 @@ class Channel:
         if not self.pipes:
             logging.error('No inboxes available!')
 
-        # the sender "puts" packets to all inboxes in pipes separately
-        for key in self.pipes.keys():
-            value_copy = copy.copy(value)  # must be a copy of "value"
-            self.pipes[key].append(value_copy)
+        self.log_transmission(value)
+
+        # all inboxes in pipes will share the same message
+        self.notify_on_completion(value, self.pipes.keys())
 
     def unicast_put(self, value, dst_id):
         """
@@ -52,7 +69,8 @@ class Channel:
         if dst_id not in self.pipes.keys():
             logging.error('There is no inbox for dst_id')
 
-        self.pipes[dst_id].append(value)
+        self.log_transmission(value)
+        self.notify_on_completion(value, [dst_id])
 
     def multicast_put(self, value, dst_id_list):
         """
@@ -62,15 +80,94 @@ class Channel:
         :return: none
         """
 
+        self.log_transmission(value)
+
         for dst_id in dst_id_list:
             if dst_id not in self.pipes.keys():
                 logging.error('There is no inbox for dst_id')
-            else:
-                value_copy = copy.copy(value)  # must be a copy of "value"
-                self.pipes[dst_id].append(value_copy)
+
+        self.notify_on_completion(value, [dst_id for dst_id in dst_id_list if dst_id in self.pipes.keys()])
+
+    def log_transmission(self, value):
+        """
+        Append the message to the transmission log, and drop the messages that can no longer overlap with the
+        packets being received
+        :param value: message that has just been put into the channel
+        :return: none
+        """
+
+        insertion_time, end_time = value[1], value[3]
+        self.max_transmission_time = max(self.max_transmission_time, end_time - insertion_time)
+
+        # the messages are appended in the order of insertion time, since it is always the current time
+        self.transmission_log.append(value)
+
+        horizon = self.env.now - 2 * self.max_transmission_time
+        while self.transmission_log[0][3] < horizon:
+            self.transmission_log.popleft()
+
+    def overlapping_transmissions(self, time_span):
+        """
+        Interval query on the transmission log
+        :param time_span: a list of intervals
+        :return: a list of [transmitter, channel id] of all messages that overlap with at least one interval
+        """
+
+        earliest = min(interval[0] for interval in time_span)
+        latest = max(interval[1] for interval in time_span)
+
+        overlapping = []
+        for message in reversed(self.transmission_log):
+            insertion_time = message[1]
+            if insertion_time > latest:
+                continue  # started after all the intervals
+            if insertion_time + self.max_transmission_time < earliest:
+                break  # this message and all the earlier ones have ended before the intervals
+
+            interval = [insertion_time, message[3]]
+            for interval2 in time_span:
+                if has_intersection(interval, interval2):
+                    overlapping.append([message[2], message[4]])
+
+        return overlapping
+
+    def notify_on_completion(self, value, dst_id_list):
+        """
+        Schedule a single event at the end of the transmission, the message is delivered to the receivers by its
+        callback
+        :param value: message that has just been put into the channel
+        :param dst_id_list: ids of the drones whose inboxes should receive this message
+        :return: none
+        """
+
+        packet = value[0]
+        transmitting_time = packet.packet_length / config.BIT_RATE * 1e6  # the message is put at its insertion time
+
+        completion = self.env.timeout(transmitting_time)
+        completion.callbacks.append(partial(self.deliver, value, dst_id_list))
+
+    def deliver(self, value, dst_id_list, completion):
+        """
+        Append the completely transmitted message to the inboxes of its receivers, and wake them up
+        :param value: message that has been completely transmitted
+        :param dst_id_list: ids of the drones whose inboxes should receive this message
+        :param completion: the completion event
+        :return: none
+        """
+
+        for dst_id in dst_id_list:
+            self.pipes[dst_id].append(value)
+
+        for dst_id in dst_id_list:
+            if dst_id in self.receivers.keys():
+                self.receivers[dst_id](completion)
 
     def create_inbox_for_receiver(self, identifier):
         # each receiver needs a list as its inbox
         pipe = []
         self.pipes[identifier] = pipe
         return pipe
+
+    def register_receiver(self, identifier, callback):
+        # "callback" is invoked with the completion event when a message is delivered to the inbox
+        self.receivers[identifier] = callback
@@ -1,20 +1,163 @@
 import math
-import logging
-from utils import config
+import numpy as np
+from utils import config, trace
 from utils.util_function import euclidean_distance_3d, euclidean_distance_2d
 
 
-# config logging
-logging.basicConfig(filename='running_log.log',
-                    filemode='w',  # there are two modes: 'a' and 'w'
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    level=logging.DEBUG
-                    )
+TRACE = trace.category('phy.large_scale_fading')
 
 
 def sinr_calculator(my_drone, main_drones_list, all_transmitting_drones_list):
     """
-    calculate signal to signal-to-interference-plus-noise ratio
+    calculate signal to signal-to-interference-plus-noise ratio. The batched kernel has a fixed cost of a few tens of
+    microseconds (the NumPy calls), while the scalar loop costs a fraction of a microsecond per pair of main link and
+    transmitting drone, so that the pairs are computed one by one until there are "config.SINR_BATCH_SIZE" of them,
+    which is the common case (one main link and a few transmitting drones)
+
+    Parameters:
+        my_drone: receiver drone
+        main_drones_list: list of drones that wants to transmit packet to receiver
+        all_transmitting_drones_list: list of all drones currently transmitting packet
+
+    Returns:
+        List of sinr of each main drone
+    """
+
+    if len(main_drones_list) * len(all_transmitting_drones_list) < config.SINR_BATCH_SIZE:
+        return scalar_sinr_calculator(my_drone, main_drones_list, all_transmitting_drones_list)
+
+    return batched_sinr_calculator(my_drone, main_drones_list, all_transmitting_drones_list)
+
+
+def batched_sinr_calculator(my_drone, main_drones_list, all_transmitting_drones_list):
+    """
+    calculate signal to signal-to-interference-plus-noise ratio, the coordinates of all the drones involved are taken
+    from the state store of the drones at once, and the SINR of all main drones is computed in one batched call
+
+    Parameters:
+        my_drone: receiver drone
+        main_drones_list: list of drones that wants to transmit packet to receiver
+        all_transmitting_drones_list: list of all drones currently transmitting packet
+
+    Returns:
+        List of sinr of each main drone
+    """
+
+    n_main = len(main_drones_list)
+
+    # gather everything in one go: the main drones first, followed by all transmitting drones
+    pairs = np.array(main_drones_list + all_transmitting_drones_list, dtype=int).reshape(-1, 2)
+    coords = my_drone.drone_states.positions[np.concatenate(([my_drone.identifier], pairs[:, 0]))]
+
+    sinr = sinr_kernel(coords[0], coords[1:n_main + 1], pairs[:n_main, 0], pairs[:n_main, 1],
+                       coords[n_main + 1:], pairs[n_main:, 0], pairs[n_main:, 1],
+                       my_drone.channel_assigner.adjacent_channel_interference_matrix)
+
+    sinr_list = sinr.tolist()
+    if TRACE.full:
+        TRACE.debug('Main node list: %s, SINR of main links: %s', main_drones_list, sinr_list)
+
+    return sinr_list
+
+
+def sinr_kernel(receiver_coords, main_coords, main_ids, main_channels,
+                transmitter_coords, transmitter_ids, transmitter_channels, channel_overlap):
+    """
+    Batched SINR of several main links towards one receiver
+
+    Parameters:
+        receiver_coords: array with shape (3,), position of the receiver
+        main_coords: array with shape (M, 3), positions of the main transmitters
+        main_ids: array with shape (M,), drone ids of the main transmitters
+        main_channels: array with shape (M,), sub-channels used by the main transmitters
+        transmitter_coords: array with shape (K, 3), positions of all drones currently transmitting
+        transmitter_ids: array with shape (K,), drone ids of all drones currently transmitting
+        transmitter_channels: array with shape (K,), sub-channels used by all drones currently transmitting
+        channel_overlap: function that returns a boolean array indicating whether two sub-channels are overlapping
+
+    Returns:
+        array with shape (M,), sinr (dB) of each main link
+    """
+
+    transmit_power = config.TRANSMITTING_POWER
+    noise_power = config.NOISE_POWER
+
+    n_main = len(main_coords)
+    path_loss = path_loss_array(distance_array(np.concatenate((main_coords, transmitter_coords)), receiver_coords))
+    main_link_path_loss = path_loss[:n_main]
+    interference_link_path_loss = path_loss[n_main:]
+
+    # a transmitter interferes with the main link if it is another drone and their sub-channels are overlapping
+    interfering = (channel_overlap(main_channels[:, np.newaxis], transmitter_channels[np.newaxis, :]) &
+                   (main_ids[:, np.newaxis] != transmitter_ids[np.newaxis, :]))
+
+    receive_power = transmit_power * main_link_path_loss
+    interference_power = (interfering * (transmit_power * interference_link_path_loss)).sum(axis=1)
+
+    return 10 * np.log10(receive_power / (noise_power + interference_power))
+
+
+def sinr_matrix(receiver_coords, transmitter_coords, transmitter_ids, transmitter_channels, channel_overlap):
+    """
+    Matrix mode of SINR calculation: all receivers of a time slot are handled at once. Every drone that is transmitting
+    in this time slot is regarded as a main transmitter, and all the others on overlapping sub-channels interfere
+
+    Parameters:
+        receiver_coords: array with shape (R, 3), positions of the receivers
+        transmitter_coords: array with shape (K, 3), positions of all drones currently transmitting
+        transmitter_ids: array with shape (K,), drone ids of all drones currently transmitting
+        transmitter_channels: array with shape (K,), sub-channels used by all drones currently transmitting
+        channel_overlap: function that returns a boolean array indicating whether two sub-channels are overlapping
+
+    Returns:
+        array with shape (R, K), element (r, k) is the sinr (dB) of the link from transmitter k to receiver r
+    """
+
+    transmit_power = config.TRANSMITTING_POWER
+    noise_power = config.NOISE_POWER
+
+    path_loss = path_loss_array(distance_array(receiver_coords[:, np.newaxis, :],
+                                               transmitter_coords[np.newaxis, :, :]))
+
+    interfering = (channel_overlap(transmitter_channels[:, np.newaxis], transmitter_channels[np.newaxis, :]) &
+                   (transmitter_ids[:, np.newaxis] != transmitter_ids[np.newaxis, :]))
+
+    receive_power = transmit_power * path_loss
+    interference_power = receive_power @ interfering.T  # element (r, k): sum of the power of interferers of link k
+
+    return 10 * np.log10(receive_power / (noise_power + interference_power))
+
+
+def distance_array(coords1, coords2):
+    """
+    Element-wise 3-D Euclidean distance, "coords1" and "coords2" are broadcast against each other
+    """
+
+    diff = np.subtract(coords1, coords2, dtype=float)
+    return (diff[..., 0] ** 2 + diff[..., 1] ** 2 + diff[..., 2] ** 2) ** 0.5
+
+
+def path_loss_array(distance):
+    """
+    Vectorized version of "general_path_loss", the path loss is 1 when the distance is 0
+    """
+
+    c = config.LIGHT_SPEED
+    fc = config.CARRIER_FREQUENCY
+    alpha = 2  # path loss exponent
+
+    distance = np.asarray(distance, dtype=float)
+
+    path_loss = np.ones_like(distance)
+    np.divide(c, 4 * math.pi * fc * distance, out=path_loss, where=distance != 0)
+
+    return path_loss ** alpha
+
+
+def scalar_sinr_calculator(my_drone, main_drones_list, all_transmitting_drones_list):
+    """
+    calculate signal to signal-to-interference-plus-noise ratio pair by pair, used by "sinr_calculator" for the small
+    cases, and as the reference of "batched_sinr_calculator"
 
     Parameters:
         my_drone: receiver drone
@@ -32,16 +175,17 @@ def sinr_calculator(my_drone, main_drones_list, all_transmitting_drones_list):
     sinr_list = []  # record the sinr of all transmitter
     receiver = my_drone
 
-    logging.info('Main node list: %s', main_drones_list)
+    if TRACE.full:
+        TRACE.debug('Main node list: %s', main_drones_list)
+
+    interference_list = [x[0] for x in all_transmitting_drones_list]
+    channel_list = [x[1] for x in all_transmitting_drones_list]
 
     for pair in main_drones_list:  # each pair includes the main drone id and the channel id
         main_drone_id = pair[0]  # drone id of main transmitter
         channel_id = pair[1]  # channel id of main transmitter
         transmitter = simulator.drones[main_drone_id]
 
-        interference_list = [x[0] for x in all_transmitting_drones_list]
-        channel_list = [x[1] for x in all_transmitting_drones_list]
-
         main_link_path_loss = general_path_loss(receiver, transmitter)
         receive_power = transmit_power * main_link_path_loss
         interference_power = 0
@@ -51,12 +195,13 @@ def sinr_calculator(my_drone, main_drones_list, all_transmitting_drones_list):
                 if my_drone.channel_assigner.adjacent_channel_interference_check(channel_id, channel_list[i]):
                     interference = simulator.drones[interference_list[i]]
 
-                    logging.info('Main node is: %s, interference node is: %s, distance between them is: %s, '
-                        'main link distance is: %s, interference link distance is: %s',
-                        main_drone_id, interference_list[i],
-                        euclidean_distance_3d(transmitter.coords, interference.coords),
-                        euclidean_distance_3d(transmitter.coords, receiver.coords),
-                        euclidean_distance_3d(interference.coords, receiver.coords))
+                    if TRACE.full:
+                        TRACE.debug('Main node is: %s, interference node is: %s, distance between them is: %s, '
+                                    'main link distance is: %s, interference link distance is: %s',
+                                    main_drone_id, interference_list[i],
+                                    euclidean_distance_3d(transmitter.coords, interference.coords),
+                                    euclidean_distance_3d(transmitter.coords, receiver.coords),
+                                    euclidean_distance_3d(interference.coords, receiver.coords))
 
                     interference_link_path_loss = general_path_loss(receiver, interference)
                     interference_power += transmit_power * interference_link_path_loss
@@ -65,7 +210,8 @@ def sinr_calculator(my_drone, main_drones_list, all_transmitting_drones_list):
                     pass
 
         sinr = 10 * math.log10(receive_power / (noise_power + interference_power))
-        logging.info('The SINR of main link is: %s', sinr)
+        if TRACE.full:
+            TRACE.debug('The SINR of main link is: %s', sinr)
         sinr_list.append(sinr)
 
     return sinr_list
@@ -1,13 +1,5 @@
-import logging
 from utils import config
 
-# config logging
-logging.basicConfig(filename='running_log.log',
-                    filemode='w',  # there are two modes: 'a' and 'w'
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    level=config.LOGGING_LEVEL
-                    )
-
 
 class Phy:
     """
@@ -20,7 +12,7 @@ class Phy:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/11
-    Updated at: 2025/3/30
+    Updated at: 2025/5/14
     """
 
     def __init__(self, mac):
@@ -42,7 +34,7 @@ class Phy:
         self.my_drone.residual_energy -= energy_consumption
 
         # transmit through the channel
-        message = [packet, self.env.now, self.my_drone.identifier, 0, packet.channel_id]
+        message = self.create_message(packet)
 
         self.my_drone.simulator.channel.unicast_put(message, next_hop_id)
 
@@ -59,7 +51,7 @@ class Phy:
         self.my_drone.residual_energy -= energy_consumption
 
         # transmit through the channel
-        message = [packet, self.env.now, self.my_drone.identifier, 0, packet.channel_id]
+        message = self.create_message(packet)
 
         self.my_drone.simulator.channel.broadcast_put(message)
 
@@ -80,6 +72,20 @@ class Phy:
         self.my_drone.residual_energy -= energy_consumption
 
         # transmit through the channel
-        message = [packet, self.env.now, self.my_drone.identifier, packet.channel_id]
+        message = self.create_message(packet)
 
         self.my_drone.simulator.channel.multicast_put(message, dst_id_list)
+
+    def create_message(self, packet):
+        """
+        Build the message that is put into the channel, it is shared by all the receivers and should not be modified
+
+        Parameters:
+            packet: the packet that needs to be transmitted
+
+        Returns:
+            (packet, insertion time, transmitter id, end time, channel id)
+        """
+
+        transmitting_time = packet.packet_length / config.BIT_RATE * 1e6
+        return packet, self.env.now, self.my_drone.identifier, self.env.now + transmitting_time, packet.channel_id
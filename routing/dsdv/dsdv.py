@@ -1,18 +1,12 @@
 import copy
 import random
-import logging
 from entities.packet import DataPacket, AckPacket
 from topology.virtual_force.vf_packet import VfPacket
 from routing.dsdv.dsdv_packet import DsdvHelloPacket
 from routing.dsdv.dsdv_routing_table import DsdvRoutingTable
-from utils import config
+from utils import config, trace
 
-# config logging
-logging.basicConfig(filename='running_log.log',
-                    filemode='w',  # there are two modes: 'a' and 'w'
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    level=config.LOGGING_LEVEL
-                    )
+TRACE = trace.category('routing.dsdv')
 
 
 class Dsdv:
@@ -40,7 +34,7 @@ class Dsdv:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/4/14
-    Updated at: 2025/3/30
+    Updated at: 2025/5/14
     """
 
     def __init__(self, simulator, my_drone):
@@ -49,12 +43,10 @@ class Dsdv:
         self.rng_routing = random.Random(self.my_drone.identifier + self.my_drone.simulator.seed + 10)
         self.hello_interval = 0.5 * 1e6  # broadcast routing table periodically
         self.purge_interval = 0.5 * 1e6  # check broken links periodically
-        self.check_interval = 0.6 * 1e6  # check waiting list of drone periodically
         self.routing_table = DsdvRoutingTable(self.simulator.env, my_drone)
         self.processed_hello_packet = []
         self.simulator.env.process(self.broadcast_hello_packet_periodically())
         self.simulator.env.process(self.detect_broken_link_periodically(my_drone))
-        self.simulator.env.process(self.check_waiting_list())
 
     def detect_broken_link_periodically(self, my_drone):
         """
@@ -70,48 +62,50 @@ class Dsdv:
             flag = self.routing_table.purge()
 
             if flag == 1:
-                config.GL_ID_HELLO_PACKET += 1
+                hello_packet_id = self.simulator.id_allocator.next_id('hello')
 
                 # channel assignment
                 channel_id = self.my_drone.channel_assigner.channel_assign()
 
                 hello_pkd = DsdvHelloPacket(src_drone=my_drone,
                                             creation_time=self.simulator.env.now,
-                                            id_hello_packet=config.GL_ID_HELLO_PACKET,
+                                            id_hello_packet=hello_packet_id,
                                             hello_packet_length=config.HELLO_PACKET_LENGTH,
                                             packet_type='immediate',
-                                            routing_table=self.routing_table.routing_table,
+                                            routing_table=self.routing_table,
                                             simulator=self.simulator,
                                             channel_id=channel_id)
                 hello_pkd.transmission_mode = 1  # broadcast
 
-                logging.info('At time: %s, UAV: %s broadcast a hello packet to announce broken links',
-                             self.simulator.env.now, self.my_drone.identifier)
+                if TRACE.on:
+                    TRACE.info('At time: %s, UAV: %s broadcast a hello packet to announce broken links',
+                               self.simulator.env.now, self.my_drone.identifier)
 
-                self.simulator.metrics.control_packet_num += 1
+                self.simulator.metrics.record_control_packet(self.my_drone.identifier)
                 self.my_drone.transmitting_queue.put(hello_pkd)
 
     def broadcast_hello_packet(self, my_drone):
-        config.GL_ID_HELLO_PACKET += 1
+        hello_packet_id = self.simulator.id_allocator.next_id('hello')
 
         # channel assignment
         channel_id = self.my_drone.channel_assigner.channel_assign()
 
-        self.routing_table.routing_table[self.my_drone.identifier][2] += 2  # important!
+        self.routing_table.increase_sequence_number()  # important!
         hello_pkd = DsdvHelloPacket(src_drone=my_drone,
                                     creation_time=self.simulator.env.now,
-                                    id_hello_packet=config.GL_ID_HELLO_PACKET,
+                                    id_hello_packet=hello_packet_id,
                                     hello_packet_length=config.HELLO_PACKET_LENGTH,
                                     packet_type='periodic',
-                                    routing_table=self.routing_table.routing_table,
+                                    routing_table=self.routing_table,
                                     simulator=self.simulator,
                                     channel_id=channel_id)
         hello_pkd.transmission_mode = 1  # broadcast
 
-        logging.info('At time: %s, UAV: %s has hello packet to broadcast',
-                     self.simulator.env.now, self.my_drone.identifier)
+        if TRACE.full:
+            TRACE.debug('At time: %s, UAV: %s has hello packet to broadcast',
+                        self.simulator.env.now, self.my_drone.identifier)
 
-        self.simulator.metrics.control_packet_num += 1
+        self.simulator.metrics.record_control_packet(self.my_drone.identifier)
         self.my_drone.transmitting_queue.put(hello_pkd)
 
     def broadcast_hello_packet_periodically(self):
@@ -161,10 +155,10 @@ class Dsdv:
             packet_type = packet.type
 
             if packet_type == 'periodic':
-                self.routing_table.update_item(packet, current_time)
+                self.route_updated(self.routing_table.update_item(packet, current_time))
                 # self.routing_table.print_neighbor(self.my_drone)
             elif packet_type == 'immediate':
-                self.routing_table.update_item(packet, current_time)
+                self.route_updated(self.routing_table.update_item(packet, current_time))
                 packet_id = packet.packet_id
                 if packet_id not in self.processed_hello_packet:
                     self.processed_hello_packet.append(packet_id)
@@ -177,30 +171,30 @@ class Dsdv:
                                                 id_hello_packet=packet_id,
                                                 hello_packet_length=config.HELLO_PACKET_LENGTH,
                                                 packet_type='immediate',
-                                                routing_table=self.routing_table.routing_table,
+                                                routing_table=self.routing_table,
                                                 simulator=self.simulator,
                                                 channel_id=channel_id)
                     hello_pkd.transmission_mode = 1  # broadcast
 
-                    self.simulator.metrics.control_packet_num += 1
+                    self.simulator.metrics.record_control_packet(self.my_drone.identifier)
                     self.my_drone.transmitting_queue.put(hello_pkd)
 
         elif isinstance(packet, DataPacket):
             packet_copy = copy.copy(packet)
             if packet_copy.dst_drone.identifier == self.my_drone.identifier:
                 latency = self.simulator.env.now - packet_copy.creation_time  # in us
-                self.simulator.metrics.deliver_time_dict[packet_copy.packet_id] = latency
-                self.simulator.metrics.throughput_dict[packet_copy.packet_id] = packet_copy.packet_length / (latency / 1e6)
-                self.simulator.metrics.hop_cnt_dict[packet_copy.packet_id] = packet_copy.get_current_ttl()
-                self.simulator.metrics.datapacket_arrived.add(packet_copy.packet_id)
-                logging.info('Packet: %s is received by destination UAV: %s',
-                             packet_copy.packet_id, self.my_drone.identifier)
-
-                config.GL_ID_ACK_PACKET += 1
+                self.simulator.metrics.record_delivery(packet_copy.packet_id, packet_copy.src_drone.identifier,
+                                                       latency, packet_copy.packet_length,
+                                                       packet_copy.get_current_ttl())
+                if TRACE.on:
+                    TRACE.info('Packet: %s is received by destination UAV: %s',
+                               packet_copy.packet_id, self.my_drone.identifier)
+
+                ack_packet_id = self.simulator.id_allocator.next_id('ack')
                 src_drone = self.simulator.drones[src_drone_id]  # previous drone
                 ack_packet = AckPacket(src_drone=self.my_drone,
                                        dst_drone=src_drone,
-                                       ack_packet_id=config.GL_ID_ACK_PACKET,
+                                       ack_packet_id=ack_packet_id,
                                        ack_packet_length=config.ACK_PACKET_LENGTH,
                                        ack_packet=packet_copy,
                                        simulator=self.simulator,
@@ -217,14 +211,12 @@ class Dsdv:
                 else:
                     pass
             else:
-                if self.my_drone.transmitting_queue.qsize() < self.my_drone.max_queue_size:
-                    self.my_drone.transmitting_queue.put(packet_copy)
-
-                    config.GL_ID_ACK_PACKET += 1
+                if self.my_drone.transmitting_queue.offer(packet_copy):
+                    ack_packet_id = self.simulator.id_allocator.next_id('ack')
                     src_drone = self.simulator.drones[src_drone_id]  # previous drone
                     ack_packet = AckPacket(src_drone=self.my_drone,
                                            dst_drone=src_drone,
-                                           ack_packet_id=config.GL_ID_ACK_PACKET,
+                                           ack_packet_id=ack_packet_id,
                                            ack_packet_length=config.ACK_PACKET_LENGTH,
                                            ack_packet=packet_copy,
                                            simulator=self.simulator,
@@ -246,33 +238,35 @@ class Dsdv:
         elif isinstance(packet, AckPacket):
             data_packet_acked = packet.ack_packet
 
-            self.simulator.metrics.mac_delay.append((self.simulator.env.now - data_packet_acked.first_attempt_time) / 1e3)
+            self.simulator.metrics.mac_delay.add((self.simulator.env.now - data_packet_acked.first_attempt_time) / 1e3)
 
             self.my_drone.remove_from_queue(data_packet_acked)
 
-            key2 = ''.join(['wait_ack', str(self.my_drone.identifier), '_', str(data_packet_acked.packet_id)])
+            ack_wait = self.my_drone.mac_protocol.ack_waits.get(data_packet_acked.packet_id)
 
-            if self.my_drone.mac_protocol.wait_ack_process_finish[key2] == 0:
-                if not self.my_drone.mac_protocol.wait_ack_process_dict[key2].triggered:
-                    logging.info('At time: %s, the wait_ack process (id: %s) of UAV: %s is interrupted by UAV: %s',
-                                 self.simulator.env.now, key2, self.my_drone.identifier, src_drone_id)
+            if ack_wait is not None:  # the process of waiting for this ACK hasn't finished
+                if not ack_wait.process.triggered:
+                    if TRACE.full:
+                        TRACE.debug('At time: %s, the wait_ack process (id: %s) of UAV: %s is interrupted by UAV: %s',
+                                    self.simulator.env.now, ack_wait.packet_id, self.my_drone.identifier, src_drone_id)
 
-                    self.my_drone.mac_protocol.wait_ack_process_finish[key2] = 1  # mark it as "finished"
-                    self.my_drone.mac_protocol.wait_ack_process_dict[key2].interrupt()
+                    self.my_drone.mac_protocol.ack_waits.finish(ack_wait.packet_id)  # mark it as "finished"
+                    ack_wait.process.interrupt()
 
         elif isinstance(packet, VfPacket):
-            logging.info('At time %s, UAV: %s receives the vf hello msg from UAV: %s, pkd id is: %s',
-                         self.simulator.env.now, self.my_drone.identifier, src_drone_id, packet.packet_id)
+            if TRACE.full:
+                TRACE.debug('At time %s, UAV: %s receives the vf hello msg from UAV: %s, pkd id is: %s',
+                            self.simulator.env.now, self.my_drone.identifier, src_drone_id, packet.packet_id)
 
             # update the neighbor table
             self.my_drone.motion_controller.neighbor_table.add_neighbor(packet, current_time)
 
             if packet.msg_type == 'hello':
-                config.GL_ID_VF_PACKET += 1
+                vf_packet_id = self.simulator.id_allocator.next_id('vf')
 
                 ack_packet = VfPacket(src_drone=self.my_drone,
                                       creation_time=self.simulator.env.now,
-                                      id_hello_packet=config.GL_ID_VF_PACKET,
+                                      id_hello_packet=vf_packet_id,
                                       hello_packet_length=config.HELLO_PACKET_LENGTH,
                                       simulator=self.simulator,
                                       channel_id=packet.channel_id)
@@ -282,23 +276,12 @@ class Dsdv:
             else:
                 pass
 
-    def check_waiting_list(self):
-        while True:
-            if not self.my_drone.sleep:
-                yield self.simulator.env.timeout(self.check_interval)
-                for waiting_pkd in self.my_drone.waiting_list:
-                    if self.simulator.env.now > waiting_pkd.creation_time + waiting_pkd.deadline:
-                        self.my_drone.waiting_list.remove(waiting_pkd)
-                    else:
-                        has_route, packet, enquire = self.next_hop_selection(waiting_pkd)
+    def route_updated(self, dst_ids):
+        """Only the packets waiting for the destinations whose route has just been updated are sent again"""
 
-                        if has_route:
-                            self.my_drone.transmitting_queue.put(waiting_pkd)
-                            self.my_drone.waiting_list.remove(waiting_pkd)
-                        else:
-                            pass
-            else:
-                break
+        for dst_id in dst_ids:
+            if self.my_drone.waiting_list.is_waiting_for(dst_id):
+                self.my_drone.waiting_list.wake(dst_id, self)
 
     def penalize(self, packet):
         pass
\ No newline at end of file
@@ -2,6 +2,8 @@ from entities.packet import Packet
 
 
 class DsdvHelloPacket(Packet):
+    __slots__ = ('type', 'src_drone', 'routing_table', '_snapshot')
+
     def __init__(self,
                  src_drone,
                  creation_time,
@@ -15,4 +17,12 @@ class DsdvHelloPacket(Packet):
 
         self.type = packet_type
         self.src_drone = src_drone
-        self.routing_table = routing_table
+        self.routing_table = routing_table  # "DsdvRoutingTable" of "src_drone"
+        self._snapshot = None
+
+    @property
+    def snapshot(self):
+        # the table advertised is the one at the end of the transmission, all the receivers share the same snapshot
+        if self._snapshot is None:
+            self._snapshot = self.routing_table.snapshot()
+        return self._snapshot
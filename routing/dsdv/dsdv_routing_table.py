@@ -1,14 +1,35 @@
-import logging
-from utils import config
+from utils import config, trace
 from collections import defaultdict
+from utils.expiring_table import ExpiringTable
 
 
-# config logging
-logging.basicConfig(filename='running_log.log',
-                    filemode='w',  # there are two modes: 'a' and 'w'
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    level=config.LOGGING_LEVEL
-                    )
+TRACE = trace.category('routing.dsdv')
+
+
+class DsdvTableSnapshot:
+    """
+    Immutable view of a DSDV routing table at the moment a hello packet is received
+
+    The routing table keeps the advertised part of its entries (metric and sequence number) in a separate dictionary,
+    together with the version of the table at which each entry was changed for the last time. An entry that is changed
+    is moved to the end of this dictionary, so that the entries are always in the order of their versions. A snapshot
+    only refers to this dictionary, which is copied by the table the next time it is modified (copy-on-write), so
+    taking a snapshot costs O(1) and the snapshot can be shared by all the receivers of the broadcast
+
+    Attributes:
+        entries: dst_id -> (metric, seq_num, version), in ascending order of version, never modified
+        version: version of the table when the snapshot was taken
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/14
+    Updated at: 2025/5/14
+    """
+
+    __slots__ = ('entries', 'version')
+
+    def __init__(self, entries, version):
+        self.entries = entries
+        self.version = version
 
 
 class DsdvRoutingTable:
@@ -21,10 +42,27 @@ class DsdvRoutingTable:
      dst2: [next hop, metric (hop count), seq_num of dst2, updated time2],
      ...}
 
+    The hello packets carry a "DsdvTableSnapshot" instead of the routing table itself, and a receiver only processes
+    the entries that have changed since the last snapshot of the same neighbor it has applied. Since a neighbor keeps
+    advertising the routes it has not changed, a valid route learned from a neighbor is considered as updated whenever
+    a hello packet of this neighbor is received
+
+    Hence, a valid route expires when its next hop has not been heard for "entry_life_time", and an invalid route
+    expires when it has not been updated for "entry_life_time". Both are kept in expiry heaps, and the routes are
+    indexed by their next hop, so that purging only visits the expired neighbors and routes, and the routes through them
+
     Attributes:
         env: simulation environment
         routing_table: dictionary in python, core member
         entry_life_time: lifetime of each item in the neighbor table
+        advertised: dst_id -> (metric, seq_num, version), in ascending order of version, see "DsdvTableSnapshot"
+        version: incremented each time the metric or sequence number of an entry changes
+        shared: whether "advertised" is referred to by a snapshot, and must be copied before being modified
+        applied: neighbor id -> version of the latest snapshot of this neighbor that has been applied
+        last_heard: neighbor id -> time of the latest hello packet received from this neighbor
+        heard_expiry: expiry heap of the neighbors, according to "last_heard"
+        invalid_expiry: expiry heap of the invalid routes, according to their updated time
+        routes_via: next hop id -> destinations of the routes through this next hop (in the order they were added)
 
     References:
         [1] Perkins, C. E., and Bhagwat, P.,"Highly dynamic destination-sequenced distance-vector routing (DSDV) for
@@ -34,45 +72,112 @@ class DsdvRoutingTable:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/4/14
-    Updated at: 2024/4/17
+    Updated at: 2025/5/14
     """
 
     def __init__(self, env, my_drone):
         self.env = env
         self.my_drone = my_drone
         self.routing_table = defaultdict(list)
+        self.entry_life_time = 2 * 1e6  # unit: us (2s)
+
+        self.heard_expiry = ExpiringTable(self.entry_life_time)
+        self.invalid_expiry = ExpiringTable(self.entry_life_time)
+        self.routes_via = defaultdict(dict)
 
         # initialize the routing table, sequence number if even number
-        self.routing_table[self.my_drone.identifier] = [self.my_drone.identifier, 0, self.my_drone.identifier*2, self.env.now]
-        self.entry_life_time = 2 * 1e6  # unit: us (2s)
+        my_id = self.my_drone.identifier
+        self.set_entry(my_id, [my_id, 0, my_id*2, self.env.now])
+
+        self.advertised = dict()
+        self.version = 0
+        self.shared = False
+        self.advertise(self.my_drone.identifier)
+
+        self.applied = dict()
+        self.last_heard = dict()
 
     # determine if the routing table is empty
     def is_empty(self):
         return not bool(self.routing_table)
 
+    # add or replace the entry of "dst_id", the index of the routes and the expiry of invalid routes are kept in step
+    def set_entry(self, dst_id, entry):
+        old_entry = self.routing_table.get(dst_id)
+        if old_entry is not None and old_entry[0] != entry[0]:
+            del self.routes_via[old_entry[0]][dst_id]
+        self.routes_via[entry[0]][dst_id] = None
+
+        self.routing_table[dst_id] = entry
+
+        if entry[1] == float('inf') and dst_id != self.my_drone.identifier:  # my own entry never expires
+            self.invalid_expiry.update(dst_id, entry[3])
+        else:
+            self.invalid_expiry.remove(dst_id)
+
+    # record the new metric and sequence number of an entry
+    def advertise(self, dst_id):
+        if self.shared:
+            self.advertised = dict(self.advertised)  # copy-on-write
+            self.shared = False
+
+        self.version += 1
+        entry = self.routing_table[dst_id]
+
+        self.advertised.pop(dst_id, None)  # move it to the end
+        self.advertised[dst_id] = (entry[1], entry[2], self.version)
+
+    # take an immutable snapshot of the table to be carried by a hello packet
+    def snapshot(self):
+        self.shared = True
+        return DsdvTableSnapshot(self.advertised, self.version)
+
+    # increase my own sequence number before advertising a new table
+    def increase_sequence_number(self):
+        self.routing_table[self.my_drone.identifier][2] += 2
+        self.advertise(self.my_drone.identifier)
+
     # get the updated time of certain item
     def get_updated_time(self, drone_id):
         if drone_id not in self.routing_table.keys():
             raise RuntimeError('This item is not in the routing table')
         else:
-            return self.routing_table[drone_id][-1]
-
-    # update item according to the receiving packet
+            next_hop_id, metric, _, updated_time = self.routing_table[drone_id]
+            if next_hop_id != self.my_drone.identifier and metric != float('inf'):
+                # a valid route is refreshed by every hello packet of the neighbor that advertises it
+                return max(updated_time, self.last_heard.get(next_hop_id, updated_time))
+            else:
+                return updated_time
+
+    # update item according to the receiving packet, return the destinations whose entry has been updated
     def update_item(self, packet, cur_time):
+        updated = []
         src_drone = packet.src_drone
         if src_drone is not self.my_drone:  # the hello packet is not broadcast by myself
-            for dst_id in packet.routing_table.keys():
-                metric = packet.routing_table[dst_id][1]
-                seq_num = packet.routing_table[dst_id][2]
-                if dst_id not in self.routing_table.keys():
-                    self.routing_table[dst_id] = [src_drone.identifier, metric+1, seq_num, cur_time]
-                elif seq_num > self.routing_table[dst_id][2]:
-                    self.routing_table[dst_id] = [src_drone.identifier, metric+1, seq_num, cur_time]
-                elif seq_num == self.routing_table[dst_id][2]:
-                    if metric < self.routing_table[dst_id][1]:
-                        self.routing_table[dst_id] = [src_drone.identifier, metric+1, seq_num, cur_time]
-                else:
-                    pass
+            src_id = src_drone.identifier
+            snapshot = packet.snapshot
+
+            # only the entries changed after the latest snapshot of this neighbor are needed, they are at the end
+            last_version = self.applied.get(src_id, 0)
+            if snapshot.version > last_version:
+                self.applied[src_id] = snapshot.version
+            self.last_heard[src_id] = cur_time
+            self.heard_expiry.update(src_id, cur_time)
+
+            routing_table = self.routing_table
+            for dst_id, (metric, seq_num, version) in reversed(snapshot.entries.items()):
+                if version <= last_version:
+                    break
+
+                entry = routing_table.get(dst_id)
+                if entry is None or seq_num > entry[2] or (seq_num == entry[2] and metric < entry[1]):
+                    self.set_entry(dst_id, [src_id, metric+1, seq_num, cur_time])
+                    updated.append(dst_id)
+
+                    if entry is None or entry[1] != metric+1 or entry[2] != seq_num:
+                        self.advertise(dst_id)
+
+        return updated
 
     # remove the expired item
     def purge(self):
@@ -81,20 +186,32 @@ class DsdvRoutingTable:
             # it means that the neighbor table is empty
             return flag
 
-        for key in list(self.routing_table):
-            if key is not self.my_drone.identifier:
-                updated_time = self.get_updated_time(key)
-                if updated_time + self.entry_life_time < self.env.now:
-                    expired_next_hop = self.routing_table[key][0]  # expired next hop
-
-                    # all entries through this next hop should be set to invalid
-                    for key2 in list(self.routing_table):
-                        if self.routing_table[key2][0] == expired_next_hop:
-                            self.routing_table[key2][1] = float('inf')
-                            self.routing_table[key2][2] += 1
-                            self.routing_table[key2][3] = self.env.now
-
-                    flag = 1  # broken links have occurred
+        now = self.env.now
+        inf = float('inf')
+        my_id = self.my_drone.identifier  # my own entry never expires, but it can be invalidated
+
+        # the next hops of the expired routes, only the expired neighbors and invalid routes are visited
+        expired_next_hops = dict()
+        for neighbor_id in self.heard_expiry.pop_expired(now):
+            routes = self.routes_via[neighbor_id]
+            # a valid route through this neighbor has expired
+            if any(dst_id != my_id and self.routing_table[dst_id][1] != inf for dst_id in routes):
+                expired_next_hops[neighbor_id] = None
+        for dst_id in self.invalid_expiry.pop_expired(now):
+            expired_next_hops[self.routing_table[dst_id][0]] = None
+
+        for expired_next_hop in expired_next_hops:
+            # all entries through this next hop should be set to invalid
+            for key2 in self.routes_via[expired_next_hop]:
+                entry = self.routing_table[key2]
+                entry[1] = inf
+                entry[2] += 1
+                entry[3] = now
+                if key2 != my_id:
+                    self.invalid_expiry.update(key2, now)
+                self.advertise(key2)
+
+            flag = 1  # broken links have occurred
 
         return flag
 
@@ -112,9 +229,12 @@ class DsdvRoutingTable:
 
     # print routing table
     def print_neighbor(self, my_drone):
-        logging.info('|----------Routing Table of: %s ----------|', my_drone.identifier)
+        if not TRACE.full:
+            return
+
+        TRACE.debug('|----------Routing Table of: %s ----------|', my_drone.identifier)
         for key in self.routing_table.keys():
-            logging.info('Dst_id: %s, next hop is: %s, metric is: %s, seq_num (dst_id) is: %s, updated time is: %s',
-                         key, self.routing_table[key][0], self.routing_table[key][1], self.routing_table[key][2],
-                         self.routing_table[key][3])
-        logging.info('|-----------------------------------------------------------------|')
+            TRACE.debug('Dst_id: %s, next hop is: %s, metric is: %s, seq_num (dst_id) is: %s, updated time is: %s',
+                        key, self.routing_table[key][0], self.routing_table[key][1], self.routing_table[key][2],
+                        self.routing_table[key][3])
+        TRACE.debug('|-----------------------------------------------------------------|')
@@ -3,14 +3,9 @@ import logging
 from routing.grad.grad_packet import GradMessage
 from topology.virtual_force.vf_packet import VfPacket
 from routing.grad.grad_cost_table import GradCostTable
-from utils import config
+from utils import config, trace
 
-# config logging
-logging.basicConfig(filename='running_log.log',
-                    filemode='w',  # there are two modes: 'a' and 'w'
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    level=config.LOGGING_LEVEL
-                    )
+TRACE = trace.category('routing.grad')
 
 
 class Grad:
@@ -48,7 +43,7 @@ class Grad:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/4/20
-    Updated at: 2025/3/27
+    Updated at: 2025/5/14
     """
 
     def __init__(self, simulator, my_drone):
@@ -68,7 +63,7 @@ class Grad:
         if has_route:
             remaining_value = self.cost_table.get_est_cost(dst_drone.identifier)
 
-            config.GL_ID_GRAD_MESSAGE += 1
+            message_id = self.simulator.id_allocator.next_id('grad')
 
             # channel assignment
             channel_id = self.my_drone.channel_assigner.channel_assign()
@@ -76,7 +71,7 @@ class Grad:
             grad_message = GradMessage(src_drone=self.my_drone,
                                        dst_drone=dst_drone,
                                        creation_time=self.simulator.env.now,
-                                       id_message=config.GL_ID_GRAD_MESSAGE,
+                                       id_message=message_id,
                                        message_length=100,
                                        message_type="M_DATA",
                                        accrued_cost=0,
@@ -92,7 +87,7 @@ class Grad:
             # there is no entry related to "dst_drone" in the cost table
             self.my_drone.waiting_list.append(packet)  # put the data packet into waiting list
 
-            config.GL_ID_GRAD_MESSAGE += 1
+            message_id = self.simulator.id_allocator.next_id('grad')
 
             # channel assignment
             channel_id = self.my_drone.channel_assigner.channel_assign()
@@ -100,7 +95,7 @@ class Grad:
             grad_message = GradMessage(src_drone=self.my_drone,
                                        dst_drone=dst_drone,
                                        creation_time=self.simulator.env.now,
-                                       id_message=config.GL_ID_GRAD_MESSAGE,
+                                       id_message=message_id,
                                        message_length=100,
                                        message_type="M_REQUEST",
                                        accrued_cost=0,
@@ -109,7 +104,7 @@ class Grad:
                                        channel_id=channel_id)
 
             grad_message.transmission_mode = 1  # broadcast
-            self.simulator.metrics.control_packet_num += 1
+            self.simulator.metrics.record_control_packet(self.my_drone.identifier)
 
             return has_route, grad_message, enquire
 
@@ -131,11 +126,12 @@ class Grad:
 
             if msg_type == "M_REQUEST":
                 if self.my_drone.identifier is target.identifier:
-                    logging.info('At time: %s, UAV: %s receives a REQUEST message from UAV: %s, and REPLY should be'
-                                 'launched.', self.simulator.env.now, self.my_drone.identifier, src_drone_id)
+                    if TRACE.full:
+                        TRACE.debug('At time: %s, UAV: %s receives a REQUEST message from UAV: %s, and REPLY should be'
+                                    'launched.', self.simulator.env.now, self.my_drone.identifier, src_drone_id)
 
                     # response the request
-                    config.GL_ID_GRAD_MESSAGE += 1
+                    message_id = self.simulator.id_allocator.next_id('grad')
 
                     # channel assignment
                     channel_id = self.my_drone.channel_assigner.channel_assign()
@@ -145,7 +141,7 @@ class Grad:
                     grad_message = GradMessage(src_drone=self.my_drone,
                                                dst_drone=originator,
                                                creation_time=self.simulator.env.now,
-                                               id_message=config.GL_ID_GRAD_MESSAGE,
+                                               id_message=message_id,
                                                message_length=100,
                                                message_type="M_REPLY",
                                                accrued_cost=0,
@@ -154,19 +150,20 @@ class Grad:
                                                channel_id=channel_id)
 
                     grad_message.transmission_mode = 1  # broadcast
-                    self.simulator.metrics.control_packet_num += 1
+                    self.simulator.metrics.record_control_packet(self.my_drone.identifier)
 
                     self.my_drone.transmitting_queue.put(grad_message)
 
                 else:
-                    logging.info('At time: %s, UAV: %s receives a REQUEST message from UAV: %s',
-                                 self.simulator.env.now, self.my_drone.identifier, src_drone_id)
+                    if TRACE.full:
+                        TRACE.debug('At time: %s, UAV: %s receives a REQUEST message from UAV: %s',
+                                    self.simulator.env.now, self.my_drone.identifier, src_drone_id)
 
                     if packet_copy.remaining_value > 0:
                         if packet_copy.packet_id not in self.flag.keys():  # it is the first time to receive this message
                             self.flag[packet_copy.packet_id] = 1  # mark as "already broadcast"
 
-                            self.simulator.metrics.control_packet_num += 1
+                            self.simulator.metrics.record_control_packet(self.my_drone.identifier)
                             self.my_drone.transmitting_queue.put(packet_copy)
 
             elif msg_type == "M_DATA":
@@ -174,20 +171,21 @@ class Grad:
                 if data_packet.dst_drone.identifier == self.my_drone.identifier:  # reach the destination
                     if data_packet.packet_id not in self.simulator.metrics.datapacket_arrived:
                         latency = self.simulator.env.now - data_packet.creation_time  # in us
-                        self.simulator.metrics.deliver_time_dict[data_packet.packet_id] = latency
-                        self.simulator.metrics.throughput_dict[data_packet.packet_id] = packet_copy.packet_length / (latency / 1e6)
-                        self.simulator.metrics.hop_cnt_dict[data_packet.packet_id] = packet_copy.get_current_ttl()
-                        self.simulator.metrics.datapacket_arrived.add(data_packet.packet_id)
-                        logging.info('Packet: %s is received by destination UAV: %s',
-                                     data_packet.packet_id, self.my_drone.identifier)
+                        self.simulator.metrics.record_delivery(data_packet.packet_id, data_packet.src_drone.identifier,
+                                                               latency, packet_copy.packet_length,
+                                                               packet_copy.get_current_ttl())
+                        if TRACE.on:
+                            TRACE.info('Packet: %s is received by destination UAV: %s',
+                                       data_packet.packet_id, self.my_drone.identifier)
                 else:
                     if packet_copy.remaining_value > 0:
                         # not all the drones hearing this message have entries related to the destination
                         if self.cost_table.has_entry(data_packet.dst_drone.identifier):
                             est_cost = self.cost_table.get_est_cost(data_packet.dst_drone.identifier)
                             if est_cost <= packet_copy.remaining_value:
-                                logging.info('At time: %s, UAV: %s further forward the data packet',
-                                             self.simulator.env.now, self.my_drone.identifier)
+                                if TRACE.full:
+                                    TRACE.debug('At time: %s, UAV: %s further forward the data packet',
+                                                self.simulator.env.now, self.my_drone.identifier)
 
                                 self.my_drone.transmitting_queue.put(packet_copy)
                         else:
@@ -197,21 +195,20 @@ class Grad:
 
             elif msg_type == "M_REPLY":
                 if self.my_drone.identifier is packet_copy.target.identifier:
-                    logging.info('At time: %s, UAV: %s receives the REPLY message originates from UAV: %s',
-                                 self.simulator.env.now, self.my_drone.identifier, packet_copy.originator.identifier)
+                    if TRACE.full:
+                        TRACE.debug('At time: %s, UAV: %s receives the REPLY message originates from UAV: %s',
+                                    self.simulator.env.now, self.my_drone.identifier, packet_copy.originator.identifier)
 
                     # this indicates that there is a path to dst_drone
-                    for item in self.my_drone.waiting_list:
-                        dst_drone = item.dst_drone  # get the destination of data packet
-                        if dst_drone.identifier is packet_copy.originator.identifier:
-                            self.my_drone.transmitting_queue.put(item)
+                    for item in self.my_drone.waiting_list.take(packet_copy.originator.identifier):
+                        self.my_drone.transmitting_queue.put(item)
 
                 else:
                     if packet_copy.remaining_value > 0:
                         if self.cost_table.has_entry(target.identifier):
                             est_cost = self.cost_table.get_est_cost(target.identifier)
                             if est_cost <= packet_copy.remaining_value:
-                                self.simulator.metrics.control_packet_num += 1
+                                self.simulator.metrics.record_control_packet(self.my_drone.identifier)
 
                                 self.my_drone.transmitting_queue.put(packet_copy)
                         else:
@@ -220,18 +217,19 @@ class Grad:
                         pass
 
         elif isinstance(packet, VfPacket):
-            logging.info('At time %s, UAV: %s receives the vf hello msg from UAV: %s, pkd id is: %s',
-                         self.simulator.env.now, self.my_drone.identifier, src_drone_id, packet.packet_id)
+            if TRACE.full:
+                TRACE.debug('At time %s, UAV: %s receives the vf hello msg from UAV: %s, pkd id is: %s',
+                            self.simulator.env.now, self.my_drone.identifier, src_drone_id, packet.packet_id)
 
             # update the neighbor table
             self.my_drone.motion_controller.neighbor_table.add_neighbor(packet, current_time)
 
             if packet.msg_type == 'hello':
-                config.GL_ID_VF_PACKET += 1
+                vf_packet_id = self.simulator.id_allocator.next_id('vf')
 
                 ack_packet = VfPacket(src_drone=self.my_drone,
                                       creation_time=self.simulator.env.now,
-                                      id_hello_packet=config.GL_ID_VF_PACKET,
+                                      id_hello_packet=vf_packet_id,
                                       hello_packet_length=config.HELLO_PACKET_LENGTH,
                                       simulator=self.simulator,
                                       channel_id=packet.channel_id)
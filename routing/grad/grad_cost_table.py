@@ -1,4 +1,5 @@
 from collections import defaultdict
+from utils.expiring_table import ExpiringTable
 
 
 class GradCostTable:
@@ -15,7 +16,8 @@ class GradCostTable:
         received message
     3) "est_cost": the most recent and best estimated cost (number of hops in this version) for delivering a message
         to "target_id"
-    4) "updated time": this field is used to determine if the entry is expired
+    4) "updated time": this field is used to determine if the entry is expired, the expiry times of the entries are
+        also kept in an expiry heap, so that purging only visits the expired entries
 
     The cost table can answer two question:
     1) "Is this message a copy of a previously received message?" This is determined by comparing the sequence number
@@ -28,7 +30,7 @@ class GradCostTable:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/4/20
-    Updated at: 2024/4/20
+    Updated at: 2025/5/14
     """
 
     def __init__(self, env, my_drone):
@@ -36,6 +38,7 @@ class GradCostTable:
         self.my_drone = my_drone
         self.cost_table = defaultdict(list)
         self.entry_life_time = 5 * 1e6  # unit: us (2s)
+        self.expiry = ExpiringTable(self.entry_life_time)
 
     # determine if the cost table is empty
     def is_empty(self):
@@ -58,6 +61,7 @@ class GradCostTable:
     # delete the specified item
     def remove_entry(self, drone_id):
         del self.cost_table[drone_id]
+        self.expiry.remove(drone_id)
 
     # remove the expired item
     def purge(self):
@@ -65,10 +69,8 @@ class GradCostTable:
             # it means that the neighbor table is empty
             return
 
-        for key in list(self.cost_table):
-            updated_time = self.get_updated_time(key)
-            if updated_time + self.entry_life_time < self.env.now:  # expired
-                self.remove_entry(key)
+        for key in self.expiry.pop_expired(self.env.now):  # only the expired entries are visited
+            del self.cost_table[key]
 
     # update entry, core function
     def update_entry(self, grad_message, cur_time):
@@ -84,6 +86,10 @@ class GradCostTable:
             elif accrued_cost < self.cost_table[originator_id][1]:
                 self.cost_table[originator_id][1] = accrued_cost
                 self.cost_table[originator_id][2] = cur_time
+            else:
+                return
+
+            self.expiry.update(originator_id, cur_time)
         else:
             pass
 
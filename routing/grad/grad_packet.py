@@ -2,6 +2,8 @@ from entities.packet import Packet
 
 
 class GradMessage(Packet):
+    __slots__ = ('originator', 'seq_num', 'target', 'accrued_cost', 'remaining_value', 'attached_data_packet')
+
     def __init__(self,
                  src_drone,
                  dst_drone,
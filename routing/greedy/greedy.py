@@ -1,18 +1,13 @@
 import copy
 import random
-import logging
 from entities.packet import DataPacket, AckPacket
 from topology.virtual_force.vf_packet import VfPacket
 from routing.greedy.greedy_neighbor_table import GreedyNeighborTable
 from routing.greedy.greedy_packet import GreedyHelloPacket
-from utils import config
+from utils import config, trace
+from utils.util_function import euclidean_distance_3d
 
-# config logging
-logging.basicConfig(filename='running_log.log',
-                    filemode='w',  # there are two modes: 'a' and 'w'
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    level=config.LOGGING_LEVEL
-                    )
+TRACE = trace.category('routing.greedy')
 
 
 class Greedy:
@@ -37,7 +32,7 @@ class Greedy:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/11
-    Updated at: 2025/3/30
+    Updated at: 2025/5/14
     """
 
     def __init__(self, simulator, my_drone):
@@ -45,29 +40,28 @@ class Greedy:
         self.my_drone = my_drone
         self.rng_routing = random.Random(self.my_drone.identifier + self.my_drone.simulator.seed + 10)
         self.hello_interval = 0.5 * 1e6  # broadcast hello packet every 0.5s
-        self.check_interval = 0.6 * 1e6
         self.neighbor_table = GreedyNeighborTable(self.simulator.env, my_drone)
         self.simulator.env.process(self.broadcast_hello_packet_periodically())
-        self.simulator.env.process(self.check_waiting_list())
 
     def broadcast_hello_packet(self, my_drone):
-        config.GL_ID_HELLO_PACKET += 1
+        hello_packet_id = self.simulator.id_allocator.next_id('hello')
 
         # channel assignment
         channel_id = self.my_drone.channel_assigner.channel_assign()
 
         hello_pkd = GreedyHelloPacket(src_drone=my_drone,
                                       creation_time=self.simulator.env.now,
-                                      id_hello_packet=config.GL_ID_HELLO_PACKET,
+                                      id_hello_packet=hello_packet_id,
                                       hello_packet_length=config.HELLO_PACKET_LENGTH,
                                       simulator=self.simulator,
                                       channel_id=channel_id)
         hello_pkd.transmission_mode = 1
 
-        logging.info('At time: %s, UAV: %s has hello packet to broadcast',
-                     self.simulator.env.now, self.my_drone.identifier)
+        if TRACE.full:
+            TRACE.debug('At time: %s, UAV: %s has hello packet to broadcast',
+                        self.simulator.env.now, self.my_drone.identifier)
 
-        self.simulator.metrics.control_packet_num += 1
+        self.simulator.metrics.record_control_packet(self.my_drone.identifier)
         self.my_drone.transmitting_queue.put(hello_pkd)
 
     def broadcast_hello_packet_periodically(self):
@@ -122,30 +116,36 @@ class Greedy:
             self.neighbor_table.add_neighbor(packet, current_time)  # update the neighbor table
             self.neighbor_table.print_neighbor(self.my_drone)
 
+            # the waiting packets can be sent if this neighbor is closer to their destination than me
+            for dst_id in self.my_drone.waiting_list.destinations():
+                dst_coords = self.simulator.drones[dst_id].coords
+                if euclidean_distance_3d(packet.cur_position, dst_coords) < \
+                        euclidean_distance_3d(self.my_drone.coords, dst_coords):
+                    self.my_drone.waiting_list.wake(dst_id, self)
+
         elif isinstance(packet, DataPacket):
             packet_copy = copy.copy(packet)
 
-            logging.info('~~~Packet: %s is received by UAV: %s at: %s',
-                         packet_copy.packet_id, self.my_drone.identifier, self.simulator.env.now)
+            if TRACE.full:
+                TRACE.debug('~~~Packet: %s is received by UAV: %s at: %s',
+                            packet_copy.packet_id, self.my_drone.identifier, self.simulator.env.now)
 
             if packet_copy.dst_drone.identifier == self.my_drone.identifier:
                 if packet_copy.packet_id not in self.simulator.metrics.datapacket_arrived:
                     latency = self.simulator.env.now - packet_copy.creation_time  # in us
-                    self.simulator.metrics.deliver_time_dict[packet_copy.packet_id] = latency
-                    self.simulator.metrics.throughput_dict[packet_copy.packet_id] = packet_copy.packet_length / (
-                                latency / 1e6)
-                    self.simulator.metrics.hop_cnt_dict[packet_copy.packet_id] = packet_copy.get_current_ttl()
-                    self.simulator.metrics.datapacket_arrived.add(packet_copy.packet_id)
+                    self.simulator.metrics.record_delivery(packet_copy.packet_id, packet_copy.src_drone.identifier,
+                                                           latency, packet_copy.packet_length,
+                                                           packet_copy.get_current_ttl())
 
                 # reply ACK
-                config.GL_ID_ACK_PACKET += 1
+                ack_packet_id = self.simulator.id_allocator.next_id('ack')
                 src_drone = self.simulator.drones[src_drone_id]  # previous drone
 
                 # NOTE: The pair of transceivers for a particular link are tuned to the same channel for transmission
                 # in either direction (i.e., there is no directionality in channel assignment).
                 ack_packet = AckPacket(src_drone=self.my_drone,
                                        dst_drone=src_drone,
-                                       ack_packet_id=config.GL_ID_ACK_PACKET,
+                                       ack_packet_id=ack_packet_id,
                                        ack_packet_length=config.ACK_PACKET_LENGTH,
                                        ack_packet=packet_copy,
                                        simulator=self.simulator,
@@ -162,14 +162,12 @@ class Greedy:
                 else:
                     pass
             else:
-                if self.my_drone.transmitting_queue.qsize() < self.my_drone.max_queue_size:  # have enough capacity
-                    self.my_drone.transmitting_queue.put(packet_copy)  # add this packet into my own queue
-
-                    config.GL_ID_ACK_PACKET += 1
+                if self.my_drone.transmitting_queue.offer(packet_copy):  # have enough capacity
+                    ack_packet_id = self.simulator.id_allocator.next_id('ack')
                     src_drone = self.simulator.drones[src_drone_id]  # previous drone
                     ack_packet = AckPacket(src_drone=self.my_drone,
                                            dst_drone=src_drone,
-                                           ack_packet_id=config.GL_ID_ACK_PACKET,
+                                           ack_packet_id=ack_packet_id,
                                            ack_packet_length=config.ACK_PACKET_LENGTH,
                                            ack_packet=packet_copy,
                                            simulator=self.simulator,
@@ -191,37 +189,39 @@ class Greedy:
         elif isinstance(packet, AckPacket):
             data_packet_acked = packet.ack_packet
 
-            self.simulator.metrics.mac_delay.append(
+            self.simulator.metrics.mac_delay.add(
                 (self.simulator.env.now - data_packet_acked.first_attempt_time) / 1e3)
 
             self.my_drone.remove_from_queue(data_packet_acked)
 
-            key2 = ''.join(['wait_ack', str(self.my_drone.identifier), '_', str(data_packet_acked.packet_id)])
+            ack_wait = self.my_drone.mac_protocol.ack_waits.get(data_packet_acked.packet_id)
 
-            if self.my_drone.mac_protocol.wait_ack_process_finish[key2] == 0:
-                if not self.my_drone.mac_protocol.wait_ack_process_dict[key2].triggered:
-                    logging.info('At time: %s, the wait_ack process (id: %s) of UAV: %s is interrupted by UAV: %s',
-                                 self.simulator.env.now, key2, self.my_drone.identifier, src_drone_id)
+            if ack_wait is not None:  # the process of waiting for this ACK hasn't finished
+                if not ack_wait.process.triggered:
+                    if TRACE.full:
+                        TRACE.debug('At time: %s, the wait_ack process (id: %s) of UAV: %s is interrupted by UAV: %s',
+                                    self.simulator.env.now, ack_wait.packet_id, self.my_drone.identifier, src_drone_id)
 
-                    self.my_drone.mac_protocol.wait_ack_process_finish[key2] = 1  # mark it as "finished"
-                    self.my_drone.mac_protocol.wait_ack_process_dict[key2].interrupt()
+                    self.my_drone.mac_protocol.ack_waits.finish(ack_wait.packet_id)  # mark it as "finished"
+                    ack_wait.process.interrupt()
 
         elif isinstance(packet, VfPacket):
-            logging.info('At time %s, UAV: %s receives the vf hello msg from UAV: %s, pkd id is: %s',
-                         self.simulator.env.now, self.my_drone.identifier, src_drone_id, packet.packet_id)
+            if TRACE.full:
+                TRACE.debug('At time %s, UAV: %s receives the vf hello msg from UAV: %s, pkd id is: %s',
+                            self.simulator.env.now, self.my_drone.identifier, src_drone_id, packet.packet_id)
 
             # update the neighbor table
             self.my_drone.motion_controller.neighbor_table.add_neighbor(packet, current_time)
 
             if packet.msg_type == 'hello':
-                config.GL_ID_VF_PACKET += 1
+                vf_packet_id = self.simulator.id_allocator.next_id('vf')
 
                 # channel assignment
                 channel_id = self.my_drone.channel_assigner.channel_assign()
 
                 ack_packet = VfPacket(src_drone=self.my_drone,
                                       creation_time=self.simulator.env.now,
-                                      id_hello_packet=config.GL_ID_VF_PACKET,
+                                      id_hello_packet=vf_packet_id,
                                       hello_packet_length=config.HELLO_PACKET_LENGTH,
                                       simulator=self.simulator,
                                       channel_id=channel_id)
@@ -231,23 +231,5 @@ class Greedy:
             else:
                 pass
 
-    def check_waiting_list(self):
-        while True:
-            if not self.my_drone.sleep:
-                yield self.simulator.env.timeout(self.check_interval)
-                for waiting_pkd in self.my_drone.waiting_list:
-                    if self.simulator.env.now > waiting_pkd.creation_time + waiting_pkd.deadline:
-                        self.my_drone.waiting_list.remove(waiting_pkd)
-                    else:
-                        dst_drone = waiting_pkd.dst_drone
-                        best_next_hop_id = self.neighbor_table.best_neighbor(self.my_drone, dst_drone)
-                        if best_next_hop_id != self.my_drone.identifier:
-                            self.my_drone.transmitting_queue.put(waiting_pkd)
-                            self.my_drone.waiting_list.remove(waiting_pkd)
-                        else:
-                            pass
-            else:
-                break
-
     def penalize(self, packet):
         pass
\ No newline at end of file
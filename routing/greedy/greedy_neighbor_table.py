@@ -1,8 +1,11 @@
-import logging
 import math
 from utils.util_function import euclidean_distance_3d
+from utils import trace
+from utils.expiring_table import ExpiringTable
 from collections import defaultdict
 
+TRACE = trace.category('routing.greedy')
+
 
 class GreedyNeighborTable:
     """
@@ -18,11 +21,12 @@ class GreedyNeighborTable:
         env: simulation environment
         neighbor_table: dictionary in python, core member
         entry_life_time: lifetime of each item in the neighbor table
+        expiry: expiry heap of the items, so that purging only visits the expired items
         have_void_area: used to indicate if encounters void area
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/11
-    Updated at: 2024/11/20
+    Updated at: 2025/5/14
     """
 
     def __init__(self, env, my_drone):
@@ -30,6 +34,7 @@ class GreedyNeighborTable:
         self.my_drone = my_drone
         self.neighbor_table = defaultdict(list)
         self.entry_life_time = 1 * 1e6  # unit: us (1s)
+        self.expiry = ExpiringTable(self.entry_life_time)
         self.have_void_area = 1
 
     # determine if the neighbor table is empty
@@ -54,10 +59,12 @@ class GreedyNeighborTable:
         drone_id = hello_packet.src_drone.identifier
         position = hello_packet.cur_position
         self.neighbor_table[drone_id] = [position, cur_time]
+        self.expiry.update(drone_id, cur_time)
 
     # delete the specified item
     def remove_neighbor(self, drone_id):
         del self.neighbor_table[drone_id]
+        self.expiry.remove(drone_id)
 
     # determine whether a certain drone is one's neighbor
     def is_neighbor(self, certain_drone):
@@ -78,22 +85,24 @@ class GreedyNeighborTable:
             # it means that the neighbor table is empty
             return
 
-        for key in list(self.neighbor_table):
-            updated_time = self.get_updated_time(key)
-            if updated_time + self.entry_life_time < self.env.now:  # expired
-                self.remove_neighbor(key)
+        for key in self.expiry.pop_expired(self.env.now):  # only the expired items are visited
+            del self.neighbor_table[key]
 
     # print neighbor table
     def print_neighbor(self, my_drone):
-        logging.info('|----------Neighbor Table of: %s ----------|', my_drone.identifier)
+        if not TRACE.full:
+            return
+
+        TRACE.debug('|----------Neighbor Table of: %s ----------|', my_drone.identifier)
         for key in self.neighbor_table:
-            logging.info('Neighbor: %s, position is: %s, updated time is: %s, ',
-                         key, self.neighbor_table[key][0], self.neighbor_table[key][1])
-        logging.info('|-----------------------------------------------------------------|')
+            TRACE.debug('Neighbor: %s, position is: %s, updated time is: %s, ',
+                        key, self.neighbor_table[key][0], self.neighbor_table[key][1])
+        TRACE.debug('|-----------------------------------------------------------------|')
 
     # clear neighbor table
     def clear(self):
         self.neighbor_table.clear()
+        self.expiry.clear()
 
     def best_neighbor(self, my_drone, dst_drone):
         """
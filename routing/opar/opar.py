@@ -1,20 +1,12 @@
 import copy
-import logging
 import math
 import numpy as np
 from entities.packet import DataPacket, AckPacket
 from topology.virtual_force.vf_packet import VfPacket
-from utils import config
-from utils.util_function import euclidean_distance_3d
-from phy.large_scale_fading import maximum_communication_range
+from utils import config, trace
 
 
-# config logging
-logging.basicConfig(filename='running_log.log',
-                    filemode='w',  # there are two modes: 'a' and 'w'
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    level=config.LOGGING_LEVEL
-                    )
+TRACE = trace.category('routing.opar')
 
 
 class Opar:
@@ -24,12 +16,11 @@ class Opar:
     Attributes:
         simulator: the simulation platform that contains everything
         my_drone: the drone that installed the routing protocol
-        cost: cost matrix, used to record the cost of all links
+        connectivity: the connectivity graph of the network shared by all the drones, it also caches the paths
         best_obj: the minimum objective function value under all iterations
         best_path: optimal routing path corresponding to "best_obj"
         w1: weight of the first term in objective function
         w2: weight of the second term in objective function
-        max_comm_range: maximum communication range corresponding to the snr threshold
 
     References:
         [1] M. Gharib, F. Afghah and E. Bentley, "OPAR: Optimized Predictive and Adaptive Routing for Cooperative UAV
@@ -39,167 +30,94 @@ class Opar:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/3/19
-    Updated at: 2025/3/30
+    Updated at: 2025/5/14
     """
 
     def __init__(self, simulator, my_drone):
         self.simulator = simulator
         self.my_drone = my_drone
-        self.cost = None
+        self.connectivity = simulator.connectivity
         self.best_obj = 0
         self.best_path = None
 
         self.w1 = 0.5
         self.w2 = 0.5
 
-        self.max_comm_range = maximum_communication_range()
-        self.simulator.env.process(self.check_waiting_list())
+        self.connectivity.link_listeners.append(self.links_added)
 
-    def calculate_cost_matrix(self):
-        cost = np.zeros((self.simulator.n_drones, self.simulator.n_drones))
-        cost.fill(np.inf)
-
-        for i in range(self.simulator.n_drones):
-            for j in range((i+1), self.simulator.n_drones):
-                drone1 = self.simulator.drones[i]
-                drone2 = self.simulator.drones[j]
-
-                if (i != j) and (euclidean_distance_3d(drone1.coords, drone2.coords) < self.max_comm_range):
-                    cost[i, j] = 1
-                    cost[j, i] = 1
-
-        return cost
-
-    def dijkstra(self, cost, src_id, dst_id, minimum_link_lifetime):
+    def evaluate_path(self, path):
         """
-        Dijkstra's algorithm to find the shortest path
-        :param cost: cost matrix
-        :param src_id: source node id
-        :param dst_id: destination node id
-        :param minimum_link_lifetime: used to determine which edges cannot be considered in this iteration
-        :return: routing path that has the minimum total cost
+        Objective function of a path
+        :param path: routing path, including the source
+        :return: the value of the objective function and the minimum predicted lifetime of the links
         """
 
-        distance_list = [np.inf for _ in range(self.simulator.n_drones)]
-        distance_list[src_id] = 0
+        total_cost = 0
+        t = 0
+        minimum_link_lifetime = 1e11
 
-        prev_list = [-1 for _ in range(self.simulator.n_drones)]
-        prev_list[src_id] = -2
+        for link in range(len(path) - 1):
+            total_cost += 1  # the cost of each link is 1
 
-        visited_list = [False for _ in range(self.simulator.n_drones)]
+            delta_t = self.connectivity.link_lifetime(path[link], path[link + 1])
 
-        for i in range(self.simulator.n_drones):
-            unvisited_list = [(index, value) for index, value in enumerate(distance_list) if not visited_list[index]]
-            min_distance_node, _ = min(unvisited_list, key=lambda x: x[1])
+            if 1 / delta_t > t:
+                t = delta_t
 
-            visited_list[min_distance_node] = True
+            if delta_t < minimum_link_lifetime:
+                minimum_link_lifetime = delta_t
 
-            for j in range(self.simulator.n_drones):
-                drone1 = self.simulator.drones[min_distance_node]
-                drone2 = self.simulator.drones[j]
+        obj = self.w1 * total_cost + self.w2 * t
 
-                if (visited_list[j] is False) and (cost[min_distance_node, j] != np.inf):
-                    delta_temp = link_lifetime_predictor(drone1, drone2, self.max_comm_range)
+        return obj, minimum_link_lifetime
 
-                    if delta_temp <= minimum_link_lifetime:
-                        cost[min_distance_node, j] = np.inf
-                        cost[j, min_distance_node] = np.inf
+    def optimize_path(self, src_id, dst_id):
+        """
+        Find the shortest path, then remove the links whose lifetime is not longer than the minimum link lifetime of
+        this path and search again, until there is no path anymore. The path with the minimum objective is selected
+        :param src_id: source node id
+        :param dst_id: destination node id
+        :return: the best routing path (including the source), empty list if there is no path
+        """
 
-                    alt = distance_list[min_distance_node] + cost[min_distance_node, j]
-                    if alt < distance_list[j]:
-                        distance_list[j] = alt
-                        prev_list[j] = min_distance_node
+        self.best_obj = 0
+        self.best_path = []
 
-        # path construction
-        current_node = dst_id
-        path = [dst_id]
+        minimum_link_lifetime = 0
+        path = self.connectivity.shortest_path(src_id, dst_id, minimum_link_lifetime)
 
-        while current_node != -2:
-            current_node = prev_list[current_node]
+        while len(path) != 0:
+            obj, minimum_link_lifetime = self.evaluate_path(path)
 
-            if current_node != -1:
-                path.insert(0, current_node)
-            else:
-                path = []
-                break
+            if len(self.best_path) == 0 or obj < self.best_obj:
+                self.best_obj = obj
+                self.best_path = path
+
+            path = self.connectivity.shortest_path(src_id, dst_id, minimum_link_lifetime)
 
-        return path
+        return self.best_path
 
     def next_hop_selection(self, packet):
         enquire = False
         has_route = True
 
         if packet.src_drone is self.my_drone:  # if it is the source, optimization should be executed
-            self.cost = self.calculate_cost_matrix()
-            temp_cost = self.cost
-            src_drone = self.my_drone  # packet.src_drone
-            dst_drone = packet.dst_drone  # get the destination of the data packet
+            src_id = self.my_drone.identifier
+            dst_id = packet.dst_drone.identifier
 
-            path = self.dijkstra(temp_cost, src_drone.identifier, dst_drone.identifier, 0)
+            # the path is optimized again only when one of its links breaks or is predicted to break
+            path = self.connectivity.cached_path(src_id, dst_id)
+            if path is None:
+                path = self.optimize_path(src_id, dst_id)
+                self.connectivity.cache_path(path)
 
             if len(path) != 0:
-                path.pop(0)
-
-                total_cost = 0
-                t = 0
-                minimum_link_lifetime = 1e11
-
-                for link in range(len(path)-1):
-                    drone1 = self.simulator.drones[path[link]]
-                    drone2 = self.simulator.drones[path[link+1]]
-                    link_cost = self.cost[path[link], path[link+1]]
-                    total_cost += link_cost
-
-                    delta_t = link_lifetime_predictor(drone1, drone2, self.max_comm_range)
-
-                    if 1/delta_t > t:
-                        t = delta_t
-
-                    if delta_t < minimum_link_lifetime:
-                        minimum_link_lifetime = delta_t
-
-                # calculate the objective function
-                obj = self.w1 * total_cost + self.w2 * t
-                self.best_obj = obj
-                self.best_path = path
+                routing_path = path[1:]  # remove myself, each packet has its own copy since relays consume it
             else:
-                minimum_link_lifetime = None
-                self.best_path = [src_drone.identifier, src_drone.identifier]
-
-            while len(path) != 0:
-                path = self.dijkstra(temp_cost, src_drone.identifier, dst_drone.identifier, minimum_link_lifetime)
+                routing_path = [src_id]
 
-                if len(path) != 0:
-                    path.pop(0)
-
-                    total_cost = 0
-                    t = 0
-                    minimum_link_lifetime = 1e11
-
-                    for link in range(len(path) - 1):
-                        drone1 = self.simulator.drones[path[link]]
-                        drone2 = self.simulator.drones[path[link + 1]]
-                        link_cost = self.cost[path[link], path[link + 1]]
-                        total_cost += link_cost
-
-                        delta_t = link_lifetime_predictor(drone1, drone2, self.max_comm_range)
-
-                        if 1 / delta_t > t:
-                            t = delta_t
-
-                        if delta_t < minimum_link_lifetime:
-                            minimum_link_lifetime = delta_t
-
-                    # calculate the objective function
-                    obj = self.w1 * total_cost + self.w2 * t
-
-                    if obj < self.best_obj:
-                        self.best_obj = obj
-                        self.best_path = path
-
-            self.best_path.pop(0)  # remove myself
-            packet.routing_path = self.best_path
-            best_next_hop_id = self.best_path[0]
+            packet.routing_path = routing_path
+            best_next_hop_id = routing_path[0]
 
         else:  # for relay nodes, no additional calculations are required
             routing_path = packet.routing_path
@@ -234,22 +152,22 @@ class Opar:
         if isinstance(packet, DataPacket):
             packet_copy = copy.copy(packet)
 
-            logging.info('~~~Packet: %s is received by UAV: %s at: %s',
-                         packet_copy.packet_id, self.my_drone.identifier, self.simulator.env.now)
+            if TRACE.full:
+                TRACE.debug('~~~Packet: %s is received by UAV: %s at: %s',
+                            packet_copy.packet_id, self.my_drone.identifier, self.simulator.env.now)
             if packet_copy.dst_drone.identifier == self.my_drone.identifier:
                 if packet_copy.packet_id not in self.simulator.metrics.datapacket_arrived:
                     latency = self.simulator.env.now - packet_copy.creation_time  # in us
-                    self.simulator.metrics.deliver_time_dict[packet_copy.packet_id] = latency
-                    self.simulator.metrics.throughput_dict[packet_copy.packet_id] = packet_copy.packet_length / (latency / 1e6)
-                    self.simulator.metrics.hop_cnt_dict[packet_copy.packet_id] = packet_copy.get_current_ttl()
-                    self.simulator.metrics.datapacket_arrived.add(packet_copy.packet_id)
+                    self.simulator.metrics.record_delivery(packet_copy.packet_id, packet_copy.src_drone.identifier,
+                                                           latency, packet_copy.packet_length,
+                                                           packet_copy.get_current_ttl())
 
-                config.GL_ID_ACK_PACKET += 1
+                ack_packet_id = self.simulator.id_allocator.next_id('ack')
 
                 src_drone = self.simulator.drones[src_drone_id]  # previous drone
                 ack_packet = AckPacket(src_drone=self.my_drone,
                                        dst_drone=src_drone,
-                                       ack_packet_id=config.GL_ID_ACK_PACKET,
+                                       ack_packet_id=ack_packet_id,
                                        ack_packet_length=config.ACK_PACKET_LENGTH,
                                        ack_packet=packet_copy,
                                        simulator=self.simulator,
@@ -266,14 +184,12 @@ class Opar:
                 else:
                     pass
             else:
-                if self.my_drone.transmitting_queue.qsize() < self.my_drone.max_queue_size:
-                    self.my_drone.transmitting_queue.put(packet_copy)
-
-                    config.GL_ID_ACK_PACKET += 1
+                if self.my_drone.transmitting_queue.offer(packet_copy):
+                    ack_packet_id = self.simulator.id_allocator.next_id('ack')
                     src_drone = self.simulator.drones[src_drone_id]  # previous drone
                     ack_packet = AckPacket(src_drone=self.my_drone,
                                            dst_drone=src_drone,
-                                           ack_packet_id=config.GL_ID_ACK_PACKET,
+                                           ack_packet_id=ack_packet_id,
                                            ack_packet_length=config.ACK_PACKET_LENGTH,
                                            ack_packet=packet_copy,
                                            simulator=self.simulator,
@@ -295,33 +211,35 @@ class Opar:
         elif isinstance(packet, AckPacket):
             data_packet_acked = packet.ack_packet
 
-            self.simulator.metrics.mac_delay.append((self.simulator.env.now - data_packet_acked.first_attempt_time) / 1e3)
+            self.simulator.metrics.mac_delay.add((self.simulator.env.now - data_packet_acked.first_attempt_time) / 1e3)
 
             self.my_drone.remove_from_queue(data_packet_acked)
 
-            key2 = ''.join(['wait_ack', str(self.my_drone.identifier), '_', str(data_packet_acked.packet_id)])
+            ack_wait = self.my_drone.mac_protocol.ack_waits.get(data_packet_acked.packet_id)
 
-            if self.my_drone.mac_protocol.wait_ack_process_finish[key2] == 0:
-                if not self.my_drone.mac_protocol.wait_ack_process_dict[key2].triggered:
-                    logging.info('At time: %s, the wait_ack process (id: %s) of UAV: %s is interrupted by UAV: %s',
-                                 self.simulator.env.now, key2, self.my_drone.identifier, src_drone_id)
+            if ack_wait is not None:  # the process of waiting for this ACK hasn't finished
+                if not ack_wait.process.triggered:
+                    if TRACE.full:
+                        TRACE.debug('At time: %s, the wait_ack process (id: %s) of UAV: %s is interrupted by UAV: %s',
+                                    self.simulator.env.now, ack_wait.packet_id, self.my_drone.identifier, src_drone_id)
 
-                    self.my_drone.mac_protocol.wait_ack_process_finish[key2] = 1  # mark it as "finished"
-                    self.my_drone.mac_protocol.wait_ack_process_dict[key2].interrupt()
+                    self.my_drone.mac_protocol.ack_waits.finish(ack_wait.packet_id)  # mark it as "finished"
+                    ack_wait.process.interrupt()
 
         elif isinstance(packet, VfPacket):
-            logging.info('At time %s, UAV: %s receives the vf hello msg from UAV: %s, pkd id is: %s',
-                         self.simulator.env.now, self.my_drone.identifier, src_drone_id, packet.packet_id)
+            if TRACE.full:
+                TRACE.debug('At time %s, UAV: %s receives the vf hello msg from UAV: %s, pkd id is: %s',
+                            self.simulator.env.now, self.my_drone.identifier, src_drone_id, packet.packet_id)
 
             # update the neighbor table
             self.my_drone.motion_controller.neighbor_table.add_neighbor(packet, current_time)
 
             if packet.msg_type == 'hello':
-                config.GL_ID_VF_PACKET += 1
+                vf_packet_id = self.simulator.id_allocator.next_id('vf')
 
                 ack_packet = VfPacket(src_drone=self.my_drone,
                                       creation_time=self.simulator.env.now,
-                                      id_hello_packet=config.GL_ID_VF_PACKET,
+                                      id_hello_packet=vf_packet_id,
                                       hello_packet_length=config.HELLO_PACKET_LENGTH,
                                       simulator=self.simulator,
                                       channel_id=packet.channel_id)
@@ -331,22 +249,11 @@ class Opar:
             else:
                 pass
 
-    def check_waiting_list(self):
-        while True:
-            if not self.my_drone.sleep:
-                yield self.simulator.env.timeout(0.6 * 1e6)
-                for waiting_pkd in self.my_drone.waiting_list:
-                    if self.simulator.env.now > waiting_pkd.creation_time + waiting_pkd.deadline:  # expired
-                        self.my_drone.waiting_list.remove(waiting_pkd)
-                    else:
-                        best_next_hop_id = self.next_hop_selection(waiting_pkd)
-                        if best_next_hop_id != self.my_drone.identifier:
-                            self.my_drone.transmitting_queue.put(waiting_pkd)
-                            self.my_drone.waiting_list.remove(waiting_pkd)
-                        else:
-                            pass
-            else:
-                break
+    def links_added(self):
+        """A new path may exist to any destination once new links appear in the network"""
+
+        for dst_id in self.my_drone.waiting_list.destinations():
+            self.my_drone.waiting_list.wake(dst_id, self)
 
     def penalize(self, packet):
         pass
@@ -380,3 +287,36 @@ def link_lifetime_predictor(drone1, drone2, max_comm_range):
     delta_t = max(delta_t_1, delta_t_2)
 
     return delta_t
+
+
+def link_lifetime_matrix(coords, velocities, max_comm_range):
+    """
+    Predicted remaining lifetime of the links between all pairs of drones, vectorized version of
+    "link_lifetime_predictor" (the same formula, the results only differ by rounding errors)
+    :param coords: array of shape (n_drones, 3), positions of the drones
+    :param velocities: array of shape (n_drones, 3), velocities of the drones
+    :param max_comm_range: maximum communication range
+    :return: array of shape (n_drones, n_drones), only meaningful for the pairs that are within range. The lifetime is
+             infinite if two drones have the same velocity and are within range, and 0 if the drones never get within
+             range of each other
+    """
+
+    coords = np.asarray(coords, dtype=float)
+    velocities = np.asarray(velocities, dtype=float)
+
+    dv = [velocities[:, k, None] - velocities[None, :, k] for k in range(3)]
+    dp = [coords[:, k, None] - coords[None, :, k] for k in range(3)]
+
+    A = dv[0] ** 2 + dv[1] ** 2 + dv[2] ** 2
+    B = 2*dv[0]*dp[0] + 2*dv[1]*dp[1] + 2*dv[2]*dp[2]
+    C = (dp[0] ** 2 + dp[1] ** 2 + dp[2] ** 2) - max_comm_range ** 2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # since A > 0, the larger root is always the one with "+"
+        delta_t = (-B + np.sqrt(B ** 2 - 4 * A * C)) / (2 * A)
+
+    delta_t[A == 0] = np.inf
+    delta_t[(A == 0) & (C >= 0)] = 0
+    delta_t[np.isnan(delta_t)] = 0
+
+    return delta_t
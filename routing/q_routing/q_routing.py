@@ -1,18 +1,12 @@
 import copy
 import random
-import logging
 from entities.packet import DataPacket
 from topology.virtual_force.vf_packet import VfPacket
 from routing.q_routing.q_routing_packet import QRoutingHelloPacket, QRoutingAckPacket
 from routing.q_routing.q_routing_table import QRoutingTable
-from utils import config
+from utils import config, trace
 
-# config logging
-logging.basicConfig(filename='running_log.log',
-                    filemode='w',  # there are two modes: 'a' and 'w'
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    level=config.LOGGING_LEVEL
-                    )
+TRACE = trace.category('routing.q_routing')
 
 
 class QRouting:
@@ -56,7 +50,7 @@ class QRouting:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/8/20
-    Updated at: 2025/3/30
+    Updated at: 2025/5/14
 
     """
 
@@ -65,30 +59,29 @@ class QRouting:
         self.my_drone = my_drone
         self.rng_routing = random.Random(self.my_drone.identifier + self.my_drone.simulator.seed + 10)
         self.hello_interval = 0.5 * 1e6  # broadcast hello packet every 0.5s
-        self.check_interval = 0.6 * 1e6
         self.learning_rate = 0.5
         self.table = QRoutingTable(self.simulator.env, my_drone,self.rng_routing)
         self.simulator.env.process(self.broadcast_hello_packet_periodically())
-        self.simulator.env.process(self.check_waiting_list())
 
     def broadcast_hello_packet(self, my_drone):
-        config.GL_ID_HELLO_PACKET += 1
+        hello_packet_id = self.simulator.id_allocator.next_id('hello')
 
         # channel assignment
         channel_id = self.my_drone.channel_assigner.channel_assign()
 
         hello_pkd = QRoutingHelloPacket(src_drone=my_drone,
                                         creation_time=self.simulator.env.now,
-                                        id_hello_packet=config.GL_ID_HELLO_PACKET,
+                                        id_hello_packet=hello_packet_id,
                                         hello_packet_length=config.HELLO_PACKET_LENGTH,
                                         simulator=self.simulator,
                                         channel_id=channel_id)
         hello_pkd.transmission_mode = 1
 
-        logging.info('At time: %s, UAV: %s has hello packet to broadcast',
-                     self.simulator.env.now, self.my_drone.identifier)
+        if TRACE.full:
+            TRACE.debug('At time: %s, UAV: %s has hello packet to broadcast',
+                        self.simulator.env.now, self.my_drone.identifier)
 
-        self.simulator.metrics.control_packet_num += 1
+        self.simulator.metrics.record_control_packet(self.my_drone.identifier)
         self.my_drone.transmitting_queue.put(hello_pkd)
 
     def broadcast_hello_packet_periodically(self):
@@ -141,35 +134,41 @@ class QRouting:
 
         current_time = self.simulator.env.now
         if isinstance(packet, QRoutingHelloPacket):
+            new_neighbor = not self.table.is_neighbor(packet.src_drone.identifier)
             self.table.add_neighbor(packet, current_time)  # update the neighbor table
 
+            if new_neighbor:  # a new candidate next hop for all the waiting packets
+                for dst_id in self.my_drone.waiting_list.destinations():
+                    self.my_drone.waiting_list.wake(dst_id, self, self.has_next_hop)
+
         elif isinstance(packet, DataPacket):
             packet_copy = copy.copy(packet)
 
             packet_copy.previous_drone = self.simulator.drones[src_drone_id]
-            logging.info('~~~Packet: %s is received by UAV: %s at: %s',
-                         packet_copy.packet_id, self.my_drone.identifier, self.simulator.env.now)
+            if TRACE.full:
+                TRACE.debug('~~~Packet: %s is received by UAV: %s at: %s',
+                            packet_copy.packet_id, self.my_drone.identifier, self.simulator.env.now)
 
             if packet_copy.dst_drone.identifier == self.my_drone.identifier:
                 if packet_copy.packet_id not in self.simulator.metrics.datapacket_arrived:
                     latency = self.simulator.env.now - packet_copy.creation_time  # in us
-                    self.simulator.metrics.deliver_time_dict[packet_copy.packet_id] = latency
-                    self.simulator.metrics.throughput_dict[packet_copy.packet_id] = packet_copy.packet_length / (latency / 1e6)
-                    self.simulator.metrics.hop_cnt_dict[packet_copy.packet_id] = packet_copy.get_current_ttl()
-                    self.simulator.metrics.datapacket_arrived.add(packet_copy.packet_id)
-                    logging.info('Packet: %s is received by destination UAV: %s',
-                                 packet_copy.packet_id, self.my_drone.identifier)
+                    self.simulator.metrics.record_delivery(packet_copy.packet_id, packet_copy.src_drone.identifier,
+                                                           latency, packet_copy.packet_length,
+                                                           packet_copy.get_current_ttl())
+                    if TRACE.on:
+                        TRACE.info('Packet: %s is received by destination UAV: %s',
+                                   packet_copy.packet_id, self.my_drone.identifier)
 
                 # waiting time includes queuing delay and access delay
                 waiting_time = packet_copy.transmitting_start_time - packet_copy.waiting_start_time
 
-                config.GL_ID_ACK_PACKET += 1
+                ack_packet_id = self.simulator.id_allocator.next_id('ack')
                 src_drone = self.simulator.drones[src_drone_id]  # previous drone
                 min_q = self.table.get_min_q_value(packet_copy.dst_drone.identifier)
 
                 ack_packet = QRoutingAckPacket(src_drone=self.my_drone,
                                                dst_drone=src_drone,
-                                               ack_packet_id=config.GL_ID_ACK_PACKET,
+                                               ack_packet_id=ack_packet_id,
                                                ack_packet_length=config.ACK_PACKET_LENGTH,
                                                ack_packet=packet,
                                                transmitting_start_time=packet_copy.transmitting_start_time,
@@ -189,20 +188,19 @@ class QRouting:
                 else:
                     pass
             else:
-                if self.my_drone.transmitting_queue.qsize() < self.my_drone.max_queue_size:
-                    self.my_drone.transmitting_queue.put(packet_copy)
+                if self.my_drone.transmitting_queue.offer(packet_copy):
                     packet_copy.waiting_start_time = self.simulator.env.now  # this packet starts to wait in the queue
 
                     # waiting time includes queuing delay and access delay
                     waiting_time = packet_copy.transmitting_start_time - packet_copy.waiting_start_time
 
-                    config.GL_ID_ACK_PACKET += 1
+                    ack_packet_id = self.simulator.id_allocator.next_id('ack')
                     src_drone = self.simulator.drones[src_drone_id]  # previous drone
                     min_q = self.table.get_min_q_value(packet_copy.dst_drone.identifier)
 
                     ack_packet = QRoutingAckPacket(src_drone=self.my_drone,
                                                    dst_drone=src_drone,
-                                                   ack_packet_id=config.GL_ID_ACK_PACKET,
+                                                   ack_packet_id=ack_packet_id,
                                                    ack_packet_length=config.ACK_PACKET_LENGTH,
                                                    ack_packet=packet,
                                                    transmitting_start_time=packet_copy.transmitting_start_time,
@@ -231,29 +229,31 @@ class QRouting:
 
             self.my_drone.remove_from_queue(data_packet_acked)
 
-            key2 = ''.join(['wait_ack', str(self.my_drone.identifier), '_', str(data_packet_acked.packet_id)])
+            ack_wait = self.my_drone.mac_protocol.ack_waits.get(data_packet_acked.packet_id)
 
-            if self.my_drone.mac_protocol.wait_ack_process_finish[key2] == 0:
-                if not self.my_drone.mac_protocol.wait_ack_process_dict[key2].triggered:
-                    logging.info('At time: %s, the wait_ack process (id: %s) of UAV: %s is interrupted by UAV: %s',
-                                 self.simulator.env.now, key2, self.my_drone.identifier, src_drone_id)
+            if ack_wait is not None:  # the process of waiting for this ACK hasn't finished
+                if not ack_wait.process.triggered:
+                    if TRACE.full:
+                        TRACE.debug('At time: %s, the wait_ack process (id: %s) of UAV: %s is interrupted by UAV: %s',
+                                    self.simulator.env.now, ack_wait.packet_id, self.my_drone.identifier, src_drone_id)
 
-                    self.my_drone.mac_protocol.wait_ack_process_finish[key2] = 1  # mark it as "finished"
-                    self.my_drone.mac_protocol.wait_ack_process_dict[key2].interrupt()
+                    self.my_drone.mac_protocol.ack_waits.finish(ack_wait.packet_id)  # mark it as "finished"
+                    ack_wait.process.interrupt()
 
         elif isinstance(packet, VfPacket):
-            logging.info('At time %s, UAV: %s receives the vf hello msg from UAV: %s, pkd id is: %s',
-                         self.simulator.env.now, self.my_drone.identifier, src_drone_id, packet.packet_id)
+            if TRACE.full:
+                TRACE.debug('At time %s, UAV: %s receives the vf hello msg from UAV: %s, pkd id is: %s',
+                            self.simulator.env.now, self.my_drone.identifier, src_drone_id, packet.packet_id)
 
             # update the neighbor table
             self.my_drone.motion_controller.neighbor_table.add_neighbor(packet, current_time)
 
             if packet.msg_type == 'hello':
-                config.GL_ID_VF_PACKET += 1
+                vf_packet_id = self.simulator.id_allocator.next_id('vf')
 
                 ack_packet = VfPacket(src_drone=self.my_drone,
                                       creation_time=self.simulator.env.now,
-                                      id_hello_packet=config.GL_ID_VF_PACKET,
+                                      id_hello_packet=vf_packet_id,
                                       hello_packet_length=config.HELLO_PACKET_LENGTH,
                                       simulator=self.simulator,
                                       channel_id=packet.channel_id)
@@ -272,10 +272,11 @@ class QRouting:
         transmitting_start_time = data_packet_acked.transmitting_start_time
         transmission_delay = self.simulator.env.now - transmitting_start_time  # in us
 
-        self.simulator.metrics.mac_delay.append((self.simulator.env.now - data_packet_acked.first_attempt_time) / 1e3)
+        self.simulator.metrics.mac_delay.add((self.simulator.env.now - data_packet_acked.first_attempt_time) / 1e3)
 
-        logging.info('Data packet id: %s, real transmission delay is: %s',
-                     data_packet_acked.packet_id, transmission_delay)
+        if TRACE.full:
+            TRACE.debug('Data packet id: %s, real transmission delay is: %s',
+                        data_packet_acked.packet_id, transmission_delay)
 
         min_q = packet.min_q
 
@@ -285,29 +286,18 @@ class QRouting:
         else:
             f = 0
 
-        self.table.q_table[next_hop_id][dst_drone.identifier] = \
-            (1 - self.learning_rate) * self.table.q_table[next_hop_id][dst_drone.identifier] + \
+        self.table.q_table[next_hop_id, dst_drone.identifier] = \
+            (1 - self.learning_rate) * self.table.q_table[next_hop_id, dst_drone.identifier] + \
             self.learning_rate * (waiting_time + transmission_delay + (1 - f) * min_q)
 
-        logging.info('The Q-table in UAV: %s is: %s',
-                     self.my_drone.identifier, self.table.q_table)
+        if TRACE.full:
+            TRACE.debug('The Q-table in UAV: %s is: %s',
+                        self.my_drone.identifier, self.table.q_table)
 
-    def check_waiting_list(self):
-        while True:
-            if not self.my_drone.sleep:
-                yield self.simulator.env.timeout(self.check_interval)
-                for waiting_pkd in self.my_drone.waiting_list:
-                    if self.simulator.env.now > waiting_pkd.creation_time + waiting_pkd.deadline:
-                        self.my_drone.waiting_list.remove(waiting_pkd)
-                    else:
-                        has_route, packet, enquire = self.next_hop_selection(waiting_pkd)
-                        if has_route:
-                            self.my_drone.transmitting_queue.put(waiting_pkd)
-                            self.my_drone.waiting_list.remove(waiting_pkd)
-                        else:
-                            pass
-            else:
-                break
+    def has_next_hop(self, packet):
+        """Whether the neighbor table offers a next hop towards the destination of "packet", which is left unchanged"""
+
+        return self.table.best_neighbor(self.my_drone, packet.dst_drone) != self.my_drone.identifier
 
     def penalize(self, packet):
         pass  # since the penalty was not mentioned in the original paper
\ No newline at end of file
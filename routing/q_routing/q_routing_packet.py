@@ -2,6 +2,8 @@ from entities.packet import Packet
 
 
 class QRoutingHelloPacket(Packet):
+    __slots__ = ('src_drone', 'cur_position')
+
     def __init__(self,
                  src_drone,
                  creation_time,
@@ -16,6 +18,8 @@ class QRoutingHelloPacket(Packet):
 
 
 class QRoutingAckPacket(Packet):
+    __slots__ = ('src_drone', 'dst_drone', 'ack_packet', 'queuing_delay', 'min_q')
+
     def __init__(self,
                  src_drone,
                  dst_drone,
@@ -2,6 +2,7 @@ import math
 import random
 import numpy as np
 from collections import defaultdict
+from utils.expiring_table import ExpiringTable
 
 
 class QRoutingTable:
@@ -12,6 +13,8 @@ class QRoutingTable:
         self.q_table = 30000 * np.ones((my_drone.simulator.n_drones, my_drone.simulator.n_drones))  # initialization
         self.entry_life_time = 2.5 * 1e6  # unit: us
         self.rng_routing = rng_routing
+        self.neighbor_ids = None  # ids of the neighbors, in the order of the neighbor table
+        self.expiry = ExpiringTable(self.entry_life_time, inclusive=True)  # expiry heap of the neighbors
 
     # determine if the neighbor table is empty
     def is_empty(self):
@@ -35,11 +38,16 @@ class QRoutingTable:
         drone_id = hello_packet.src_drone.identifier
         position = hello_packet.cur_position
 
+        if drone_id not in self.neighbor_table:
+            self.neighbor_ids = None  # new neighbor
         self.neighbor_table[drone_id] = [position, cur_time]
+        self.expiry.update(drone_id, cur_time)
 
     # delete the specified item
     def remove_neighbor(self, drone_id):
         del self.neighbor_table[drone_id]
+        self.neighbor_ids = None
+        self.expiry.remove(drone_id)
 
     # determine whether a certain drone is one's neighbor
     def is_neighbor(self, drone_id):
@@ -55,24 +63,31 @@ class QRoutingTable:
             # it means that the neighbor table is empty
             return
 
-        for key in list(self.neighbor_table):
-            updated_time = self.get_updated_time(key)
-            if updated_time + self.entry_life_time <= self.env.now:  # expired
-                self.remove_neighbor(key)
+        for key in self.expiry.pop_expired(self.env.now):  # only the expired items are visited
+            del self.neighbor_table[key]
+            self.neighbor_ids = None
 
     # clear neighbor table
     def clear(self):
         self.neighbor_table.clear()
+        self.neighbor_ids = None
+        self.expiry.clear()
+
+    # ids of my neighbors as an array, used to read their Q-values at once
+    def get_neighbor_ids(self):
+        if self.neighbor_ids is None:
+            self.neighbor_ids = np.fromiter(self.neighbor_table.keys(), dtype=int, count=len(self.neighbor_table))
+
+        return self.neighbor_ids
 
     # get the minimum Q-value of my neighbors
     def get_min_q_value(self, dst_drone_id):
         self.purge()
 
         min_q = 1e10  # initial value
-        for neighbor in self.neighbor_table.keys():
-            min_q_temp = self.q_table[neighbor][dst_drone_id]
-            if min_q_temp <= min_q:
-                min_q = min_q_temp
+        neighbor_ids = self.get_neighbor_ids()
+        if len(neighbor_ids) != 0:
+            min_q = min(self.q_table[neighbor_ids, dst_drone_id].min(), min_q)
 
         return min_q
 
@@ -96,16 +111,15 @@ class QRoutingTable:
 
             candidate_of_min_q_list = []
 
-            for neighbor in self.neighbor_table.keys():
-                if neighbor != self.my_drone.identifier:  # cannot forward the packet to myself
-                    next_hop_q_value = self.q_table[neighbor][dst_id]
-                    if next_hop_q_value <= best_q_value:
-                        best_q_value = next_hop_q_value
+            neighbor_ids = self.get_neighbor_ids()
+            neighbor_ids = neighbor_ids[neighbor_ids != self.my_drone.identifier]  # cannot forward the packet to myself
+
+            if len(neighbor_ids) != 0:
+                next_hop_q_values = self.q_table[neighbor_ids, dst_id]
+                best_q_value = min(next_hop_q_values.min(), best_q_value)
 
-            for neighbor in self.neighbor_table.keys():
-                if neighbor != self.my_drone.identifier:
-                    if self.q_table[neighbor][dst_id] == best_q_value:
-                        candidate_of_min_q_list.append(neighbor)
+                # the candidates stay in the order of the neighbor table
+                candidate_of_min_q_list = neighbor_ids[next_hop_q_values == best_q_value].tolist()
 
             if len(candidate_of_min_q_list) != 0:
                 best_id = self.rng_routing.choice(candidate_of_min_q_list)
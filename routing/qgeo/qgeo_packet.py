@@ -2,6 +2,8 @@ from entities.packet import Packet
 
 
 class QGeoHelloPacket(Packet):
+    __slots__ = ('src_drone', 'cur_position', 'cur_velocity')
+
     def __init__(self,
                  src_drone,
                  creation_time,
@@ -17,6 +19,9 @@ class QGeoHelloPacket(Packet):
 
 
 class QGeoAckPacket(Packet):
+    __slots__ = ('src_drone', 'src_coords', 'src_velocity', 'dst_drone', 'acked_packet', 'void_area_flag', 'reward',
+                 'max_q')
+
     def __init__(self,
                  src_drone,
                  dst_drone,
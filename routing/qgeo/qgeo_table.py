@@ -1,8 +1,8 @@
-import logging
 import math
 import random
 import numpy as np
 from collections import defaultdict
+from utils.expiring_table import ExpiringTable
 from utils.util_function import euclidean_distance_3d
 
 
@@ -16,6 +16,8 @@ class QGeoTable:
         self.q_table = np.zeros((my_drone.simulator.n_drones, my_drone.simulator.n_drones))  # initialization
         self.entry_life_time = 1 * 1e6  # unit: us
         self.rng_routing = rng_routing
+        self.neighbor_ids = None  # ids of the neighbors, in the order of the neighbor table
+        self.expiry = ExpiringTable(self.entry_life_time, inclusive=True)  # expiry heap of the neighbors
 
     # determine if the neighbor table is empty
     def is_empty(self):
@@ -41,13 +43,18 @@ class QGeoTable:
             position = hello_packet.cur_position
             velocity = hello_packet.cur_velocity
 
+            if drone_id not in self.neighbor_table:
+                self.neighbor_ids = None  # new neighbor
             self.neighbor_table[drone_id] = [position, velocity, cur_time]
+            self.expiry.update(drone_id, cur_time)
         else:
             pass
 
     # delete the specified item
     def remove_neighbor(self, drone_id):
         del self.neighbor_table[drone_id]
+        self.neighbor_ids = None
+        self.expiry.remove(drone_id)
 
     # determine whether a certain drone is one's neighbor
     def is_neighbor(self, drone_id):
@@ -63,14 +70,22 @@ class QGeoTable:
             # it means that the neighbor table is empty
             return
 
-        for key in list(self.neighbor_table):
-            updated_time = self.get_updated_time(key)
-            if updated_time + self.entry_life_time <= self.env.now:  # expired
-                self.remove_neighbor(key)
+        for key in self.expiry.pop_expired(self.env.now):  # only the expired items are visited
+            del self.neighbor_table[key]
+            self.neighbor_ids = None
 
     # clear neighbor table
     def clear(self):
         self.neighbor_table.clear()
+        self.neighbor_ids = None
+        self.expiry.clear()
+
+    # ids of my neighbors as an array, used to read their Q-values at once
+    def get_neighbor_ids(self):
+        if self.neighbor_ids is None:
+            self.neighbor_ids = np.fromiter(self.neighbor_table.keys(), dtype=int, count=len(self.neighbor_table))
+
+        return self.neighbor_ids
 
     # determine if the drone is in void area
     def void_area_judgment(self, dst_drone):
@@ -90,10 +105,9 @@ class QGeoTable:
         self.purge()
 
         max_q = -10000  # initial value
-        for neighbor in self.neighbor_table.keys():
-            max_q_temp = self.q_table[neighbor][dst_drone_id]
-            if max_q_temp > max_q:
-                max_q = max_q_temp
+        neighbor_ids = self.get_neighbor_ids()
+        if len(neighbor_ids) != 0:
+            max_q = max(self.q_table[neighbor_ids, dst_drone_id].max(), max_q)
 
         return max_q
 
@@ -120,16 +134,15 @@ class QGeoTable:
 
                 candidate_of_max_q_list = []
 
-                for neighbor in self.neighbor_table.keys():
-                    if neighbor != self.my_drone.identifier:  # cannot forward the packet to myself
-                        next_hop_q_value = self.q_table[neighbor][dst_id]
-                        if next_hop_q_value > best_q_value:
-                            best_q_value = next_hop_q_value
+                neighbor_ids = self.get_neighbor_ids()
+                neighbor_ids = neighbor_ids[neighbor_ids != self.my_drone.identifier]  # cannot forward to myself
+
+                if len(neighbor_ids) != 0:
+                    next_hop_q_values = self.q_table[neighbor_ids, dst_id]
+                    best_q_value = max(next_hop_q_values.max(), best_q_value)
 
-                for neighbor in self.neighbor_table.keys():
-                    if neighbor != self.my_drone.identifier:
-                        if self.q_table[neighbor][dst_id] == best_q_value:
-                            candidate_of_max_q_list.append(neighbor)
+                    # the candidates stay in the order of the neighbor table
+                    candidate_of_max_q_list = neighbor_ids[next_hop_q_values == best_q_value].tolist()
 
                 if len(candidate_of_max_q_list) != 0:
                     best_id = self.rng_routing.choice(candidate_of_max_q_list)
@@ -1,6 +1,6 @@
-import matplotlib.pyplot as plt
 import numpy as np
-from collections import defaultdict
+from utils.bitset import Bitset
+from utils.online_statistics import RunningStatistics
 
 
 class Metrics:
@@ -20,6 +20,33 @@ class Metrics:
        calculated and finally averaged
     5. Hop count: used to record the number of router output ports through which the packet should pass.
 
+    The samples are not stored: each metric is accumulated online (mean and variance, and the 50th, 95th and 99th
+    percentiles of the delays, see "RunningStatistics"), and the data packets that have arrived are kept in a bitset.
+    Therefore, the memory does not grow with the simulated time (but for one bit per data packet), and the metrics can
+    be read at any moment of the simulation with "get_metrics_dict"
+
+    The counters are also kept per drone (the source of the data packets, the receiver of the collisions and the
+    sender of the control packets), and the functions in "delivery_listeners" are told about each delivery, so that
+    "MetricsTimeSeries" can take snapshots of them every window
+
+    Attributes:
+        simulator: the simulation platform that contains everything
+        control_packet_num: number of control packets that have been sent
+        control_packets: number of control packets sent by each drone
+        datapacket_arrived: identifiers of the data packets that have arrived at their destination
+        datapacket_generated_num: number of data packets that have been generated
+        generated: number of data packets generated by each drone
+        arrived: number of data packets generated by each drone that have arrived at their destination
+        delivery_time: statistics of the end-to-end delay of the data packets that have arrived, in us
+        throughput: statistics of the throughput of the data packets that have arrived, in bps
+        hop_cnt: statistics of the hop count of the data packets that have arrived
+        mac_delay: statistics of the MAC delay of the data packets (until the ACK is received or the packet is
+                   dropped), in ms
+        collision_num: number of packets that could not be received because of a too low SINR
+        collisions: number of packets that each drone could not receive because of a too low SINR
+        delivery_listeners: functions called with (src_id, latency, packet_length, hop_count) when a data packet
+                            arrives for the first time
+
     References:
         [1] Rani. N, Sharma. P, Sharma. P., "Performance Comparison of Various Routing Protocols in Different Mobility
             Models," in arXiv preprint arXiv:1209.5507, 2012.
@@ -31,62 +58,98 @@ class Metrics:
     def __init__(self, simulator):
         self.simulator = simulator
 
+        n_drones = simulator.n_drones
+
         self.control_packet_num = 0
+        self.control_packets = np.zeros(n_drones, dtype=np.int64)
 
-        self.datapacket_generated = set()  # all data packets generated
-        self.datapacket_arrived = set()  # all data packets that arrives the destination
+        self.datapacket_arrived = Bitset()  # all data packets that arrives the destination
         self.datapacket_generated_num = 0
+        self.generated = np.zeros(n_drones, dtype=np.int64)
+        self.arrived = np.zeros(n_drones, dtype=np.int64)
 
-        self.delivery_time = []
-        self.deliver_time_dict = defaultdict()
+        self.delivery_time = RunningStatistics()
+        self.throughput = RunningStatistics(quantiles=())
+        self.hop_cnt = RunningStatistics(quantiles=())
+        self.mac_delay = RunningStatistics()
 
-        self.throughput = []
-        self.throughput_dict = defaultdict()
+        self.collision_num = 0
+        self.collisions = np.zeros(n_drones, dtype=np.int64)
 
-        self.hop_cnt = []
-        self.hop_cnt_dict = defaultdict()
+        self.delivery_listeners = []
 
-        self.mac_delay = []
+    def record_control_packet(self, drone_id):
+        """Called when a drone sends a control packet"""
 
-        self.collision_num = 0
+        self.control_packet_num += 1
+        self.control_packets[drone_id] += 1
 
-    def print_metrics(self):
-        # calculate the average end-to-end delay
-        e2e_delay = np.mean(list(self.deliver_time_dict.values())) / 1e3
+    def record_generation(self, drone_id):
+        """Called when a drone generates a data packet"""
 
-        # calculate the packet delivery ratio
-        pdr = len(self.datapacket_arrived) / self.datapacket_generated_num * 100  # in %
+        self.datapacket_generated_num += 1
+        self.generated[drone_id] += 1
 
-        # calculate the throughput
-        throughput = np.mean(list(self.throughput_dict.values())) / 1e3
+    def record_collision(self, drone_id, n_packets):
+        """Called when a drone cannot receive "n_packets" packets because of a too low SINR"""
 
-        # calculate the hop count
-        hop_cnt = np.mean(list(self.hop_cnt_dict.values()))
+        self.collision_num += n_packets
+        self.collisions[drone_id] += n_packets
 
-        # calculate the routing load
-        rl = self.control_packet_num / len(self.datapacket_arrived)
+    def record_delivery(self, packet_id, src_id, latency, packet_length, hop_count):
+        """
+        Called when a data packet reaches its destination, only its first arrival is counted
+        :param packet_id: identifier of the data packet
+        :param src_id: identifier of the drone that generated it
+        :param latency: end-to-end delay, in us
+        :param packet_length: length of the packet that carried it, in bit
+        :param hop_count: number of hops it went through
+        :return: whether it is the first arrival of this packet
+        """
 
-        # channel access delay
-        average_mac_delay = np.mean(self.mac_delay)
+        if packet_id in self.datapacket_arrived:
+            return False
 
-        print('总共发送: ', self.datapacket_generated_num, ' 个数据包')
-        print('数据包投递率(PDR): ', pdr, '%')
-        print('平均端到端延迟(E2E): ', e2e_delay, 'ms')
-        print('路由负载(RL): ', rl)
-        print('平均吞吐量是: ', throughput, 'Kbps')
-        print('平均跳数是: ', hop_cnt)
-        print('冲突次数是: ', self.collision_num)
-        print('平均MAC层延迟: ', average_mac_delay, 'ms')
+        self.datapacket_arrived.add(packet_id)
+        self.delivery_time.add(latency)
+        self.throughput.add(packet_length / (latency / 1e6))
+        self.hop_cnt.add(hop_count)
+        self.arrived[src_id] += 1
+
+        for listener in self.delivery_listeners:
+            listener(src_id, latency, packet_length, hop_count)
+
+        return True
+
+    def print_metrics(self):
+        metrics = self.get_metrics_dict()
+
+        print('总共发送: ', metrics['generated'], ' 个数据包')
+        print('数据包投递率(PDR): ', metrics['pdr'], '%')
+        print('平均端到端延迟(E2E): ', metrics['e2e'], 'ms')
+        print('端到端延迟的P50/P95/P99: ', metrics['e2e_p50'], metrics['e2e_p95'], metrics['e2e_p99'], 'ms')
+        print('路由负载(RL): ', metrics['rl'])
+        print('平均吞吐量是: ', metrics['throughput'], 'Kbps')
+        print('平均跳数是: ', metrics['hop'])
+        print('冲突次数是: ', metrics['collision'])
+        print('平均MAC层延迟: ', metrics['mac_delay'], 'ms')
 
     def get_metrics_dict(self):
-        """返回指标字典"""
+        """返回指标字典（仿真过程中随时可以调用），没有数据包到达时，相关指标为nan"""
+        generated = self.datapacket_generated_num
+        arrived = len(self.datapacket_arrived)
+        delivery_time = self.delivery_time
+
         return {
-            'generated': self.datapacket_generated_num,
-            'pdr': len(self.datapacket_arrived) / self.datapacket_generated_num * 100,
-            'e2e': np.mean(list(self.deliver_time_dict.values())) / 1e3,
-            'rl': self.control_packet_num / len(self.datapacket_arrived),
-            'throughput': np.mean(list(self.throughput_dict.values())) / 1e3,
-            'hop': np.mean(list(self.hop_cnt_dict.values())),
+            'generated': generated,
+            'pdr': arrived / generated * 100 if generated else float('nan'),
+            'e2e': delivery_time.mean / 1e3,
+            'e2e_p50': delivery_time.quantile(0.5) / 1e3,
+            'e2e_p95': delivery_time.quantile(0.95) / 1e3,
+            'e2e_p99': delivery_time.quantile(0.99) / 1e3,
+            'rl': self.control_packet_num / arrived if arrived else float('nan'),
+            'throughput': self.throughput.mean / 1e3,
+            'hop': self.hop_cnt.mean,
             'collision': self.collision_num,
-            'mac_delay': np.mean(self.mac_delay)
-        }
\ No newline at end of file
+            'mac_delay': self.mac_delay.mean
+        }
@@ -1,15 +1,22 @@
 import random
+import simpy
 
 from phy.channel import Channel
+from phy.carrier_sense import CarrierSense
+from topology.connectivity_graph import ConnectivityGraph
+from mobility.mobility_engine import MobilityEngine
 from entities.drone import Drone
+from entities.drone_states import DroneStates
 
 from simulator.metrics import Metrics
+from simulator.time_series import MetricsTimeSeries
 # from .metrics import Metrics
 
 from mobility import start_coords
-from utils import config
+from utils import config, trace
+from utils.profiler import Profiler
+from utils.id_allocator import IdAllocator
 from allocation.central_controller import CentralController
-from visualization.scatter import scatter_plot
 
 
 class Simulator:
@@ -22,8 +29,20 @@ class Simulator:
         n_drones：仿真中无人机的数量。
         channel_states：一个字典，用于描述信道的使用情况。
         channel：无线信道，用于无人机之间的通信。
+        carrier_sense：记录正在占用信道的无人机及其空间索引，用于快速判断信道是否空闲。
+        connectivity：全网的连通图，首次使用时构建，之后随无人机的移动增量更新，供需要全局拓扑的路由协议（如OPAR）查询，并缓存其计算的路径。
+        drone_states：所有无人机的状态（位置、速度、剩余能量、休眠状态）按数组存放，无人机通过属性访问，还缓存了所有无人机两两之间的距离矩阵。
+        mobility：移动引擎，用一个进程和NumPy数组一次性更新所有无人机的位置和速度，每架无人机的移动模型仍使用自己的随机数生成器。
         metrics：Metrics类的实例，用于记录网络性能指标。
+        time_series：MetricsTimeSeries类的实例，每个时间窗口记录一次全网和每架无人机的指标快照，存放在预分配的环形缓冲区中，可保存为.npz或.parquet文件（窗口长度为0时为None）。
+        id_allocator：为本次仿真中的数据包分配标识符，不同的仿真实例互不影响。
+        rng_simulator：本次仿真自己的随机数生成器（用于异构网络中无人机的速度）。
         drones：一个列表，包含所有无人机实例。
+        routing_protocol, mac_protocol, mobility_model：安装在无人机上的路由协议、MAC协议和移动模型的名称，默认值见config。
+        traffic_rate：每架无人机平均每秒产生的数据包数量。
+        max_ttl：数据包的最大生存时间（跳数），与无人机数量有关。
+        headless：批量运行模式，不绘图、不输出到控制台，也不导入matplotlib，仿真结束后只需读取metrics。
+        profiler：性能剖析器（默认关闭，见config.PROFILE），统计每类进程调度的SimPy事件数，以及各子系统（物理层SINR、MAC、路由选择下一跳、移动等）消耗的实际时间，仿真结束时打印报告或保存为JSON文件。
     """
 
     def __init__(self,
@@ -37,17 +56,39 @@ class Simulator:
                  update_metrics_callback = None,  # 指标更新回调函数
                  axs=None,
                  master=None,
-                 gui_canvas=None):
+                 gui_canvas=None,
+                 headless=False,
+                 routing_protocol=config.ROUTING_PROTOCOL,
+                 mac_protocol=config.MAC_PROTOCOL,
+                 mobility_model=config.MOBILITY_MODEL,
+                 traffic_rate=config.TRAFFIC_RATE,
+                 profile=config.PROFILE):
 
         self.env = env
+        self.profiler = Profiler(env) if profile else None  # installed before any process is started
         self.seed = seed
         self.total_simulation_time = total_simulation_time  # total simulation time (ns)
 
         self.n_drones = n_drones  # total number of drones in the simulation
+        self.max_ttl = n_drones + 1  # maximum time-to-live value
+        self.routing_protocol = routing_protocol
+        self.mac_protocol = mac_protocol
+        self.mobility_model = mobility_model
+        self.traffic_rate = traffic_rate
         self.channel_states = channel_states
         self.channel = Channel(self.env)
+        self.carrier_sense = CarrierSense(self)
+        self.connectivity = ConnectivityGraph(self)
+        self.drone_states = DroneStates(n_drones)
+        self.mobility = MobilityEngine(self)
 
         self.metrics = Metrics(self)  # use to record the network performance
+        if config.METRICS_WINDOW:
+            self.time_series = MetricsTimeSeries(self, config.METRICS_WINDOW, config.METRICS_HISTORY)
+        else:
+            self.time_series = None
+        self.id_allocator = IdAllocator()
+        self.rng_simulator = random.Random(seed)
 
         # NOTE: if distributed optimization is adopted, remember to comment this to speed up simulation
         # self.central_controller = CentralController(self)
@@ -58,8 +99,9 @@ class Simulator:
         self.update_progress_callback = update_progress_callback
         self.update_metrics_callback = update_metrics_callback      # 指标更新回调函数
         self.master = master  # 保存主窗口引用
+        self.headless = headless  # no figures and no console output, only the metrics are collected
         # 生成无人机的初始位置。
-        start_position = start_coords.get_random_start_point_3d(seed)
+        start_position = start_coords.get_random_start_point_3d(seed, n_drones)
 
         # self.drones = []
         # for i in range(n_drones):
@@ -85,7 +127,7 @@ class Simulator:
         for i in range(n_drones):
             # 在异构网络中，不同无人机可以有不同的速度（默认不支持）
             if config.HETEROGENEOUS:
-                speed = random.randint(5, 60)
+                speed = self.rng_simulator.randint(5, 60)
             else:
                 speed = config.BASE_SPEED
 
@@ -97,7 +139,9 @@ class Simulator:
                 'speed': speed
             }
             drone_data_list.append(drone_data)
-            if not self.gui_canvas:
+            if self.headless:
+                pass
+            elif not self.gui_canvas:
                 info = (
                     f'无人机: {i}, '
                     f'初始位置: ({start_position[i][0]:.1f}, {start_position[i][1]:.1f}, {start_position[i][2]:.1f}), '
@@ -114,22 +158,26 @@ class Simulator:
             self.drones.append(drone)
 
 
-        # 1图pic
-        if gui_canvas:
-            scatter_plot(
-                self,
-                gui_canvas=self.gui_canvas,
-                interactive=False,  # 主界面使用非交互模式
-                target_ax=axs[0]  # 传递目标子图
-            )
-        else:
-            scatter_plot(
-                self,
-                gui_canvas=self.gui_canvas,
-                target_ax=0)
+        if not self.headless:
+            # matplotlib is only imported when the figures are needed
+            from visualization.scatter import scatter_plot
 
-        self.env.process(self.show_performance())
-        self.env.process(self.show_time())
+            # 1图pic
+            if gui_canvas:
+                scatter_plot(
+                    self,
+                    gui_canvas=self.gui_canvas,
+                    interactive=False,  # 主界面使用非交互模式
+                    target_ax=axs[0]  # 传递目标子图
+                )
+            else:
+                scatter_plot(
+                    self,
+                    gui_canvas=self.gui_canvas,
+                    target_ax=0)
+
+            self.env.process(self.show_performance())
+            self.env.process(self.show_time())
 
     def show_time(self):
         total_simulation_time_s = self.total_simulation_time/1e6
@@ -142,7 +190,13 @@ class Simulator:
             yield self.env.timeout(0.5*1e6)
 
     def show_performance(self):
+        from visualization.scatter import scatter_plot
+
         yield self.env.timeout(self.total_simulation_time - 1)
+        trace.flush()  # the trace file is complete once the simulation is over
+        if self.time_series is not None and config.METRICS_FILE:
+            self.time_series.snapshot()  # the last window, which is not complete
+            self.time_series.save(config.METRICS_FILE)
 
         # 3图pic
         progress_msg = '仿真结束'
@@ -174,4 +228,39 @@ class Simulator:
             self.master.gui_instance.master.after(0, self.master.gui_instance.init_metrics_table())
             self.update_metrics_callback(metrics_data)
         else:
-            self.metrics.print_metrics()
\ No newline at end of file
+            self.metrics.print_metrics()
+
+        if self.profiler is not None:
+            self.profiler.print_report()
+            if config.PROFILE_FILE:
+                self.profiler.save(config.PROFILE_FILE)
+
+
+def run_headless(seed, n_drones, total_simulation_time=config.SIM_TIME, env=None, trace_level=None, **options):
+    """
+    Batch-run mode: build a headless simulator, run it until the end and return its metrics
+    :param seed: random seed of the simulation
+    :param n_drones: number of drones
+    :param total_simulation_time: simulated time, in us
+    :param env: simulation environment, a new "simpy.Environment" is created if it is not given
+    :param trace_level: level of the trace during the run, "config.HEADLESS_LOGGING_LEVEL" (no trace) by default,
+                        e.g., logging.INFO to trace it to "config.TRACE_FILE"
+    :param options: other keyword arguments of "Simulator", e.g., "routing_protocol", "traffic_rate"
+    :return: the "Metrics" of the simulation, its time series are in "metrics.simulator.time_series"
+    """
+
+    if env is None:
+        env = simpy.Environment()
+    if trace_level is None:
+        trace_level = config.HEADLESS_LOGGING_LEVEL
+
+    with trace.level(trace_level):
+        channel_states = {i: simpy.Resource(env, capacity=1) for i in range(n_drones)}
+        sim = Simulator(seed=seed, env=env, channel_states=channel_states, n_drones=n_drones,
+                        total_simulation_time=total_simulation_time, headless=True, **options)
+        env.run(until=total_simulation_time)
+
+    if sim.time_series is not None:
+        sim.time_series.snapshot()  # the last window, if the simulated time is not a multiple of the window
+
+    return sim.metrics
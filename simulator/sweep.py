@@ -0,0 +1,150 @@
+import os
+import math
+import logging
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from utils import config, trace
+from simulator.simulator import run_headless
+
+
+# two-sided 95% quantiles of Student's t-distribution, indexed by the degrees of freedom
+T_QUANTILE_95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262,
+                 10: 2.228, 11: 2.201, 12: 2.179, 13: 2.160, 14: 2.145, 15: 2.131, 16: 2.120, 17: 2.110, 18: 2.101,
+                 19: 2.093, 20: 2.086, 21: 2.080, 22: 2.074, 23: 2.069, 24: 2.064, 25: 2.060, 26: 2.056, 27: 2.052,
+                 28: 2.048, 29: 2.045, 30: 2.042}
+
+# the fields of a case that identify a configuration, i.e., everything but the seed
+CONFIGURATION_FIELDS = ('n_drones', 'routing_protocol', 'mac_protocol', 'mobility_model', 'traffic_rate')
+
+
+def make_grid(seeds,
+              n_drones=(config.NUMBER_OF_DRONES,),
+              routing_protocols=(config.ROUTING_PROTOCOL,),
+              mac_protocols=(config.MAC_PROTOCOL,),
+              mobility_models=(config.MOBILITY_MODEL,),
+              traffic_rates=(config.TRAFFIC_RATE,)):
+    """
+    Cartesian product of all the parameters, each element is a case (dict) that can be run by "run_case"
+    """
+
+    grid = []
+    for combination in itertools.product(n_drones, routing_protocols, mac_protocols, mobility_models, traffic_rates,
+                                         seeds):
+        case = dict(zip(CONFIGURATION_FIELDS, combination[:-1]))
+        case['seed'] = combination[-1]
+        grid.append(case)
+
+    return grid
+
+
+def trace_filename(case):
+    """Trace file of a case, named after "config.TRACE_FILE" and the case, e.g., "running_log-15-Dsdv-...-seed1.log" """
+
+    root, extension = os.path.splitext(config.TRACE_FILE)
+    fields = '-'.join(str(case[field]) for field in CONFIGURATION_FIELDS)
+
+    return '%s-%s-seed%s%s' % (root, fields, case['seed'], extension)
+
+
+def run_case(case, total_simulation_time=config.SIM_TIME, trace_level=None):
+    """
+    Worker of the sweep, it builds its own environment and simulator, and only the metrics are sent back
+    :param case: a dict with the keys in "CONFIGURATION_FIELDS" and "seed"
+    :param total_simulation_time: simulated time of each case, in us
+    :param trace_level: level of the trace, no trace by default (see "run_headless"). A traced case has its own trace
+                        file (see "trace_filename"), so that the workers do not overwrite each other's
+    :return: the case and its metrics (see "Metrics.get_metrics_dict")
+    """
+
+    options = {key: value for key, value in case.items() if key not in ('seed', 'n_drones')}
+
+    if trace_level is None or trace_level > logging.INFO:
+        metrics = run_headless(case['seed'], case['n_drones'], total_simulation_time, **options)
+    else:
+        former_filename = trace.tracer.filename
+        trace.tracer.configure(filename=trace_filename(case))
+        try:
+            metrics = run_headless(case['seed'], case['n_drones'], total_simulation_time, trace_level=trace_level,
+                                   **options)
+        finally:
+            trace.tracer.configure(filename=former_filename)  # the trace file of the case is complete
+
+    return case, metrics.get_metrics_dict()
+
+
+def run_sweep(grid, total_simulation_time=config.SIM_TIME, max_workers=None, trace_level=None):
+    """
+    Run all the cases of the grid in parallel, one process per core by default
+
+    :param grid: list of cases, see "make_grid"
+    :param total_simulation_time: simulated time of each case, in us
+    :param max_workers: number of worker processes, "None" means the number of cores
+    :param trace_level: level of the trace of each case, no trace by default, see "run_case"
+    :return: list of (case, metrics dict), in the order of the grid
+    """
+
+    trace.flush()  # the forked workers must not write the pending records of this process again
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run_case, grid, itertools.repeat(total_simulation_time),
+                                 itertools.repeat(trace_level)))
+
+
+def confidence_interval(samples):
+    """
+    Mean and the half-width of the 95% confidence interval (Student's t), nan values are ignored
+    """
+
+    samples = [x for x in samples if not math.isnan(x)]
+    n = len(samples)
+
+    if n == 0:
+        return float('nan'), float('nan')
+    if n == 1:
+        return samples[0], float('nan')
+
+    t = T_QUANTILE_95.get(n - 1, 1.960)
+    return float(np.mean(samples)), t * float(np.std(samples, ddof=1)) / math.sqrt(n)
+
+
+def summarize(results):
+    """
+    Aggregate the results of all the seeds of each configuration
+    :param results: list of (case, metrics dict), see "run_sweep"
+    :return: list of rows, each row is a dict with the configuration, the number of runs and (mean, half-width) of
+             each metric
+    """
+
+    groups = {}
+    for case, metrics in results:
+        key = tuple(case[field] for field in CONFIGURATION_FIELDS)
+        groups.setdefault(key, []).append(metrics)
+
+    table = []
+    for key, metrics_list in groups.items():
+        row = dict(zip(CONFIGURATION_FIELDS, key))
+        row['runs'] = len(metrics_list)
+        for name in metrics_list[0].keys():
+            row[name] = confidence_interval([float(metrics[name]) for metrics in metrics_list])
+        table.append(row)
+
+    return table
+
+
+def print_table(table):
+    if not table:
+        return
+
+    metric_names = [name for name in table[0].keys() if name not in CONFIGURATION_FIELDS and name != 'runs']
+
+    header = ['drones', 'routing', 'mac', 'mobility', 'rate', 'runs'] + metric_names
+    lines = []
+    for row in table:
+        line = [str(row[field]) for field in CONFIGURATION_FIELDS] + [str(row['runs'])]
+        line += ['%.2f ± %.2f' % row[name] for name in metric_names]
+        lines.append(line)
+
+    widths = [max(len(line[i]) for line in [header] + lines) for i in range(len(header))]
+    for line in [header] + lines:
+        print('  '.join(cell.rjust(width) for cell, width in zip(line, widths)))
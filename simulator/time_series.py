@@ -0,0 +1,234 @@
+import warnings
+import numpy as np
+from utils import config
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+# name of the columns, network-wide (one value per snapshot) and per drone (one value per drone and per snapshot)
+NETWORK_COLUMNS = ('time', 'generated', 'arrived', 'pdr', 'e2e', 'e2e_p50', 'e2e_p95', 'e2e_p99', 'throughput', 'hop',
+                   'collision', 'control', 'rl')
+DRONE_COLUMNS = ('generated', 'arrived', 'pdr', 'e2e', 'e2e_p50', 'e2e_p95', 'e2e_p99', 'throughput', 'collision',
+                 'control')
+
+
+def _group_percentiles(groups, values, n_groups, ps):
+    """
+    Percentiles of the values of each group (linear interpolation between the closest ranks, as "np.percentile")
+    :param groups: group of each value, between 0 and n_groups - 1
+    :param values: the values
+    :param n_groups: number of groups
+    :param ps: the percentiles, between 0 and 1
+    :return: array of shape (len(ps), n_groups), nan for the groups without any value
+    """
+
+    result = np.full((len(ps), n_groups), np.nan)
+    if not len(values):
+        return result
+
+    order = np.lexsort((values, groups))  # by group, then by value
+    sorted_values = values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    present = counts > 0
+    counts, starts = counts[present], starts[present]
+
+    for i, p in enumerate(ps):
+        rank = p * (counts - 1)
+        low = rank.astype(np.int64)
+        high = np.minimum(low + 1, counts - 1)
+        low_values = sorted_values[starts + low]
+        result[i, present] = low_values + (sorted_values[starts + high] - low_values) * (rank - low)
+
+    return result
+
+
+class MetricsTimeSeries:
+    """
+    Time series of the metrics, to find the transient phenomena (e.g., congestion) that the totals of "Metrics" hide
+
+    A process takes a snapshot every "window": the data packets generated and delivered during the window, the packet
+    delivery ratio, the end-to-end delay (mean and percentiles), the throughput, the collisions and the control packets,
+    network-wide and per drone. The data packets and the delays are those of the source, the collisions those of the
+    receiver and the control packets those of the sender. Since the packets that arrive during a window may have been
+    generated during the former ones, the PDR of a window can exceed 100% when a backlog is cleared
+
+    The snapshots are written in preallocated arrays, used as a ring buffer: once "capacity" snapshots have been taken,
+    each snapshot overwrites the oldest one. The delays of the current window are the only samples that are kept, and
+    the series can be saved as a columnar file (.npz, or .parquet if pyarrow is installed)
+
+    Attributes:
+        simulator: the simulation platform that contains everything
+        window: time between two snapshots, in us
+        capacity: number of snapshots that are kept
+        count: number of snapshots taken so far
+        network: network-wide columns, name -> array of shape (capacity,), see "NETWORK_COLUMNS"
+        drones: per-drone columns, name -> array of shape (capacity, n_drones), see "DRONE_COLUMNS"
+        last_time: time of the last snapshot, in us
+        last_counters: cumulative counters of "Metrics" at the last snapshot
+        sources, latencies, bits, hops: the data packets delivered since the last snapshot
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/14
+    Updated at: 2025/5/14
+    """
+
+    def __init__(self, simulator, window=config.METRICS_WINDOW, capacity=config.METRICS_HISTORY):
+        self.simulator = simulator
+        self.window = window
+        self.capacity = capacity
+        self.count = 0
+
+        n_drones = simulator.n_drones
+        self.network = {name: np.full(capacity, np.nan) for name in NETWORK_COLUMNS}
+        self.drones = {name: np.full((capacity, n_drones), np.nan, dtype=np.float32) for name in DRONE_COLUMNS}
+
+        self.last_time = simulator.env.now
+        self.last_counters = self._counters()
+
+        self.sources = []
+        self.latencies = []
+        self.bits = []
+        self.hops = []
+
+        simulator.metrics.delivery_listeners.append(self.record_delivery)
+        simulator.env.process(self.take_snapshots())
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def _counters(self):
+        metrics = self.simulator.metrics
+        return {'generated': metrics.generated.copy(), 'arrived': metrics.arrived.copy(),
+                'collision': metrics.collisions.copy(), 'control': metrics.control_packets.copy()}
+
+    def record_delivery(self, src_id, latency, packet_length, hop_count):
+        self.sources.append(src_id)
+        self.latencies.append(latency)
+        self.bits.append(packet_length)
+        self.hops.append(hop_count)
+
+    def take_snapshots(self):
+        while True:
+            yield self.simulator.env.timeout(self.window)
+            self.snapshot()
+
+    def snapshot(self):
+        """Record the metrics of the window since the last snapshot, nothing is recorded if no time has elapsed"""
+
+        now = self.simulator.env.now
+        duration = (now - self.last_time) / 1e6  # in s
+        if duration <= 0:
+            return
+
+        n_drones = self.simulator.n_drones
+        counters = self._counters()
+        deltas = {name: counters[name] - self.last_counters[name] for name in counters}
+
+        sources = np.array(self.sources, dtype=np.intp)
+        latencies = np.array(self.latencies, dtype=np.float64) / 1e3  # in ms
+        arrived = deltas['arrived']
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drone_values = {
+                'generated': deltas['generated'],
+                'arrived': arrived,
+                'pdr': np.where(deltas['generated'] > 0, arrived / deltas['generated'] * 100, np.nan),
+                'e2e': np.where(arrived > 0, np.bincount(sources, latencies, n_drones) / arrived, np.nan),
+                'throughput': np.bincount(sources, np.array(self.bits, dtype=np.float64), n_drones) / duration / 1e3,
+                'collision': deltas['collision'],
+                'control': deltas['control']
+            }
+        drone_percentiles = _group_percentiles(sources, latencies, n_drones, PERCENTILES)
+        for name, values in zip(('e2e_p50', 'e2e_p95', 'e2e_p99'), drone_percentiles):
+            drone_values[name] = values
+
+        generated, n_arrived, control = int(deltas['generated'].sum()), int(arrived.sum()), int(deltas['control'].sum())
+        if n_arrived:
+            percentiles = np.percentile(latencies, [p * 100 for p in PERCENTILES])
+        else:
+            percentiles = [np.nan] * len(PERCENTILES)
+
+        network_values = {
+            'time': now / 1e6,
+            'generated': generated,
+            'arrived': n_arrived,
+            'pdr': n_arrived / generated * 100 if generated else np.nan,
+            'e2e': latencies.mean() if n_arrived else np.nan,
+            'e2e_p50': percentiles[0],
+            'e2e_p95': percentiles[1],
+            'e2e_p99': percentiles[2],
+            'throughput': sum(self.bits) / duration / 1e3,
+            'hop': np.mean(self.hops) if n_arrived else np.nan,
+            'collision': int(deltas['collision'].sum()),
+            'control': control,
+            'rl': control / n_arrived if n_arrived else np.nan
+        }
+
+        row = self.count % self.capacity
+        for name, value in network_values.items():
+            self.network[name][row] = value
+        for name, values in drone_values.items():
+            self.drones[name][row] = values
+        self.count += 1
+
+        self.last_time = now
+        self.last_counters = counters
+        self.sources.clear()
+        self.latencies.clear()
+        self.bits.clear()
+        self.hops.clear()
+
+    def _chronological(self, array):
+        if self.count <= self.capacity:
+            return array[:self.count]
+
+        oldest = self.count % self.capacity
+        return np.concatenate((array[oldest:], array[:oldest]))
+
+    def columns(self):
+        """
+        The snapshots that are kept, oldest first
+        :return: dictionary, the network-wide columns by their name (e.g., "pdr") and the per-drone ones prefixed
+                 with "drone_" (e.g., "drone_pdr", of shape (snapshots, n_drones))
+        """
+
+        columns = {name: self._chronological(array) for name, array in self.network.items()}
+        for name, array in self.drones.items():
+            columns['drone_' + name] = self._chronological(array)
+
+        return columns
+
+    def save(self, filename):
+        """
+        Save the snapshots as a columnar file: NumPy ".npz" (compressed), or Parquet if the name ends with ".parquet",
+        in which case pyarrow is needed and each per-drone column is a list of n_drones values per snapshot. Without
+        pyarrow, a warning is issued and a ".npz" file is written next to the requested one instead
+        :return: name of the file that was written
+        """
+
+        columns = self.columns()
+
+        if filename.endswith('.parquet'):
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                fallback = filename[:-len('.parquet')] + '.npz'
+                warnings.warn('pyarrow is not installed, the metrics time series are written to %s instead of %s' %
+                              (fallback, filename))
+                return self.save(fallback)
+
+            arrays = {}
+            for name, values in columns.items():
+                if values.ndim == 1:
+                    arrays[name] = pa.array(values)
+                else:
+                    arrays[name] = pa.FixedSizeListArray.from_arrays(pa.array(values.ravel()), values.shape[1])
+
+            table = pa.table(arrays)
+            table = table.replace_schema_metadata({'window': str(self.window)})
+            pq.write_table(table, filename)
+        else:
+            np.savez_compressed(filename, window=self.window, **columns)
+
+        return filename
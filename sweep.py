@@ -0,0 +1,23 @@
+import time
+from utils import config
+from simulator.sweep import make_grid, run_sweep, summarize, print_table
+
+
+"""
+Parameter sweep: every combination of the parameters below is simulated with several seeds in parallel (headless, one
+process per core), and the mean and 95% confidence interval of each metric over the seeds is printed
+"""
+
+if __name__ == "__main__":
+    grid = make_grid(seeds=range(2025, 2030),
+                     n_drones=[config.NUMBER_OF_DRONES],
+                     routing_protocols=['Dsdv', 'Greedy'],
+                     mac_protocols=['CsmaCa'],
+                     mobility_models=['GaussMarkov3D'],
+                     traffic_rates=[config.TRAFFIC_RATE])
+
+    start = time.perf_counter()
+    results = run_sweep(grid, total_simulation_time=config.SIM_TIME)
+    print('%d runs in %.1f s' % (len(results), time.perf_counter() - start))
+
+    print_table(summarize(results))
@@ -0,0 +1,66 @@
+"""
+Unit tests of "Bitset", against a python set
+
+Usage (from the root of the repository):
+    python -m pytest test/test_bitset.py
+"""
+
+import random
+from utils.bitset import Bitset
+
+
+def test_empty():
+    bitset = Bitset()
+
+    assert len(bitset) == 0
+    assert list(bitset) == []
+    assert 0 not in bitset and 1000 not in bitset
+
+
+def test_add_and_contains():
+    bitset = Bitset()
+    for element in (0, 7, 8, 9, 63, 64):
+        bitset.add(element)
+
+    assert all(element in bitset for element in (0, 7, 8, 9, 63, 64))
+    assert all(element not in bitset for element in (1, 6, 10, 62, 65, 10 ** 6))
+    assert len(bitset) == 6
+
+
+def test_duplicates_are_counted_once():
+    bitset = Bitset()
+    for _ in range(3):
+        bitset.add(5)
+        bitset.add(12345)
+
+    assert len(bitset) == 2
+    assert list(bitset) == [5, 12345]
+
+
+def test_growth():
+    bitset = Bitset()
+    bitset.add(3)
+    assert len(bitset.bits) == 1
+
+    bitset.add(80)  # byte 10: at least doubles, enough for the new element
+    assert len(bitset.bits) >= 11
+    size = len(bitset.bits)
+
+    bitset.add(8 * size)  # the byte right after the array
+    assert len(bitset.bits) >= 2 * size
+
+    assert list(bitset) == [3, 80, 8 * size]
+
+
+def test_iteration_is_in_ascending_order():
+    rng = random.Random(11)
+    bitset = Bitset()
+    reference = set()
+    for _ in range(20000):
+        element = rng.randrange(100000)
+        bitset.add(element)
+        reference.add(element)
+
+    assert len(bitset) == len(reference) == bitset.count
+    assert list(bitset) == sorted(reference)
+    assert all((element in bitset) == (element in reference) for element in range(0, 100000, 7))
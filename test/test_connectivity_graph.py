@@ -0,0 +1,74 @@
+"""
+Unit tests of the link listeners of "ConnectivityGraph": when the mobility engine publishes a step, they are called
+once, after every drone has been updated
+
+Usage (from the root of the repository):
+    python -m pytest test/test_connectivity_graph.py
+"""
+
+from types import SimpleNamespace
+from topology.connectivity_graph import ConnectivityGraph
+
+
+def build_graph(coords):
+    simulator = SimpleNamespace(drones=[])
+    simulator.drones = [SimpleNamespace(identifier=i, coords=c) for i, c in enumerate(coords)]
+    graph = ConnectivityGraph(simulator)
+    graph.build()
+
+    return graph
+
+
+def far(graph):
+    return 3 * graph.comm_range
+
+
+def test_listeners_are_called_when_a_single_drone_moves():
+    graph = build_graph([(0, 0, 0), (0, 0, 0)])
+    graph.simulator.drones[1].coords = (far(graph), 0, 0)
+    graph.update_position(graph.simulator.drones[1])
+
+    calls = []
+    graph.link_listeners.append(lambda: calls.append(1))
+    graph.simulator.drones[1].coords = (1, 0, 0)
+    graph.update_position(graph.simulator.drones[1])
+
+    assert calls == [1]
+    assert graph.get_neighbors(0) == {1}
+
+
+def test_listeners_are_deferred_until_the_whole_batch_is_published():
+    graph = build_graph([(0, 0, 0), (0, 0, 0), (0, 0, 0)])
+    d = far(graph)
+    drones = graph.simulator.drones
+    for drone, coords in zip(drones, [(0, 0, 0), (d, 0, 0), (2 * d, 0, 0)]):
+        drone.coords = coords
+        graph.update_position(drone)
+
+    seen = []
+    graph.link_listeners.append(lambda: seen.append([set(graph.get_neighbors(i)) for i in range(3)]))
+
+    # all the drones gather, the first one to be updated already gets new links
+    graph.begin_batch()
+    for drone, coords in zip(drones, [(1, 0, 0), (2, 0, 0), (3, 0, 0)]):
+        drone.coords = coords
+        graph.update_position(drone)
+        assert seen == []
+    graph.end_batch()
+
+    assert seen == [[{1, 2}, {0, 2}, {0, 1}]]
+
+
+def test_a_batch_without_new_links_calls_no_listener():
+    graph = build_graph([(0, 0, 0), (1, 0, 0)])
+    calls = []
+    graph.link_listeners.append(lambda: calls.append(1))
+
+    graph.begin_batch()
+    for drone in graph.simulator.drones:
+        drone.coords = (drone.coords[0] + 1, 0, 0)
+        graph.update_position(drone)
+    graph.end_batch()
+
+    assert calls == []
+    assert not graph.batching and not graph.links_added
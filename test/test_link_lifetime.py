@@ -0,0 +1,87 @@
+"""
+Unit tests of "link_lifetime_matrix", the vectorized version of "link_lifetime_predictor"
+
+Usage (from the root of the repository):
+    python -m pytest test/test_link_lifetime.py
+"""
+
+import math
+import random
+import numpy as np
+from types import SimpleNamespace
+from routing.opar.opar import link_lifetime_predictor, link_lifetime_matrix
+
+MAX_COMM_RANGE = 100.0
+
+
+def drone(coords, velocity):
+    return SimpleNamespace(coords=list(coords), velocity=list(velocity))
+
+
+def matrix_of(*drones):
+    return link_lifetime_matrix([d.coords for d in drones], [d.velocity for d in drones], MAX_COMM_RANGE)
+
+
+def test_random_pairs_match_the_scalar_predictor():
+    rng = random.Random(7)
+    drones = [drone([rng.uniform(0, 300), rng.uniform(0, 300), rng.uniform(0, 100)],
+                    [rng.uniform(-10, 10) for _ in range(3)]) for _ in range(60)]
+    matrix = matrix_of(*drones)
+
+    assert np.array_equal(matrix, matrix.T)
+
+    compared = 0
+    for i in range(len(drones)):
+        for j in range(i + 1, len(drones)):
+            try:
+                expected = link_lifetime_predictor(drones[i], drones[j], MAX_COMM_RANGE)
+            except ValueError:  # negative discriminant: the drones never get within range
+                assert matrix[i, j] == 0
+                continue
+
+            assert math.isclose(matrix[i, j], expected, rel_tol=1e-9, abs_tol=1e-9), (i, j)
+            compared += 1
+
+    assert compared > 100
+
+
+def test_same_velocity_within_range_is_infinite():
+    matrix = matrix_of(drone([0, 0, 0], [3, -2, 1]), drone([50, 0, 0], [3, -2, 1]))
+
+    assert matrix[0, 1] == matrix[1, 0] == math.inf
+
+
+def test_diagonal_is_infinite():
+    matrix = matrix_of(drone([0, 0, 0], [1, 0, 0]), drone([10, 0, 0], [0, 1, 0]))
+
+    assert np.all(np.diag(matrix) == math.inf)
+
+
+def test_same_velocity_out_of_range_is_zero():
+    # A == 0 and C >= 0: the distance never changes and it is not below the range, including exactly at the range
+    matrix = matrix_of(drone([0, 0, 0], [5, 5, 0]), drone([200, 0, 0], [5, 5, 0]),
+                       drone([0, MAX_COMM_RANGE, 0], [5, 5, 0]))
+
+    assert matrix[0, 1] == matrix[1, 0] == 0
+    assert matrix[0, 2] == 0
+
+
+def test_never_within_range_is_zero():
+    # the closest approach is at 150 m: the discriminant is negative, the NaN becomes 0
+    first, second = drone([-500, 0, 0], [10, 0, 0]), drone([500, 150, 0], [-10, 0, 0])
+    matrix = matrix_of(first, second)
+
+    assert matrix[0, 1] == 0
+    try:
+        link_lifetime_predictor(first, second, MAX_COMM_RANGE)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('the scalar predictor should not be defined for this pair')
+
+
+def test_approaching_drones_within_range():
+    # 50 m apart on the x-axis, closing at 20 m/s and then separating: the link breaks at x = -100, i.e., after 7.5 s
+    matrix = matrix_of(drone([0, 0, 0], [-10, 0, 0]), drone([-50, 0, 0], [10, 0, 0]))
+
+    assert math.isclose(matrix[0, 1], 7.5)
@@ -0,0 +1,101 @@
+"""
+Unit tests of the online statistics of the metrics, against NumPy
+
+Usage (from the root of the repository):
+    python -m pytest test/test_online_statistics.py
+"""
+
+import math
+import numpy as np
+import pytest
+from utils.online_statistics import P2Quantiles, RunningStatistics
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+def running_statistics(samples, quantiles=PERCENTILES):
+    statistics = RunningStatistics(quantiles)
+    for x in samples:
+        statistics.add(x)
+
+    return statistics
+
+
+def test_empty():
+    statistics = RunningStatistics()
+
+    assert len(statistics) == 0
+    assert math.isnan(statistics.mean)
+    assert math.isnan(statistics.variance())
+    assert all(math.isnan(statistics.quantile(p)) for p in PERCENTILES)
+
+
+def test_single_sample():
+    statistics = running_statistics([42.0])
+
+    assert statistics.mean == statistics.minimum == statistics.maximum == 42.0
+    assert math.isnan(statistics.variance())
+    assert all(statistics.quantile(p) == 42.0 for p in PERCENTILES)
+
+
+@pytest.mark.parametrize('offset', [0.0, 1e9])  # a large mean compared to the standard deviation
+def test_welford_mean_and_variance(offset):
+    samples = offset + np.random.default_rng(1).normal(0, 3, 10000)
+    statistics = running_statistics(samples.tolist(), quantiles=())
+
+    assert statistics.count == len(samples)
+    assert math.isclose(statistics.mean, np.mean(samples), rel_tol=1e-12)
+    assert math.isclose(statistics.variance(), np.var(samples, ddof=1), rel_tol=1e-6)
+    assert math.isclose(statistics.std(), np.std(samples, ddof=1), rel_tol=1e-6)
+    assert statistics.minimum == samples.min() and statistics.maximum == samples.max()
+    assert statistics.quantiles is None
+
+
+@pytest.mark.parametrize('n_samples', [1, 2, 10, 999])
+def test_quantiles_are_exact_below_the_exact_window(n_samples):
+    samples = np.random.default_rng(n_samples).exponential(20.0, n_samples)
+    statistics = running_statistics(samples.tolist())
+
+    assert statistics.quantiles.samples is not None  # the markers are not used yet
+    for p in PERCENTILES:
+        assert math.isclose(statistics.quantile(p), np.percentile(samples, p * 100), rel_tol=1e-12)
+
+
+@pytest.mark.parametrize('distribution', ['exponential', 'lognormal', 'uniform', 'normal'])
+def test_quantiles_are_estimated_beyond_the_exact_window(distribution):
+    rng = np.random.default_rng(3)
+    samples = {'exponential': lambda: rng.exponential(20.0, 50000),
+               'lognormal': lambda: rng.lognormal(3, 1, 50000),
+               'uniform': lambda: rng.uniform(100, 200, 50000),
+               'normal': lambda: rng.normal(1000, 50, 50000)}[distribution]()
+    statistics = running_statistics(samples.tolist())
+
+    assert statistics.quantiles.samples is None  # the markers are used
+    estimates = [statistics.quantile(p) for p in PERCENTILES]
+    assert estimates == sorted(estimates)
+    for estimate, p in zip(estimates, PERCENTILES):
+        exact = np.percentile(samples, p * 100)
+        assert abs(estimate - exact) / exact < 0.02, (p, estimate, exact)
+
+
+def test_markers_start_at_the_exact_quantiles():
+    samples = np.random.default_rng(5).uniform(0, 1, 1000)
+    quantiles = P2Quantiles(PERCENTILES)
+    for x in samples[:-1]:
+        quantiles.add(x)
+    before = [quantiles.value(p) for p in PERCENTILES]
+
+    quantiles.add(samples[-1])  # the exact window is full, the markers take over
+
+    assert quantiles.samples is None and quantiles.count == 1000
+    for value, p in zip(before, PERCENTILES):
+        assert abs(quantiles.value(p) - value) < 0.01
+    assert quantiles.heights == sorted(quantiles.heights)
+    assert quantiles.heights[0] == samples.min() and quantiles.heights[-1] == samples.max()
+
+
+def test_unknown_quantile():
+    statistics = running_statistics(range(2000))
+
+    with pytest.raises(ValueError):
+        statistics.quantile(0.75)
@@ -0,0 +1,61 @@
+"""
+Unit tests of the SINR calculation: the batched kernel, the matrix mode and the dispatch of "sinr_calculator" must give
+the same SINR as the scalar path, on both sides of "config.SINR_BATCH_SIZE"
+
+Usage (from the root of the repository):
+    python -m pytest test/test_sinr.py
+"""
+
+import numpy as np
+import pytest
+from benchmark.bench_sinr import build_scenario
+from phy.large_scale_fading import sinr_calculator, batched_sinr_calculator, scalar_sinr_calculator, sinr_matrix
+from utils import config
+
+SCENARIOS = [(15, 4), (50, 10), (200, 50)]
+
+
+@pytest.mark.parametrize('n_drones, n_transmitters', SCENARIOS)
+@pytest.mark.parametrize('n_main', [1, 3])
+def test_single_receiver_matches_the_scalar_path(n_drones, n_transmitters, n_main):
+    simulator, transmitting_list = build_scenario(n_drones, n_transmitters)
+    main_list = transmitting_list[:n_main]
+
+    for receiver in simulator.drones:
+        expected = scalar_sinr_calculator(receiver, main_list, transmitting_list)
+
+        assert len(expected) == n_main
+        assert np.allclose(batched_sinr_calculator(receiver, main_list, transmitting_list), expected,
+                           rtol=1e-9, atol=1e-9)
+        assert np.allclose(sinr_calculator(receiver, main_list, transmitting_list), expected, rtol=1e-9, atol=1e-9)
+
+
+def test_both_sides_of_the_batch_size_are_covered():
+    sizes = [n_main * n_transmitters for _, n_transmitters in SCENARIOS for n_main in (1, 3)]
+
+    assert min(sizes) < config.SINR_BATCH_SIZE <= max(sizes)
+
+
+def test_a_lone_transmitter_only_faces_the_noise():
+    simulator, transmitting_list = build_scenario(15, 1)
+    receiver = simulator.drones[0]
+
+    assert np.allclose(batched_sinr_calculator(receiver, transmitting_list, transmitting_list),
+                       scalar_sinr_calculator(receiver, transmitting_list, transmitting_list), rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize('n_drones, n_transmitters', SCENARIOS)
+def test_matrix_mode_matches_the_scalar_path(n_drones, n_transmitters):
+    simulator, transmitting_list = build_scenario(n_drones, n_transmitters)
+    receivers = simulator.drones
+    channel_overlap = receivers[0].channel_assigner.adjacent_channel_interference_matrix
+
+    receiver_coords = np.array([drone.coords for drone in receivers], dtype=float)
+    transmitter_ids = np.array([x[0] for x in transmitting_list])
+    transmitter_coords = np.array([simulator.drones[i].coords for i in transmitter_ids], dtype=float)
+    transmitter_channels = np.array([x[1] for x in transmitting_list])
+
+    result = sinr_matrix(receiver_coords, transmitter_coords, transmitter_ids, transmitter_channels, channel_overlap)
+    expected = np.array([scalar_sinr_calculator(drone, transmitting_list, transmitting_list) for drone in receivers])
+
+    assert np.allclose(result, expected, rtol=1e-9, atol=1e-9)
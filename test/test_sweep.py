@@ -0,0 +1,51 @@
+"""
+Unit tests of the sweep: the cases run in parallel share nothing, not even the trace file
+
+Usage (from the root of the repository):
+    python -m pytest test/test_sweep.py
+"""
+
+import os
+import logging
+from simulator.sweep import make_grid, run_case, run_sweep, trace_filename
+from utils.trace import tracer
+
+SIM_TIME = 0.3e6
+
+
+def count_lines(filename):
+    with open(filename) as f:
+        return sum(1 for _ in f)
+
+
+def test_parallel_cases_keep_their_own_trace(tmp_path, monkeypatch):
+    grid = make_grid(seeds=[1, 2], n_drones=[5])
+    tracer.close()  # the trace file of the former runs, if any, is not in "tmp_path"
+
+    # each case alone
+    alone = tmp_path / 'alone'
+    alone.mkdir()
+    monkeypatch.chdir(alone)
+    expected = [run_case(case, SIM_TIME, trace_level=logging.INFO) for case in grid]
+    lines = {trace_filename(case): count_lines(trace_filename(case)) for case in grid}
+
+    # both cases at the same time
+    parallel = tmp_path / 'parallel'
+    parallel.mkdir()
+    monkeypatch.chdir(parallel)
+    results = run_sweep(grid, SIM_TIME, max_workers=2, trace_level=logging.INFO)
+
+    assert [repr(metrics) for _, metrics in results] == [repr(metrics) for _, metrics in expected]
+    assert sorted(os.listdir(parallel)) == sorted(lines)
+    for filename, n_lines in lines.items():
+        assert n_lines > 0
+        assert count_lines(filename) == n_lines, filename
+
+
+def test_cases_are_not_traced_by_default(tmp_path, monkeypatch):
+    tracer.close()
+    monkeypatch.chdir(tmp_path)
+
+    run_sweep(make_grid(seeds=[1, 2], n_drones=[5]), SIM_TIME, max_workers=2)
+
+    assert os.listdir(tmp_path) == []
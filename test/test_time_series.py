@@ -0,0 +1,40 @@
+"""
+Unit tests of the files of "MetricsTimeSeries": without pyarrow, a ".parquet" file falls back to ".npz"
+
+Usage (from the root of the repository):
+    python -m pytest test/test_time_series.py
+"""
+
+import os
+import sys
+import numpy as np
+import pytest
+from benchmark.common import run_scenario
+
+
+@pytest.fixture(scope='module')
+def time_series():
+    sim, _, _ = run_scenario(5, sim_time=0.3e6)
+    return sim.time_series
+
+
+def test_npz_file_has_the_same_columns(time_series, tmp_path):
+    filename = str(tmp_path / 'metrics.npz')
+    assert time_series.save(filename) == filename
+
+    with np.load(filename) as loaded:
+        for name, values in time_series.columns().items():
+            assert np.array_equal(loaded[name], values, equal_nan=True), name
+
+
+def test_parquet_without_pyarrow_writes_npz_next_to_it(time_series, tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)  # "import pyarrow" raises ImportError
+    monkeypatch.setitem(sys.modules, 'pyarrow.parquet', None)
+
+    with pytest.warns(UserWarning, match='pyarrow'):
+        written = time_series.save(str(tmp_path / 'metrics.parquet'))
+
+    assert written == str(tmp_path / 'metrics.npz')
+    assert os.listdir(tmp_path) == ['metrics.npz']
+    with np.load(written) as loaded:
+        assert loaded['window'] == time_series.window
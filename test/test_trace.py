@@ -0,0 +1,37 @@
+"""
+Unit tests of the trace of headless runs: it is off by default, so that they neither pay for it nor create a trace
+file, and it can still be asked for
+
+Usage (from the root of the repository):
+    python -m pytest test/test_trace.py
+"""
+
+import os
+import logging
+from simulator.simulator import run_headless
+from utils import config
+from utils.trace import tracer
+
+
+def test_headless_runs_are_not_traced_by_default(tmp_path, monkeypatch):
+    tracer.close()  # the trace file of the former runs, if any, is not in "tmp_path"
+    monkeypatch.chdir(tmp_path)
+    level = tracer.level
+
+    run_headless(1, 5, total_simulation_time=0.2e6)
+
+    assert os.listdir(tmp_path) == []
+    assert tracer.level == level  # the level is restored after the run
+
+
+def test_headless_runs_can_be_traced(tmp_path, monkeypatch):
+    tracer.close()  # the trace file of the former runs, if any, is not in "tmp_path"
+    monkeypatch.chdir(tmp_path)
+    level = tracer.level
+
+    run_headless(1, 5, total_simulation_time=0.2e6, trace_level=logging.INFO)
+    tracer.close()
+
+    with open(config.TRACE_FILE) as f:
+        assert sum(1 for _ in f) > 0
+    assert tracer.level == level
@@ -0,0 +1,121 @@
+"""
+Unit tests of "WaitingList": the packets are indexed by destination, dropped once their deadline has passed even if
+their destination is never woken up, and "wake" only sends the packets that have a next hop
+
+Usage (from the root of the repository):
+    python -m pytest test/test_waiting_list.py
+"""
+
+from types import SimpleNamespace
+from entities.transmitting_queue import TransmittingQueue
+from entities.waiting_list import WaitingList
+
+DEADLINE = 10
+
+
+def make_packet(dst_id, creation_time=0):
+    return SimpleNamespace(dst_drone=SimpleNamespace(identifier=dst_id), creation_time=creation_time,
+                           deadline=DEADLINE)
+
+
+def make_routing_protocol(routable):
+    """A routing protocol that has a next hop towards the destinations in "routable" """
+
+    my_drone = SimpleNamespace(sleep=False, transmitting_queue=TransmittingQueue())
+    routing_protocol = SimpleNamespace(my_drone=my_drone, selections=[])
+
+    def next_hop_selection(packet):
+        routing_protocol.selections.append(packet)
+        return packet.dst_drone.identifier in routable, packet, False
+
+    routing_protocol.next_hop_selection = next_hop_selection
+    return routing_protocol
+
+
+def test_packets_are_indexed_by_destination():
+    waiting_list = WaitingList(SimpleNamespace(now=0))
+    a, b, c = make_packet(1), make_packet(2), make_packet(1)
+    for packet in (a, b, c, a):
+        waiting_list.append(packet)
+
+    assert len(waiting_list) == 3
+    assert waiting_list.destinations() == [1, 2]
+    assert waiting_list.take(1) == [a, c]
+    assert not waiting_list.is_waiting_for(1) and waiting_list.is_waiting_for(2)
+    assert len(waiting_list) == 1
+
+
+def test_expired_packets_are_dropped_without_a_wake_up():
+    env = SimpleNamespace(now=0)
+    waiting_list = WaitingList(env)
+    old, new = make_packet(1, creation_time=0), make_packet(2, creation_time=5)
+    waiting_list.append(old)
+    waiting_list.append(new)
+
+    env.now = DEADLINE  # not expired yet, as long as the deadline has not passed
+    waiting_list.purge()
+    assert len(waiting_list) == 2
+
+    env.now = DEADLINE + 1
+    waiting_list.append(make_packet(3, creation_time=env.now))
+    assert len(waiting_list) == 2
+    assert waiting_list.destinations() == [2, 3]
+
+    env.now = DEADLINE + 6
+    assert waiting_list.take(2) == []
+    assert len(waiting_list) == 1
+
+
+def test_the_heap_holds_each_packet_once():
+    env = SimpleNamespace(now=0)
+    waiting_list = WaitingList(env)
+    packet = make_packet(1)
+    for _ in range(100):
+        waiting_list.append(packet)
+        waiting_list.take(1)
+
+    assert len(waiting_list.deadlines) == 1
+
+    env.now = DEADLINE + 1
+    waiting_list.purge()
+    assert waiting_list.deadlines == [] and waiting_list.tracked == set()
+
+
+def test_wake_sends_the_packets_that_have_a_next_hop():
+    waiting_list = WaitingList(SimpleNamespace(now=0))
+    routable, stuck = make_packet(1), make_packet(2)
+    waiting_list.append(routable)
+    waiting_list.append(stuck)
+
+    routing_protocol = make_routing_protocol(routable={1})
+    waiting_list.wake(1, routing_protocol)
+    waiting_list.wake(2, routing_protocol)
+
+    assert routing_protocol.selections == [routable, stuck]
+    assert routing_protocol.my_drone.transmitting_queue.get() is routable
+    assert list(waiting_list) == [stuck]
+
+
+def test_wake_with_a_route_check_that_does_not_select_the_next_hop():
+    waiting_list = WaitingList(SimpleNamespace(now=0))
+    packet = make_packet(1)
+    waiting_list.append(packet)
+
+    routing_protocol = make_routing_protocol(routable=set())
+    for _ in range(3):
+        waiting_list.wake(1, routing_protocol, has_route=lambda waiting_pkd: False)
+
+    assert routing_protocol.selections == []
+    assert list(waiting_list) == [packet]
+
+
+def test_a_sleeping_drone_wakes_nothing():
+    waiting_list = WaitingList(SimpleNamespace(now=0))
+    packet = make_packet(1)
+    waiting_list.append(packet)
+
+    routing_protocol = make_routing_protocol(routable={1})
+    routing_protocol.my_drone.sleep = True
+    waiting_list.wake(1, routing_protocol)
+
+    assert list(waiting_list) == [packet]
@@ -0,0 +1,220 @@
+import heapq
+import math
+from utils.spatial_index import UniformGrid
+from utils.util_function import euclidean_distance_3d
+from phy.large_scale_fading import maximum_communication_range
+from routing.opar.opar import link_lifetime_matrix
+
+
+class ConnectivityGraph:
+    """
+    Connectivity graph of the whole network, shared by all the drones of a simulation
+
+    Two drones are linked if their distance is smaller than the maximum communication range. The graph is built the
+    first time it is used, after that, it is updated incrementally: every time a drone moves, only the links of this
+    drone are checked again (the candidates are found with a uniform grid). Routing protocols that need a global view
+    of the topology (e.g., OPAR) can query it instead of building their own cost matrix for every packet
+
+    The paths computed by a routing protocol can also be cached, a cached path stays valid until one of its links
+    breaks or the predicted lifetime of one of its links expires
+
+    The mobility engine moves all the drones at once, but hands the new positions to them one by one. In between, the
+    neighbors of the drones that have not been updated yet are stale, so the link listeners are deferred until the
+    whole step has been published (see "begin_batch" and "end_batch"), and they are called once per step at most
+
+    Attributes:
+        simulator: the simulation platform that contains everything
+        comm_range: maximum communication range corresponding to the snr threshold
+        neighbors: neighbors[i] is the set of drones linked to drone i, None until the graph is built
+        grid: spatial index of the drones, its cell size is "comm_range"
+        lifetimes: predicted lifetime of the links between all pairs of drones, computed at once with the current
+                   positions and velocities, it is dropped every time a drone moves
+        lifetimes_time: simulation time at which "lifetimes" was computed
+        path_cache: (src_id, dst_id) -> (path, expiry time)
+        link_listeners: functions called (without argument) every time new links appear, after the graph is updated
+        batching: whether the positions of several drones are being updated, the listeners are deferred meanwhile
+        links_added: whether new links have appeared during the current batch
+
+    References:
+        [1] M. Gharib, F. Afghah and E. Bentley, "OPAR: Optimized Predictive and Adaptive Routing for Cooperative UAV
+            Networks," in IEEE Conference on Computer Communications Workshops, PP. 1-6, 2021.
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/14
+    Updated at: 2025/5/14
+    """
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.comm_range = maximum_communication_range()
+        self.neighbors = None
+        self.grid = None
+        self.lifetimes = None
+        self.lifetimes_time = None
+        self.path_cache = dict()
+        self.link_listeners = []
+        self.batching = False
+        self.links_added = False
+
+    def build(self):
+        self.grid = UniformGrid(self.comm_range)
+        for drone in self.simulator.drones:
+            self.grid.insert(drone.identifier, drone.coords)
+
+        self.neighbors = [self.neighbors_in_range(drone) for drone in self.simulator.drones]
+
+    def neighbors_in_range(self, drone):
+        neighbors = set()
+        for node_id in self.grid.nearby(drone.coords):
+            if node_id != drone.identifier:
+                if euclidean_distance_3d(drone.coords, self.simulator.drones[node_id].coords) < self.comm_range:
+                    neighbors.add(node_id)
+
+        return neighbors
+
+    def update_position(self, drone):
+        """Called every time the position of "drone" is updated"""
+
+        self.lifetimes = None
+
+        if self.neighbors is None:
+            return  # nobody has used the graph yet
+
+        drone_id = drone.identifier
+        self.grid.move(drone_id, drone.coords)
+
+        old_neighbors = self.neighbors[drone_id]
+        new_neighbors = self.neighbors_in_range(drone)
+
+        for node_id in old_neighbors - new_neighbors:
+            self.neighbors[node_id].discard(drone_id)  # broken link
+        for node_id in new_neighbors - old_neighbors:
+            self.neighbors[node_id].add(drone_id)  # new link
+
+        self.neighbors[drone_id] = new_neighbors
+
+        if new_neighbors - old_neighbors:
+            if self.batching:
+                self.links_added = True
+            else:
+                self.notify_link_listeners()
+
+    def begin_batch(self):
+        """The positions of several drones are about to be updated, the link listeners wait until "end_batch" """
+
+        self.batching = True
+
+    def end_batch(self):
+        """All the positions are up to date, the link listeners are called if new links have appeared meanwhile"""
+
+        self.batching = False
+        if self.links_added:
+            self.links_added = False
+            self.notify_link_listeners()
+
+    def notify_link_listeners(self):
+        for listener in self.link_listeners:
+            listener()
+
+    def get_neighbors(self, drone_id):
+        if self.neighbors is None:
+            self.build()
+
+        return self.neighbors[drone_id]
+
+    def link_lifetimes(self):
+        """Predicted remaining lifetime of the links between all pairs of drones (in seconds), cached per tick"""
+
+        now = self.simulator.env.now
+        if self.lifetimes is None or self.lifetimes_time != now:
+            drone_states = self.simulator.drone_states
+            self.lifetimes = link_lifetime_matrix(drone_states.positions, drone_states.velocities, self.comm_range)
+            self.lifetimes_time = now
+
+        return self.lifetimes
+
+    def link_lifetime(self, id1, id2):
+        """Predicted remaining lifetime of the link between two drones (in seconds)"""
+
+        return float(self.link_lifetimes()[id1, id2])
+
+    def shortest_path(self, src_id, dst_id, minimum_link_lifetime=None):
+        """
+        Dijkstra's algorithm (with a binary heap) to find the path with the minimum number of hops
+        :param src_id: source node id
+        :param dst_id: destination node id
+        :param minimum_link_lifetime: if it is given, only the links whose predicted lifetime is longer than it can be
+                                      used
+        :return: routing path (including the source and the destination), empty list if there is no path
+        """
+
+        if self.neighbors is None:
+            self.build()
+
+        lifetimes = self.link_lifetimes() if minimum_link_lifetime is not None else None
+
+        distance = {src_id: 0}
+        prev = {src_id: None}
+        visited = set()
+        heap = [(0, src_id)]
+
+        while heap:
+            dist, node = heapq.heappop(heap)
+            if node in visited:
+                continue
+            visited.add(node)
+
+            if node == dst_id:
+                break
+
+            # reading python floats from a list is much faster than indexing the array for every neighbor
+            node_lifetimes = lifetimes[node].tolist() if lifetimes is not None else None
+
+            # the nodes are visited in ascending order of (distance, id), so ties are broken towards the smallest id
+            for neighbor in self.neighbors[node]:
+                if neighbor in visited:
+                    continue
+                if node_lifetimes is not None and node_lifetimes[neighbor] <= minimum_link_lifetime:
+                    continue
+
+                alt = dist + 1
+                if alt < distance.get(neighbor, math.inf):
+                    distance[neighbor] = alt
+                    prev[neighbor] = node
+                    heapq.heappush(heap, (alt, neighbor))
+
+        if dst_id not in visited:
+            return []
+
+        path = [dst_id]
+        while prev[path[-1]] is not None:
+            path.append(prev[path[-1]])
+        path.reverse()
+
+        return path
+
+    def cache_path(self, path):
+        """Cache a path (from its source to its destination) until one of its links is predicted to break"""
+
+        if len(path) < 2:
+            return
+
+        lifetime = min(self.link_lifetime(path[i], path[i + 1]) for i in range(len(path) - 1))
+        self.path_cache[(path[0], path[-1])] = (path, self.simulator.env.now + lifetime * 1e6)
+
+    def cached_path(self, src_id, dst_id):
+        """The cached path from "src_id" to "dst_id" if it is still valid, otherwise None"""
+
+        item = self.path_cache.get((src_id, dst_id))
+        if item is None:
+            return None
+
+        path, expiry = item
+        if self.simulator.env.now < expiry and self.neighbors is not None:
+            neighbors = self.neighbors
+            if all(path[i + 1] in neighbors[path[i]] for i in range(len(path) - 1)):
+                return path
+
+        del self.path_cache[(src_id, dst_id)]  # a link has broken or is about to break
+        return None
+
@@ -1,19 +1,12 @@
 import math
-import logging
 import numpy as np
 from topology.virtual_force.vf_packet import VfPacket
 from topology.virtual_force.vf_neighbor_table import VfNeighborTable
 from utils.util_function import euclidean_distance_3d
-import matplotlib.pyplot as plt
-from utils import config
+from utils import config, trace
 
 
-# config logging
-logging.basicConfig(filename='running_log.log',
-                    filemode='w',  # there are two modes: 'a' and 'w'
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    level=config.LOGGING_LEVEL
-                    )
+TRACE = trace.category('topology.virtual_force')
 
 
 class VfMotionController:
@@ -35,7 +28,7 @@ class VfMotionController:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/5/20
-    Updated at: 2025/3/28
+    Updated at: 2025/5/14
     """
 
     def __init__(self, drone):
@@ -60,7 +53,8 @@ class VfMotionController:
         self.simulator.env.process(self.initialization())
         self.simulator.env.process(self.motion_control(drone))
         self.trajectory = []
-        self.my_drone.simulator.env.process(self.show_trajectory())
+        if not self.my_drone.simulator.headless:
+            self.my_drone.simulator.env.process(self.show_trajectory())
 
     # determine the next target position
     def get_next_position(self):
@@ -82,21 +76,22 @@ class VfMotionController:
         return next_position, force_direction
 
     def initialization(self):
-        config.GL_ID_VF_PACKET += 1
+        vf_packet_id = self.simulator.id_allocator.next_id('vf')
 
         # channel assignment
         channel_id = self.my_drone.channel_assigner.channel_assign()
 
         hello_msg = VfPacket(src_drone=self.my_drone,
                              creation_time=self.simulator.env.now,
-                             id_hello_packet=config.GL_ID_VF_PACKET,
+                             id_hello_packet=vf_packet_id,
                              hello_packet_length=config.HELLO_PACKET_LENGTH,
                              simulator=self.simulator,
                              channel_id=channel_id)
         hello_msg.transmission_mode = 1
 
-        logging.info('At time: %s, UAV: %s has motion control hello packet to broadcast, pkd_id is: %s',
-                     self.simulator.env.now, self.my_drone.identifier, hello_msg.packet_id)
+        if TRACE.full:
+            TRACE.debug('At time: %s, UAV: %s has motion control hello packet to broadcast, pkd_id is: %s',
+                        self.simulator.env.now, self.my_drone.identifier, hello_msg.packet_id)
 
         yield self.simulator.env.timeout(10)
         self.my_drone.transmitting_queue.put(hello_msg)
@@ -136,14 +131,14 @@ class VfMotionController:
 
             # judge if the drone has reach the target waypoint
             if euclidean_distance_3d(next_pos, self.next_position) < 20:
-                config.GL_ID_VF_PACKET += 1
+                vf_packet_id = self.simulator.id_allocator.next_id('vf')
 
                 # channel assignment
                 channel_id = self.my_drone.channel_assigner.channel_assign()
 
                 hello_msg = VfPacket(src_drone=self.my_drone,
                                      creation_time=self.simulator.env.now,
-                                     id_hello_packet=config.GL_ID_VF_PACKET,
+                                     id_hello_packet=vf_packet_id,
                                      hello_packet_length=config.HELLO_PACKET_LENGTH,
                                      simulator=self.simulator,
                                      channel_id=channel_id)
@@ -166,6 +161,9 @@ class VfMotionController:
             # drone.residual_energy -= energy_consumption
 
     def show_trajectory(self):
+        import matplotlib.pyplot as plt
+        from mpl_toolkits.mplot3d import Axes3D
+
         x = []
         y = []
         z = []
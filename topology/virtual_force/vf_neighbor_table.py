@@ -3,6 +3,7 @@ import numpy as np
 from collections import defaultdict
 from utils import config
 from utils.util_function import euclidean_distance_3d
+from utils.expiring_table import ExpiringTable
 from phy.large_scale_fading import maximum_communication_range
 
 
@@ -17,6 +18,7 @@ class VfNeighborTable:
         my_drone: the drone that installed the GPSR
         neighbor_table: a dictionary, used to store the neighbor's information
         entry_life_time: lifetime of each item in the neighbor table
+        expiry: expiry heap of the items, so that purging only visits the expired items
         k: The elastic coefficient of a spring
         desired_distance: when the distance between two nodes is below 'desired_distance', a repulsive force
                           will be generated
@@ -27,7 +29,7 @@ class VfNeighborTable:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/5/20
-    Updated at: 2025/3/28
+    Updated at: 2025/5/14
     """
 
     def __init__(self, env, my_drone):
@@ -35,6 +37,7 @@ class VfNeighborTable:
         self.my_drone = my_drone
         self.neighbor_table = defaultdict(list)
         self.entry_life_time = 5 * 1e6  # unit: us (5s)
+        self.expiry = ExpiringTable(self.entry_life_time)
         self.k = 1 * 1e7
         self.desired_distance = 80
 
@@ -49,6 +52,7 @@ class VfNeighborTable:
         drone_id = packet.src_drone.identifier
         position = packet.cur_position
         self.neighbor_table[drone_id] = [position, cur_time]
+        self.expiry.update(drone_id, cur_time)
 
     def attractive_force(self):
         """
@@ -118,6 +122,7 @@ class VfNeighborTable:
     # delete the specified item
     def remove_neighbor(self, drone_id):
         del self.neighbor_table[drone_id]
+        self.expiry.remove(drone_id)
 
     # remove the expired item
     def purge(self):
@@ -125,7 +130,5 @@ class VfNeighborTable:
             # it means that the neighbor table is empty
             return
 
-        for key in list(self.neighbor_table):
-            updated_time = self.get_updated_time(key)
-            if updated_time + self.entry_life_time < self.env.now:  # expired
-                self.remove_neighbor(key)
+        for key in self.expiry.pop_expired(self.env.now):  # only the expired items are visited
+            del self.neighbor_table[key]
@@ -2,6 +2,8 @@ from entities.packet import Packet
 
 
 class VfPacket(Packet):
+    __slots__ = ('src_drone', 'cur_position')
+
     def __init__(self,
                  src_drone,
                  creation_time,
@@ -0,0 +1,45 @@
+class Bitset:
+    """
+    Set of non-negative integers (e.g., the identifiers of the data packets), one bit per possible element
+
+    The identifiers of the data packets are allocated in increasing order from 1, so that a bit array takes 1/8 byte per
+    packet, instead of about 60 bytes per element for a python set. The array grows (at least doubling) when a larger
+    element is added. It supports the operations of a set that the metrics use: "in", "add", "len" and iteration (in
+    ascending order)
+
+    Attributes:
+        bits: bit i of byte j stands for the element 8 * j + i
+        count: number of elements
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/14
+    Updated at: 2025/5/14
+    """
+
+    def __init__(self):
+        self.bits = bytearray()
+        self.count = 0
+
+    def __contains__(self, element):
+        byte = element >> 3
+        return byte < len(self.bits) and bool(self.bits[byte] >> (element & 7) & 1)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for byte, value in enumerate(self.bits):
+            if value:
+                for i in range(8):
+                    if value >> i & 1:
+                        yield 8 * byte + i
+
+    def add(self, element):
+        byte = element >> 3
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(max(byte + 1 - len(self.bits), len(self.bits))))
+
+        mask = 1 << (element & 7)
+        if not self.bits[byte] & mask:
+            self.bits[byte] |= mask
+            self.count += 1
@@ -27,7 +27,23 @@ NUMBER_OF_DRONES = 15  # number of drones in the network
 STATIC_CASE = 0  # whether to simulate a static network
 HETEROGENEOUS = 0  # 是否支持异构网络（在速度方面），0表示不支持
 BASE_SPEED = 10  # 统一速度基准值
-LOGGING_LEVEL = logging.INFO  # whether to print the detail information during simulation
+LOGGING_LEVEL = logging.INFO  # level of the trace, logging.DEBUG for the full trace, logging.WARNING to disable it
+HEADLESS_LOGGING_LEVEL = logging.WARNING  # level of the trace of the headless runs (sweeps, benchmarks), off
+TRACE_CATEGORIES = None  # modules that are traced (see "utils/trace.py"), e.g., {'mac', 'routing.dsdv'}, None for all
+TRACE_FILE = 'running_log.log'  # file of the trace records
+TRACE_BUFFER_SIZE = 4096  # number of trace records that are written to the file at once
+METRICS_WINDOW = 0.1 * 1e6  # us, the metrics time series take a snapshot every window, 0 to disable them
+METRICS_HISTORY = 1000  # number of snapshots that are kept, the oldest ones are overwritten afterwards
+METRICS_FILE = None  # columnar file of the time series, written when the simulation ends, e.g., 'metrics.npz'
+PROFILE = False  # whether to profile the simulation (see "utils/profiler.py"), the report is printed when it ends
+PROFILE_FILE = None  # JSON file of the profile report, written when the simulation ends, e.g., 'profile.json'
+
+# ------------------------ protocol stack ------------------------ #
+# these are the defaults, a simulator can be given other choices, see "simulator/sweep.py"
+ROUTING_PROTOCOL = 'Dsdv'  # 'Dsdv', 'Greedy', 'Grad', 'Opar', 'QRouting' or 'QGeo'
+MAC_PROTOCOL = 'CsmaCa'  # 'CsmaCa' or 'PureAloha'
+MOBILITY_MODEL = 'GaussMarkov3D'  # 'GaussMarkov3D', 'RandomWalk3D' or 'RandomWaypoint3D'
+TRAFFIC_RATE = 2  # on average, how many data packets are generated by a drone in 1s
 
 # ---------- hardware parameters of drone (rotary-wing) -----------#
 PROFILE_DRAG_COEFFICIENT = 0.012
@@ -64,6 +80,7 @@ MAC_HEADER_LENGTH = 14 * 8  # header length in mac layer, 14 byte
 
 # ---------------------- physical layer -------------------------- #
 PATH_LOSS_EXPONENT = 2  # for large-scale fading
+SINR_BATCH_SIZE = 128  # main links x transmitting drones from which the SINR is batched with NumPy (bench_sinr)
 PLCP_PREAMBLE = 128 + 16  # including synchronization and SFD (start frame delimiter)
 PLCP_HEADER = 8 + 8 + 16 + 16  # including signal, service, length and HEC (header error check)
 PHY_HEADER_LENGTH = PLCP_PREAMBLE + PLCP_HEADER  # header length in physical layer, PLCP preamble + PLCP header
@@ -0,0 +1,74 @@
+import heapq
+import itertools
+
+
+class ExpiringTable:
+    """
+    Expiry times of the items of a table (neighbor table, routing table...), kept in a min-heap with lazy deletion
+
+    Each item has the time at which it was updated for the last time, and expires once it has not been updated for
+    more than "entry_life_time". Every update pushes a new record into the heap, the former records of the same key are
+    not removed but simply skipped when they reach the top of the heap (lazy deletion). Therefore, "pop_expired" only
+    looks at the records that are old enough to have expired, instead of walking through the whole table
+
+    Attributes:
+        entry_life_time: lifetime of each item
+        inclusive: if True, an item expires when "updated time + entry_life_time <= now", otherwise when
+                   "updated time + entry_life_time < now"
+        updated_time: key -> latest updated time of this key
+        heap: records (updated time, insertion order, key), some of them may be outdated
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/14
+    Updated at: 2025/5/14
+    """
+
+    def __init__(self, entry_life_time, inclusive=False):
+        self.entry_life_time = entry_life_time
+        self.inclusive = inclusive
+        self.updated_time = dict()
+        self.heap = []
+        self.counter = itertools.count()  # breaks the ties, so that the keys never need to be compared
+
+    def __len__(self):
+        return len(self.updated_time)
+
+    def __contains__(self, key):
+        return key in self.updated_time
+
+    def update(self, key, updated_time):
+        if self.updated_time.get(key) == updated_time:
+            return  # the record in the heap is still up to date
+
+        self.updated_time[key] = updated_time
+        heapq.heappush(self.heap, (updated_time, next(self.counter), key))
+
+    def remove(self, key):
+        self.updated_time.pop(key, None)  # its records in the heap become outdated
+
+    def clear(self):
+        self.updated_time.clear()
+        self.heap.clear()
+
+    def is_expired(self, updated_time, now):
+        if self.inclusive:
+            return updated_time + self.entry_life_time <= now
+        else:
+            return updated_time + self.entry_life_time < now
+
+    def pop_expired(self, now):
+        """
+        Remove the items that have expired
+        :param now: current time
+        :return: keys of the expired items, in ascending order of their updated time
+        """
+
+        expired = []
+        heap = self.heap
+        while heap and self.is_expired(heap[0][0], now):
+            updated_time, _, key = heapq.heappop(heap)
+            if self.updated_time.get(key) == updated_time:
+                del self.updated_time[key]
+                expired.append(key)
+
+        return expired
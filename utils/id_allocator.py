@@ -0,0 +1,36 @@
+from utils import config
+
+
+class IdAllocator:
+    """
+    Packet identifiers of one simulation
+
+    Each simulator owns an allocator, so that several simulations can run in the same process (e.g., in threads) without
+    interfering with each other. Each kind of packet is numbered in its own range, starting from the "config.GL_ID_*"
+    values (the data packets start from 0)
+
+    Attributes:
+        last_id: the identifier that has been allocated most recently for each kind of packet
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/14
+    Updated at: 2025/5/14
+    """
+
+    def __init__(self):
+        self.last_id = {'data': 0,
+                        'hello': config.GL_ID_HELLO_PACKET,
+                        'ack': config.GL_ID_ACK_PACKET,
+                        'vf': config.GL_ID_VF_PACKET,
+                        'grad': config.GL_ID_GRAD_MESSAGE,
+                        'chirp': config.GL_ID_CHIRP_PACKET}
+
+    def next_id(self, kind):
+        """
+        Allocate a new identifier
+        :param kind: 'data', 'hello', 'ack', 'vf', 'grad' or 'chirp'
+        :return: the identifier
+        """
+
+        self.last_id[kind] += 1
+        return self.last_id[kind]
@@ -0,0 +1,187 @@
+import bisect
+import math
+
+
+class P2Quantiles:
+    """
+    Streaming estimate of several quantiles with the (extended) P-square algorithm
+
+    The first "exact_size" observations are kept (sorted), so that the quantiles of short streams are exact. After that,
+    only 2m + 3 markers are kept for m quantiles, whatever the number of observations: the minimum, the maximum, the
+    quantiles themselves and one marker halfway between each pair of them, which start from the exact quantiles of the
+    first observations. Every observation moves the actual positions of the markers above it, and the heights of the
+    inner markers are adjusted (with a piecewise-parabolic prediction) whenever they are more than one position away
+    from their desired positions. Since the heights of the markers stay in ascending order, so do the estimates
+
+    Attributes:
+        ps: the quantiles that are estimated, in ascending order, between 0 and 1
+        exact_size: number of observations that are kept before switching to the markers
+        samples: the first observations, sorted, None once the markers are used
+        heights: heights of the markers
+        positions: actual positions of the markers
+        increments: fraction of the observations below each marker, i.e., increment of its desired position for each
+                    observation
+        count: number of observations
+
+    References:
+        [1] R. Jain and I. Chlamtac, "The P2 Algorithm for Dynamic Calculation of Quantiles and Histograms Without
+            Storing Observations," Communications of the ACM, vol. 28, no. 10, pp. 1076-1085, 1985.
+        [2] K. E. E. Raatikainen, "Simultaneous Estimation of Several Percentiles," Simulation, vol. 49, no. 4,
+            pp. 159-163, 1987.
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/14
+    Updated at: 2025/5/14
+    """
+
+    def __init__(self, ps, exact_size=1000):
+        self.ps = sorted(ps)
+
+        bounds = [0.0] + self.ps + [1.0]
+        self.increments = [0.0]
+        for low, high in zip(bounds[:-1], bounds[1:]):
+            self.increments += [(low + high) / 2, high]
+
+        self.exact_size = max(exact_size, len(self.increments))
+        self.samples = []
+        self.heights = None
+        self.positions = None
+        self.count = 0
+
+    def _start_markers(self):
+        """Place the markers at the exact quantiles of the first observations"""
+
+        samples = self.samples
+        last = len(samples) - 1
+        n_markers = len(self.increments)
+
+        self.positions = []
+        for i, f in enumerate(self.increments):
+            # the positions must be distinct, and leave room for the markers above
+            position = max(round(f * last) + 1, self.positions[-1] + 1 if self.positions else 1)
+            self.positions.append(min(position, len(samples) - (n_markers - 1 - i)))
+
+        self.heights = [samples[position - 1] for position in self.positions]
+        self.samples = None
+
+    def add(self, x):
+        self.count += 1
+        if self.samples is not None:
+            bisect.insort(self.samples, x)
+            if len(self.samples) == self.exact_size:
+                self._start_markers()
+            return
+
+        q = self.heights
+        n = self.positions
+        n_markers = len(n)
+
+        # find the cell k such that q[k] <= x < q[k + 1], and extend the extreme markers if needed
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[-1]:
+            q[-1] = x
+            k = n_markers - 2
+        else:
+            k = bisect.bisect_right(q, x) - 1
+
+        for i in range(k + 1, n_markers):
+            n[i] += 1
+
+        last = self.count - 1
+        increments = self.increments
+        for i in range(1, n_markers - 1):
+            d = 1 + increments[i] * last - n[i]  # desired position - actual position
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+
+                # piecewise-parabolic prediction, or linear if it does not keep the heights in order
+                height = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                        (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+                        (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+
+                q[i] = height
+                n[i] += d
+
+    def value(self, p):
+        samples = self.samples
+        if samples is None:
+            return self.heights[2 * self.ps.index(p) + 2]
+        if not samples:
+            return float('nan')
+
+        # exact quantile (linear interpolation between the closest ranks, as "np.percentile")
+        rank = p * (len(samples) - 1)
+        low = int(rank)
+        high = min(low + 1, len(samples) - 1)
+        return samples[low] + (samples[high] - samples[low]) * (rank - low)
+
+
+class RunningStatistics:
+    """
+    Statistics of a stream of observations, in constant memory
+
+    The mean and the variance are updated with Welford's algorithm, which stays accurate even when the mean is large
+    compared to the standard deviation, and the quantiles are estimated with "P2Quantiles". The statistics can be read
+    at any moment, e.g., during the simulation
+
+    Attributes:
+        count: number of observations
+        mean: mean of the observations (nan if there is none)
+        m2: sum of the squared differences to the mean
+        minimum: smallest observation
+        maximum: largest observation
+        quantiles: estimator of the quantiles, None if no quantile is needed
+
+    References:
+        [1] B. P. Welford, "Note on a Method for Calculating Corrected Sums of Squares and Products," Technometrics,
+            vol. 4, no. 3, pp. 419-420, 1962.
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/14
+    Updated at: 2025/5/14
+    """
+
+    def __init__(self, quantiles=(0.5, 0.95, 0.99)):
+        self.count = 0
+        self.mean = float('nan')
+        self.m2 = 0.0
+        self.minimum = float('inf')
+        self.maximum = float('-inf')
+        self.quantiles = P2Quantiles(quantiles) if quantiles else None
+
+    def __len__(self):
+        return self.count
+
+    def add(self, x):
+        self.count += 1
+        if self.count == 1:
+            self.mean = float(x)
+        else:
+            delta = x - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (x - self.mean)
+
+        if x < self.minimum:
+            self.minimum = x
+        if x > self.maximum:
+            self.maximum = x
+
+        if self.quantiles is not None:
+            self.quantiles.add(x)
+
+    def variance(self):
+        """Sample variance, nan with less than two observations"""
+
+        return self.m2 / (self.count - 1) if self.count > 1 else float('nan')
+
+    def std(self):
+        return math.sqrt(self.variance())
+
+    def quantile(self, p):
+        """Estimate of the quantile "p", which must be one of those given at the creation"""
+
+        return self.quantiles.value(p)
@@ -0,0 +1,176 @@
+import json
+import time
+from collections import defaultdict
+
+
+class Profiler:
+    """
+    Profile of a simulation: where the events come from and where the wall-clock time goes
+
+    It is opt-in (see "config.PROFILE"), and installs itself on the environment of the simulation before anything is
+    built, so that nothing is changed when it is disabled:
+    1) every process started with "env.process" is wrapped, so that each resumption of its generator is timed, under
+       the name of its generator function (e.g., "Drone.receive", "CsmaCa.listen", "MobilityEngine.mobility_update",
+       "Dsdv.broadcast_hello_packet_periodically")
+    2) every event scheduled with "env.schedule" is counted under the name of the process that is running, or under
+       "callback" when no process is running (e.g., the channel notifying the receivers)
+    3) some synchronous hot paths are timed too (see "timed"), such as the SINR calculation and the next-hop selection,
+       and their time is not counted in the process that calls them, so that the times are exclusive and add up
+
+    The sections are grouped by subsystem: the package where the generator function is defined (e.g., "mac" or
+    "routing"), or the one given to "timed". The remaining wall-clock time is spent in the SimPy kernel and in the
+    callbacks of the events
+
+    Attributes:
+        env: simulation environment
+        events: number of events scheduled by each kind of process
+        times: wall-clock time spent in each section, in s
+        calls: number of times that each section was entered (resumptions of the processes, calls of the functions)
+        subsystems: subsystem of each section
+        stack: the sections that are running, the innermost last
+        mark: the moment from which the time is charged to the innermost section
+        start: the moment when the profiler was installed
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/14
+    Updated at: 2025/5/14
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self.events = defaultdict(int)
+        self.times = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.subsystems = dict()
+        self.stack = []
+        self.mark = 0.0
+        self.start = time.perf_counter()
+
+        schedule = env.schedule
+        process = env.process
+
+        def counting_schedule(event, priority=1, delay=0):
+            active_process = env.active_process
+            self.events[active_process._generator.__qualname__ if active_process is not None else 'callback'] += 1
+            schedule(event, priority, delay)
+
+        env.schedule = counting_schedule
+        env.process = lambda generator: process(self.profiled(generator))
+
+    def enter(self, section):
+        now = time.perf_counter()
+        if self.stack:
+            self.times[self.stack[-1]] += now - self.mark
+
+        self.stack.append(section)
+        self.calls[section] += 1
+        self.mark = now
+
+    def exit(self):
+        now = time.perf_counter()
+        self.times[self.stack.pop()] += now - self.mark
+        self.mark = now
+
+    def profiled(self, generator):
+        """Generator that runs "generator" and times each of its resumptions, under the name of its function"""
+
+        section = generator.__qualname__
+        if section not in self.subsystems:
+            self.subsystems[section] = generator.gi_frame.f_globals['__name__'].split('.')[0]
+
+        wrapper = self._resume(generator, section)
+        wrapper.__name__ = generator.__name__
+        wrapper.__qualname__ = section  # the events that it schedules are counted under this name
+
+        return wrapper
+
+    def _resume(self, generator, section):
+        value, error = None, None
+
+        while True:
+            self.enter(section)
+            try:
+                event = generator.send(value) if error is None else generator.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.exit()
+
+            try:
+                value, error = (yield event), None
+            except GeneratorExit:
+                generator.close()
+                raise
+            except BaseException as exception:  # e.g., "simpy.Interrupt" or a failed event
+                value, error = None, exception
+
+    def timed(self, section, subsystem, function):
+        """
+        Time the calls of a synchronous function, e.g.:
+
+            drone.routing_protocol.next_hop_selection = profiler.timed(
+                'routing.next_hop', 'routing', drone.routing_protocol.next_hop_selection)
+        """
+
+        self.subsystems[section] = subsystem
+
+        def timed_function(*args, **kwargs):
+            self.enter(section)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.exit()
+
+        return timed_function
+
+    def report(self):
+        """
+        :return: dictionary with the wall-clock and simulated times (in s), the number of events (in total, per
+                 simulated second and per kind of process), and the time of each section and subsystem
+        """
+
+        wall_time = time.perf_counter() - self.start
+        simulated_time = self.env.now / 1e6
+        n_events = sum(self.events.values())
+
+        subsystems = defaultdict(float)
+        for section, seconds in self.times.items():
+            subsystems[self.subsystems[section]] += seconds
+        subsystems['kernel and callbacks'] = wall_time - sum(self.times.values())
+
+        return {
+            'wall_time': wall_time,
+            'simulated_time': simulated_time,
+            'simulated_seconds_per_second': simulated_time / wall_time,
+            'events': n_events,
+            'events_per_simulated_second': n_events / simulated_time if simulated_time else float('nan'),
+            'events_by_process': dict(sorted(self.events.items(), key=lambda item: -item[1])),
+            'sections': {section: {'subsystem': self.subsystems[section], 'calls': self.calls[section],
+                                   'time': self.times[section]}
+                         for section in sorted(self.times, key=lambda section: -self.times[section])},
+            'subsystems': dict(sorted(subsystems.items(), key=lambda item: -item[1]))
+        }
+
+    def print_report(self):
+        report = self.report()
+
+        print('wall-clock time: %.2f s, simulated time: %.2f s (%.3f simulated s per s)' %
+              (report['wall_time'], report['simulated_time'], report['simulated_seconds_per_second']))
+        print('events: %d (%.0f per simulated s)' % (report['events'], report['events_per_simulated_second']))
+        for name, count in report['events_by_process'].items():
+            print('    %-50s %12d' % (name, count))
+
+        print('%-54s %12s %12s %8s' % ('section', 'calls', 'time (s)', 'share'))
+        for section, values in report['sections'].items():
+            print('    %-50s %12d %12.3f %7.1f%%' % (section, values['calls'], values['time'],
+                                                    values['time'] / report['wall_time'] * 100))
+
+        print('%-54s %12s %8s' % ('subsystem', 'time (s)', 'share'))
+        for subsystem, seconds in report['subsystems'].items():
+            print('    %-50s %12.3f %7.1f%%' % (subsystem, seconds, seconds / report['wall_time'] * 100))
+
+    def save(self, filename):
+        """Dump the report as JSON"""
+
+        with open(filename, 'w') as f:
+            json.dump(self.report(), f, indent=4)
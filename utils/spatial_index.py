@@ -0,0 +1,77 @@
+import math
+from collections import defaultdict
+
+
+class UniformGrid:
+    """
+    Uniform-grid spatial index over 3-D positions
+
+    The space is divided into cubic cells whose side length is "cell_size". Each key (usually a drone id) is stored in
+    the cell that contains its position, so all the keys within "cell_size" of a point can be found by looking at the
+    27 cells around it, instead of checking every key. Once the position of a key changes, "move" should be called to
+    refresh the index
+
+    Attributes:
+        cell_size: side length of a cell, usually it is the largest query radius
+        cells_per_query: number of cells visited by each query
+        cells: a dictionary, the key is the index of the cell, the value is the set of keys located in this cell
+        cell_of: a dictionary, records the cell of each key
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/12
+    Updated at: 2025/5/12
+    """
+
+    # the cell of the query point comes first, since it is the most likely to contain a hit
+    neighbor_offsets = sorted([(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)],
+                              key=lambda offset: abs(offset[0]) + abs(offset[1]) + abs(offset[2]))
+    cells_per_query = len(neighbor_offsets)
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = defaultdict(set)
+        self.cell_of = dict()
+
+    def cell_index(self, coords):
+        cell_size = self.cell_size
+        return math.floor(coords[0] / cell_size), math.floor(coords[1] / cell_size), math.floor(coords[2] / cell_size)
+
+    def insert(self, key, coords):
+        cell = self.cell_index(coords)
+        self.cells[cell].add(key)
+        self.cell_of[key] = cell
+
+    def remove(self, key):
+        cell = self.cell_of.pop(key, None)
+        if cell is not None:
+            self.cells[cell].discard(key)
+            if not self.cells[cell]:
+                del self.cells[cell]
+
+    def move(self, key, coords):
+        """Refresh the cell of a key that has already been inserted"""
+        cell = self.cell_index(coords)
+        if self.cell_of[key] != cell:
+            self.remove(key)
+            self.cells[cell].add(key)
+            self.cell_of[key] = cell
+
+    def __contains__(self, key):
+        return key in self.cell_of
+
+    def __len__(self):
+        return len(self.cell_of)
+
+    def nearby(self, coords):
+        """
+        Candidates that may be within "cell_size" of "coords", the exact distance should be checked by the caller
+        :param coords: the center of the query
+        :return: a generator of the keys in the 27 cells around "coords", so the caller can stop early
+        """
+
+        cells = self.cells
+        cx, cy, cz = self.cell_index(coords)
+        for dx, dy, dz in self.neighbor_offsets:
+            cell = cells.get((cx + dx, cy + dy, cz + dz))
+            if cell:
+                yield from cell
@@ -0,0 +1,190 @@
+import atexit
+import logging
+import threading
+import contextlib
+from utils import config
+
+
+class TraceCategory:
+    """
+    Trace records of one module, e.g., "mac.csma_ca"
+
+    The call sites check the level before building a record, so that the arguments are neither evaluated nor formatted
+    when the category is disabled, and a disabled call site only costs one attribute lookup:
+
+        TRACE = trace.category('mac.csma_ca')
+        ...
+        if TRACE.full:
+            TRACE.debug('UAV: %s back-off is: %s', self.my_drone.identifier, backoff)
+
+    Attributes:
+        name: name of the category, dotted like the module path
+        on: whether the records of level INFO are written
+        full: whether the records of level DEBUG are written too
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/14
+    Updated at: 2025/5/14
+    """
+
+    __slots__ = ('name', 'on', 'full')
+
+    def __init__(self, name):
+        self.name = name
+        self.on = False
+        self.full = False
+
+    def info(self, msg, *args):
+        tracer.write('INFO', self.name, msg % args if args else msg)
+
+    def debug(self, msg, *args):
+        tracer.write('DEBUG', self.name, msg % args if args else msg)
+
+
+class Tracer:
+    """
+    Trace of the simulation, written to a file in batches
+
+    Instead of going through the logging module (a log record, a lock and a flush of the file for every message), the
+    messages are formatted when they are traced (some of them print tables that keep changing afterwards), kept in a
+    buffer, and written to the file "buffer_size" at a time. The file is created the first time that a batch is
+    written, and the remaining records are written when the simulation ends or when the program exits
+
+    A category is enabled if it, or one of its parents (e.g., "routing" for "routing.dsdv"), is in "categories"
+
+    Attributes:
+        level: records below this level are not written, logging.WARNING (or above) disables the whole trace
+        categories: names of the categories that are traced, None for all of them
+        filename: file of the trace
+        buffer_size: number of records written to the file at once
+        trace_categories: all the categories created so far, name -> TraceCategory
+        buffer: formatted records that have not been written yet
+        file: the trace file, None until the first batch is written
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2025/5/14
+    Updated at: 2025/5/14
+    """
+
+    def __init__(self):
+        self.level = config.LOGGING_LEVEL
+        self.categories = config.TRACE_CATEGORIES
+        self.filename = config.TRACE_FILE
+        self.buffer_size = config.TRACE_BUFFER_SIZE
+        self.trace_categories = dict()
+        self.buffer = []
+        self.file = None
+
+        atexit.register(self.close)
+
+    def category(self, name):
+        if name not in self.trace_categories:
+            trace_category = TraceCategory(name)
+            self._enable(trace_category)
+            self.trace_categories[name] = trace_category
+
+        return self.trace_categories[name]
+
+    def configure(self, level=None, categories=(), filename=None, buffer_size=None):
+        """
+        Change the trace settings during the run, the arguments that are not given keep their value
+        :param level: e.g., logging.INFO
+        :param categories: names of the categories that are traced, None for all of them
+        :param filename: file of the trace, the records that have already been traced are written to the former one
+        :param buffer_size: number of records written to the file at once
+        """
+
+        if filename is not None and filename != self.filename:
+            self.close()
+            self.filename = filename
+
+        if level is not None:
+            self.level = level
+        if categories != ():
+            self.categories = categories
+        if buffer_size is not None:
+            self.buffer_size = buffer_size
+
+        for trace_category in self.trace_categories.values():
+            self._enable(trace_category)
+
+    def _enable(self, trace_category):
+        if self.categories is None:
+            selected = True
+        else:
+            parts = trace_category.name.split('.')
+            selected = any('.'.join(parts[:i]) in self.categories for i in range(1, len(parts) + 1))
+
+        trace_category.on = selected and self.level <= logging.INFO
+        trace_category.full = selected and self.level <= logging.DEBUG
+
+    def write(self, level_name, category_name, message):
+        self.buffer.append('%s - %s - %s\n' % (level_name, category_name, message))
+
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+
+        if self.file is None:
+            self.file = open(self.filename, 'w')
+
+        self.file.writelines(self.buffer)
+        self.file.flush()  # nothing is left in the buffer of the file, in case the process forks
+        self.buffer.clear()
+
+    def close(self):
+        self.flush()
+
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+tracer = Tracer()
+
+_level_lock = threading.Lock()
+_former_levels = []  # levels before each of the "level" blocks that are running, the first one is restored at last
+
+
+def category(name):
+    """The trace category of a module, see "TraceCategory" """
+
+    return tracer.category(name)
+
+
+def flush():
+    """Write all the records traced so far"""
+
+    tracer.flush()
+
+
+@contextlib.contextmanager
+def level(trace_level):
+    """
+    Trace at "trace_level" within the block, e.g., a headless run without trace (logging.WARNING) costs one attribute
+    lookup per call site and creates no trace file:
+
+        with trace.level(logging.WARNING):
+            env.run(until=total_simulation_time)
+
+    The level is shared by all the simulations of the process, so when several blocks are running at the same time
+    (e.g., simulations in threads), the former level is restored once the last of them is over
+    """
+
+    with _level_lock:
+        if not _former_levels:
+            tracer.flush()  # the records traced so far do not depend on the new level
+        _former_levels.append(tracer.level)
+        tracer.configure(level=trace_level)
+
+    try:
+        yield
+    finally:
+        with _level_lock:
+            former_level = _former_levels.pop()
+            if not _former_levels:
+                tracer.flush()
+                tracer.configure(level=former_level)
@@ -100,6 +100,8 @@ def scatter_plot(simulator, gui_canvas=None, target_ax=None, interactive=True):
         # 复制原始视图的视角设置
         ax.view_init(elev=target_ax.elev, azim=target_ax.azim)
 
+        distances = simulator.drone_states.distance_matrix()  # between all pairs of drones
+
         for drone1 in simulator.drones:
             for drone2 in simulator.drones:
                 if drone1.identifier != drone2.identifier:
@@ -109,7 +111,7 @@ def scatter_plot(simulator, gui_canvas=None, target_ax=None, interactive=True):
                         c='red', s=30, alpha=0.7
                     )
                     # 绘制通信链路
-                    distance = euclidean_distance_3d(drone1.coords, drone2.coords)
+                    distance = distances[drone1.identifier, drone2.identifier]
                     if distance <= maximum_communication_range():
                         x = [drone1.coords[0], drone2.coords[0]]
                         y = [drone1.coords[1], drone2.coords[1]]
@@ -141,7 +143,7 @@ def scatter_plot(simulator, gui_canvas=None, target_ax=None, interactive=True):
         # 收集通信链路数据
         for i, d1 in enumerate(simulator.drones):
             for d2 in simulator.drones[i + 1:]:
-                if euclidean_distance_3d(d1.coords, d2.coords) <= maximum_communication_range():
+                if distances[d1.identifier, d2.identifier] <= maximum_communication_range():
                     state["links"].append({
                         "from": d1.identifier,  # 添加起点ID
                         "to": d2.identifier,    # 添加终点ID